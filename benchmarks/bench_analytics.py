@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Genera un archivo sintético de N equipos y mide ingest + summarize (frío y con caché).
+
+Uso:  python -m benchmarks.bench_analytics [N]
+"""
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from server.tools.analytics import ingest, summarize
+from server.tools.dataset import default_pokemon
+from server.tools.showdown import teams_to_showdown
+
+
+def make_archive(path: Path, n_teams: int, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    names = [p.name for p in default_pokemon()][:400]
+    teams = []
+    for i in range(n_teams):
+        members = [{"name": nm, "item": "Sitrus Berry", "ability": "Intimidate",
+                    "evs": {"HP": 252, "Atk": 252}, "nature": "Adamant",
+                    "moves": ["Protect", "Fake Out", "Knock Off", "Flare Blitz"]}
+                   for nm in rng.sample(names, 6)]
+        teams.append({"name": f"Team {i}", "format": "gen8vgc2022", "pokemon": members})
+    path.write_text(teams_to_showdown(teams), encoding="utf-8")
+
+
+def main(n_teams: int = 100_000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "archive.txt"
+        make_archive(path, n_teams)
+        print(f"archive: {n_teams} teams, {path.stat().st_size / 1e6:.1f} MB")
+        for label in ("cold", "cached"):
+            t0 = time.perf_counter()
+            arc = ingest(str(path))
+            t1 = time.perf_counter()
+            summarize(arc)
+            t2 = time.perf_counter()
+            print(f"{label:7s} ingest={t1 - t0:6.2f}s summarize={t2 - t1:6.3f}s teams={len(arc)}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
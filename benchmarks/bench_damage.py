@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Throughput de la calculadora de daño: equipo de 6 contra N amenazas, en ambos sentidos.
+
+Uso:  python -m benchmarks.bench_damage [amenazas]
+"""
+import sys
+import time
+
+from server.tools.damage import Side, build_moves, damage_matrix
+from server.tools.learnsets import default_learnsets
+from server.tools.store import default_store
+
+TEAM = ["Incineroar", "Rillaboom", "Amoonguss", "Garchomp", "Tornadus", "Kyogre"]
+
+
+def main(n: int = 400, repeat: int = 5) -> None:
+    store, ls = default_store(), default_learnsets()
+    threats = store.names[:n]
+    damage_matrix(TEAM, threats, store=store, ls=ls)  # calentamiento
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        damage_matrix(TEAM, threats, store=store, ls=ls)
+    dt = (time.perf_counter() - t0) / repeat
+    team_moves = len(build_moves(Side(store, [{"name": x} for x in TEAM]), store, ls))
+    threat_moves = len(build_moves(Side(store, [{"name": x} for x in threats]), store, ls))
+    calcs = (team_moves * len(threats) + threat_moves * len(TEAM)) * 16
+    print(f"threats={len(threats)} rolls={calcs}  {dt * 1000:.1f} ms  ({calcs / dt / 1e6:.1f} M rolls/s)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 400)
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Caché de resultados en disco: latencia del mismo tools/call en un proceso nuevo
+sin caché, en otro proceso con la caché ya poblada y repetido en el mismo proceso.
+
+Uso:  python -m benchmarks.bench_diskcache [repeticiones]
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CALLS = [
+    ("suggest_team", {"format": "vgc2022", "num_teams": 3, "constraints": {"need_roles": ["trick_room"]}}),
+    ("simulate_matchup", {"team": {"pokemon": ["Garchomp", "Incineroar", "Amoonguss"]},
+                          "opponent": {"pokemon": ["Dragapult", "Rillaboom", "Kyogre"]}, "games": 20000}),
+    ("pool_filter", {"query": "spe >= 100 and type:dragon order by spe desc", "limit": 20}),
+]
+
+
+def _session(env: dict, name: str, arguments: dict, calls: int = 2) -> list:
+    """Tiempos (ms) de `calls` llamadas iguales en un proceso nuevo, tras initialize."""
+    proc = subprocess.Popen([sys.executable, "-m", "server.main", "--warm", "eager"], cwd=ROOT, env=env,
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    msgs = [{"jsonrpc": "2.0", "id": 0, "method": "initialize", "params": {"protocolVersion": "2025-06-18"}}]
+    msgs += [{"jsonrpc": "2.0", "id": i + 1, "method": "tools/call", "params": {"name": name, "arguments": arguments}}
+             for i in range(calls)]
+    times = []
+    try:
+        for msg in msgs:
+            t0 = time.perf_counter()
+            proc.stdin.write(json.dumps(msg) + "\n")
+            proc.stdin.flush()
+            reply = json.loads(proc.stdout.readline())
+            assert "result" in reply, reply
+            if msg["id"]:
+                times.append((time.perf_counter() - t0) * 1000)
+    finally:
+        proc.stdin.close()
+        proc.wait()
+    return times
+
+
+def main(repeat: int = 3) -> None:
+    for name, arguments in CALLS:
+        cold, disk, memory = [], [], []
+        for _ in range(repeat):
+            with tempfile.TemporaryDirectory() as tmp:
+                env = dict(os.environ, VGC_DISK_CACHE="1", VGC_CACHE_DIR=tmp)
+                first, again = _session(env, name, arguments)
+                cold.append(first)
+                memory.append(again)
+                disk.append(_session(env, name, arguments, calls=1)[0])
+        print(f"{name:17s} cold={min(cold):8.2f} ms  disk={min(disk):6.2f} ms  memory={min(memory):6.2f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3)
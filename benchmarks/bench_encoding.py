@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Compara bytes y tiempo de codificación por modo de salida.
+
+Uso:  python -m benchmarks.bench_encoding
+"""
+import time
+
+from server.core.encoding import ENCODINGS, encode
+from server.main import handle_request
+
+
+def _pool_rows(limit: int = 300):
+    req = {"jsonrpc": "2.0", "id": 1, "method": "tools/call",
+           "params": {"name": "pool_filter", "arguments": {"constraints": {}, "limit": limit, "_encoding": "compact"}}}
+    import json
+    return json.loads(handle_request(req, {})["result"]["content"][0]["text"])
+
+
+def main(repeat: int = 50) -> None:
+    rows = _pool_rows()
+    print(f"pool_filter rows={len(rows)}")
+    for mode in ENCODINGS:
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            text = encode(rows, mode)
+        dt = (time.perf_counter() - t0) / repeat * 1000
+        print(f"{mode:8s} bytes={len(text.encode('utf-8')):8d}  encode={dt:7.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Consultas del pool: compilación (sin caché), plan cacheado y llamada completa a pool_filter.
+
+Uso:  python -m benchmarks.bench_query [repeticiones]
+"""
+import sys
+import time
+
+import numpy as np
+
+from server.main import handle_request
+from server.tools import query
+from server.tools.store import default_store
+
+QUERIES = [
+    "spe >= 100 and (type:fire or ability:drought) and bulk > 300 order by spa desc limit 20",
+    'move:"fake out" and role:intimidate and not weak:ground',
+    "offense * 2 + spe > 350 and resists:fairy order by bst desc, spe",
+]
+
+
+def main(repeat: int = 1000) -> None:
+    store = default_store()
+    rows = np.arange(len(store))
+    for q in QUERIES:
+        query.compile_query(q).mask(store)  # calentamiento: learnsets y roles
+        t0 = time.perf_counter()
+        for _ in range(repeat // 10):
+            query._compile.cache_clear()
+            query.compile_query.cache_clear()
+            plan = query.compile_query(q)
+            query.select(plan, store, rows, limit=30)
+        cold = (time.perf_counter() - t0) / (repeat // 10)
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            query.select(query.compile_query(q), store, rows, limit=30)
+        warm = (time.perf_counter() - t0) / repeat
+        print(f"compile+eval {cold * 1e6:7.0f} us  cached {warm * 1e6:5.0f} us  {q[:60]}")
+    req = {"jsonrpc": "2.0", "id": 1, "method": "tools/call",
+           "params": {"name": "pool_filter", "arguments": {"query": QUERIES[0], "_encoding": "compact"}}}
+    t0 = time.perf_counter()
+    for i in range(repeat):
+        req["params"]["arguments"]["limit"] = i  # sin caché de respuestas
+        handle_request(req, {})
+    print(f"pool_filter tools/call {(time.perf_counter() - t0) / repeat * 1e6:.0f} us")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Filas del dataset: PokemonRecord (__slots__ + matriz against compartida) frente
+al modelo pydantic Pokemon con un dict against por fila.
+
+Mide memoria por fila (tracemalloc) y el tiempo de los bucles calientes
+(apply_filters, compute_synergy, infer_roles) sobre ambos.
+
+Uso:  python -m benchmarks.bench_records [repeticiones]
+"""
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+from server.core.models import Pokemon
+from server.tools.dataset import DATASET_PATH, load_pokemon
+from server.tools.filters import apply_filters
+from server.tools.roles import infer_roles
+from server.tools.synergy import compute_synergy
+
+
+def _measure(build):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    rows = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(s.size_diff for s in after.compare_to(before, "filename"))
+    return rows, size
+
+
+def _loops(pokes, n: int) -> float:
+    c = SimpleNamespace(include_types=["Fire", "Water"], exclude_types=["Bug"], min_speed=60, min_spdef=0,
+                        min_bulk=250, roles_needed=[])
+    teams = [pokes[i:i + 6] for i in range(0, len(pokes) - 6, 6)]
+    t0 = time.perf_counter()
+    for _ in range(n):
+        apply_filters(pokes, c)
+        for team in teams:
+            compute_synergy(team)
+    return (time.perf_counter() - t0) / n
+
+
+def main(n: int = 5) -> None:
+    records = load_pokemon(str(DATASET_PATH))
+    # infer_roles consulta los learnsets: se cargan antes de medir
+    infer_roles(records[0])
+
+    records, rec_bytes = _measure(lambda: load_pokemon(str(DATASET_PATH)))
+    models, model_bytes = _measure(lambda: [Pokemon(**r.as_dict()) for r in records])
+    print(f"rows={len(records)}  record {rec_bytes / len(records):.0f} B/row  "
+          f"pydantic {model_bytes / len(models):.0f} B/row  ({model_bytes / rec_bytes:.1f}x)")
+
+    for label, rows in (("record", records), ("pydantic", models)):
+        loops = _loops(rows, n)
+        t0 = time.perf_counter()
+        for p in rows:
+            infer_roles(p)
+        roles = time.perf_counter() - t0
+        print(f"{label:<8}  filters+synergy {loops * 1e3:6.1f} ms  infer_roles {roles * 1e3:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
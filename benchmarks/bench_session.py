@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Construcción paso a paso: 6 rondas de suggest_member + team_synergy reenviando
+el equipo en cada llamada frente a la misma construcción con una sesión
+(create_session / update_session). Mide tiempo por ronda y bytes enviados.
+
+Uso:  python -m benchmarks.bench_session [repeticiones]
+"""
+import json
+import sys
+import time
+
+from server.main import _RESULTS, handle_request
+
+SETS = [
+    {"name": "Incineroar", "item": "Sitrus Berry", "moves": ["Fake Out", "Flare Blitz", "Knock Off", "Parting Shot"]},
+    {"name": "Rillaboom", "item": "Miracle Seed", "moves": ["Fake Out", "Grassy Glide", "Wood Hammer", "U-turn"]},
+    {"name": "Kyogre", "item": "Mystic Water", "moves": ["Water Spout", "Origin Pulse", "Ice Beam", "Protect"]},
+    {"name": "Zacian", "item": "Rusted Sword", "moves": ["Behemoth Blade", "Play Rough", "Sacred Sword", "Protect"]},
+    {"name": "Amoonguss", "item": "Rocky Helmet", "moves": ["Spore", "Rage Powder", "Pollen Puff", "Protect"]},
+    {"name": "Regieleki", "item": "Focus Sash", "moves": ["Electroweb", "Thunderbolt", "Volt Switch", "Protect"]},
+]
+
+
+def _call(name: str, arguments: dict, sent: list):
+    req = {"jsonrpc": "2.0", "id": 1, "method": "tools/call",
+           "params": {"name": name, "arguments": dict(arguments, _encoding="compact")}}
+    sent.append(len(json.dumps(req)))
+    reply = handle_request(req, {})
+    assert "result" in reply, reply
+    return json.loads(reply["result"]["content"][0]["text"])
+
+
+def resend(sent: list) -> None:
+    for k in range(1, len(SETS) + 1):
+        team = SETS[:k]
+        _call("suggest_member", {"role": "support", "core": [s["name"] for s in team]}, sent)
+        _call("team_synergy", {"team": {"pokemon": team}}, sent)
+
+
+def with_session(sent: list) -> None:
+    sid = _call("create_session", {"format": "vgc2022"}, sent)["session"]
+    for s in SETS:
+        _call("update_session", {"session": sid, "add": [s]}, sent)
+        _call("suggest_member", {"role": "support", "session": sid}, sent)
+        _call("team_synergy", {"session": sid}, sent)
+    _call("update_session", {"session": sid, "close": True}, sent)
+
+
+def main(repeat: int = 50) -> None:
+    for label, build in (("resend team", resend), ("session", with_session)):
+        build([])  # calentamiento: dataset, learnsets, pares
+        times, sent = [], []
+        for _ in range(repeat):
+            _RESULTS.clear()  # sin la caché de resultados: se mide el cálculo
+            sent = []
+            t0 = time.perf_counter()
+            build(sent)
+            times.append(time.perf_counter() - t0)
+        rounds = len(SETS)
+        print(f"{label:12s} {min(times) / rounds * 1000:7.3f} ms/round  {sum(sent) / rounds:8.0f} bytes/round sent")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
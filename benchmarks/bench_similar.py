@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+similar_pokemon: tiempo de construir el índice (embedding float32 del
+DexStore) y microsegundos por consulta k-NN, directa y por tools/call.
+
+Uso:  python -m benchmarks.bench_similar [consultas]
+"""
+import sys
+import time
+
+from server.core.legality import format_rules
+from server.main import handle_request
+from server.tools.similar import SimilarityIndex, similar_pokemon
+from server.tools.store import default_store
+
+TARGETS = ["Kyogre", "Zacian", "Incineroar", "Amoonguss", "Regieleki", "Dragapult", "Tornadus", "Urshifu"]
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    store = default_store()
+    legal = format_rules("vgc2020").legal
+    t0 = time.perf_counter()
+    index = SimilarityIndex(store)
+    build_ms = (time.perf_counter() - t0) * 1000
+    print(f"índice: {index.vectors.shape[0]} filas x {index.vectors.shape[1]} dims, {build_ms:.1f} ms, "
+          f"{index.vectors.nbytes / 1024:.0f} KiB")
+
+    similar_pokemon(TARGETS[0], mask=legal)
+    t0 = time.perf_counter()
+    for i in range(n):
+        similar_pokemon(TARGETS[i % len(TARGETS)], k=10, mask=legal)
+    print(f"consulta directa:  {(time.perf_counter() - t0) / n * 1e6:8.1f} µs")
+
+    t0 = time.perf_counter()
+    for i in range(n):
+        req = {"jsonrpc": "2.0", "id": i, "method": "tools/call",
+               "params": {"name": "similar_pokemon",
+                          "arguments": {"pokemon": TARGETS[i % len(TARGETS)], "format": "vgc2020", "k": 10 + i % 7,
+                                        "_encoding": "compact"}}}
+        reply = handle_request(req, {})
+        assert "result" in reply, reply
+    print(f"tools/call:        {(time.perf_counter() - t0) / n * 1e6:8.1f} µs (incluye aciertos de caché)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+simulate_matchup: partidas por segundo (un proceso y con el pool de VGC_SIM_WORKERS).
+
+Uso:  python -m benchmarks.bench_simulate [partidas]
+"""
+import os
+import sys
+import time
+
+from server.tools import simulate
+from server.tools.learnsets import default_learnsets
+from server.tools.store import default_store
+
+TEAM = ["Incineroar", "Rillaboom", "Urshifu-Rapid-Strike", "Regieleki", "Calyrex-Shadow", "Grimmsnarl"]
+GAUNTLET = [
+    ["Zacian-Crowned", "Kyogre", "Landorus-Therian", "Amoonguss", "Thundurus", "Tornadus"],
+    ["Calyrex-Ice", "Porygon2", "Indeedee-F", "Hatterene", "Torkoal", "Stakataka"],
+    TEAM,
+]
+
+
+def main(games: int = 100_000) -> None:
+    default_store(), default_learnsets()
+    workers = os.environ.get("VGC_SIM_WORKERS") or str(os.cpu_count() or 1)
+    for label, env in (("1 process", "1"), (f"{workers} workers", workers)):
+        os.environ["VGC_SIM_WORKERS"] = env
+        simulate.simulate_matchup(TEAM, GAUNTLET, games=simulate.CHUNK_GAMES * 2)  # arranca el pool
+        t0 = time.perf_counter()
+        out = simulate.simulate_matchup(TEAM, GAUNTLET, games=games)
+        dt = time.perf_counter() - t0
+        total = out["overall"]["games"]
+        print(f"{label:<12} {total} games in {dt:.2f} s  {total / dt:,.0f} games/s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
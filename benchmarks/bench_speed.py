@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Consultas de speed tiers: índice ordenado frente a recorrer todo el dataset.
+
+Uso:  python -m benchmarks.bench_speed [consultas]
+"""
+import sys
+import time
+
+from server.tools.speed import actual_speed, default_speed_index
+
+
+def main(n: int = 20000) -> None:
+    index = default_speed_index()
+    base = index.store.stats[:, 5]
+    targets = [100 + (i % 250) for i in range(n)]
+
+    t0 = time.perf_counter()
+    for s in targets:
+        index.compare(s, "neutral", "tailwind")
+    dt_index = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for s in targets:
+        (actual_speed(base, "neutral", "tailwind") > s).nonzero()
+    dt_scan = time.perf_counter() - t0
+    print(f"queries={n} rows={len(base)}  index {dt_index / n * 1e6:.1f} us/q  scan {dt_scan / n * 1e6:.1f} us/q")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+optimize_spreads: equipo completo (6 miembros) contra 6 amenazas con learnset.
+
+Uso:  python -m benchmarks.bench_spreads [repeticiones]
+"""
+import sys
+import time
+
+from server.tools.learnsets import default_learnsets
+from server.tools.speed import default_speed_index
+from server.tools.spreads import optimize_spreads
+from server.tools.store import default_store
+
+TEAM = [
+    {"name": "Incineroar", "moves": ["Fake Out", "Flare Blitz", "Darkest Lariat", "Parting Shot"]},
+    {"name": "Rillaboom", "item": "Choice Band", "outspeed": "Incineroar"},
+    {"name": "Urshifu-Rapid-Strike", "outspeed": {"target": "Landorus-Therian", "spread": "neutral"}},
+    {"name": "Porygon2", "item": "Eviolite", "underspeed": "Incineroar"},
+    {"name": "Regieleki"},
+    {"name": "Calyrex-Shadow", "outspeed": "Zacian-Crowned"},
+]
+THREATS = ["Zacian-Crowned", "Kyogre", "Incineroar", "Rillaboom", "Landorus-Therian", "Calyrex-Shadow"]
+
+
+def main(n: int = 5) -> None:
+    default_store(), default_learnsets(), default_speed_index()
+    for mode in ("survive", "bulk"):
+        t0 = time.perf_counter()
+        for _ in range(n):
+            optimize_spreads(TEAM, THREATS, mode=mode)
+        dt = (time.perf_counter() - t0) / n
+        print(f"mode={mode:<8} team=6 threats={len(THREATS)}  {dt * 1e3:.0f} ms/team")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Arranque del servidor stdio: tiempo hasta la respuesta a initialize, a tools/list
+y al primer tools/call (que paga el resto del calentamiento si aún no terminó).
+
+Uso:  python -m benchmarks.bench_startup [repeticiones] [--warm background|eager|off]
+"""
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+MESSAGES = [
+    {"jsonrpc": "2.0", "id": 1, "method": "initialize",
+     "params": {"protocolVersion": "2025-06-18", "capabilities": {}, "clientInfo": {"name": "bench"}}},
+    {"jsonrpc": "2.0", "id": 2, "method": "tools/list", "params": {}},
+    {"jsonrpc": "2.0", "id": 3, "method": "tools/call",
+     "params": {"name": "pool_filter", "arguments": {"constraints": {"min_speed": 100}, "limit": 5}}},
+]
+
+
+def run_once(warm: str) -> list:
+    t0 = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-m", "server.main", "--warm", warm], cwd=ROOT,
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    times = []
+    try:
+        for msg in MESSAGES:
+            proc.stdin.write(json.dumps(msg) + "\n")
+            proc.stdin.flush()
+            reply = json.loads(proc.stdout.readline())
+            assert reply.get("id") == msg["id"] and "result" in reply, reply
+            times.append(time.perf_counter() - t0)
+    finally:
+        proc.stdin.close()
+        proc.wait()
+    return times
+
+
+def main(n: int = 5, warm: str = "background") -> None:
+    runs = [run_once(warm) for _ in range(n)]
+    for label, col in zip(("initialize", "tools/list", "first call"), zip(*runs)):
+        print(f"warm={warm} {label:<11} best {min(col) * 1e3:7.1f} ms  mean {sum(col) / n * 1e3:7.1f} ms")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    warm = "background"
+    if "--warm" in args:
+        i = args.index("--warm")
+        warm = args[i + 1]
+        del args[i:i + 2]
+    main(int(args[0]) if args else 5, warm)
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Latencia de suggest_team sobre el DexStore compartido (sin la capa MCP).
+
+Uso:  python -m benchmarks.bench_suggest [repeticiones]
+"""
+import sys
+import time
+
+from server.core.models import SuggestParams
+from server.engine import suggest_team
+
+CASES = {
+    "plain": SuggestParams(format="vgc2022"),
+    "lock": SuggestParams(format="vgc2022", constraints={"lock": ["Kyogre", "Incineroar"]}),
+    "trick_room": SuggestParams(format="vgc2021", constraints={"strategy": {"trick_room": True}}),
+    "5_teams": SuggestParams(format="vgc2022", num_teams=5, constraints={"lock": ["Kyogre"]}),
+    "exact": SuggestParams(format="vgc2022", constraints={
+        "exact": True, "include_types": ["Fire", "Water", "Grass"],
+        "need_roles": ["fake_out", "redirection", "tailwind", "trick_room_setter", "intimidate", "wide_guard"]}),
+    "exact_relax": SuggestParams(format="vgc2022", constraints={
+        "exact": True, "include_types": ["Fire", "Ice"], "need_roles": ["fake_out", "tailwind", "nonsense"],
+        "min_speed": 110}),
+}
+
+
+def main(repeat: int = 20) -> None:
+    suggest_team(CASES["plain"])  # calentamiento: store, reglas y matriz de parejas
+    for name, params in CASES.items():
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            suggest_team(params)
+        dt = (time.perf_counter() - t0) / repeat
+        print(f"{name:<12} {dt * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
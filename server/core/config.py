@@ -0,0 +1,44 @@
+# server/core/config.py
+"""
+Configuración por variables de entorno (todas opcionales).
+
+VGC_CACHE_DIR               directorio para cachés en disco (por defecto ~/.cache/vgc-teambuilder)
+VGC_ARCHIVE_ROOT            único directorio que archive_stats puede leer (por defecto el directorio actual;
+                            con --http, VGC_CACHE_DIR/archives)
+VGC_HTTP_MAX_CONCURRENCY    peticiones HTTP ejecutándose a la vez (por defecto 8)
+VGC_HTTP_MAX_PENDING        peticiones HTTP en espera antes de responder 503 (por defecto 64)
+VGC_DEADLINE_MS             presupuesto por tools/call si la llamada no trae _deadline_ms (por defecto sin límite;
+                            0, como en _deadline_ms, trunca en el primer bloque)
+VGC_LOG_LEVEL               nivel de log en stderr (por defecto INFO; DEBUG vuelca cada request)
+VGC_DISK_CACHE              1 = guardar resultados de herramientas en VGC_CACHE_DIR/results.sqlite3, compartidos
+                            entre procesos y reinicios (por defecto desactivado)
+VGC_DISK_CACHE_MB           tamaño máximo de esa caché; al pasarlo se borra lo menos usado (por defecto 256)
+VGC_JOURNAL                 archivo JSONL donde se añade cada petición recibida, para server.replay (por defecto ninguno)
+VGC_PROFILE                 N = perfilar con cProfile una de cada N tools/call (por defecto 0, nunca; ver core.profiling)
+VGC_PROFILE_DIR             dónde se guardan los .prof (por defecto VGC_CACHE_DIR/profiles)
+VGC_PROFILE_TOP             funciones del resumen en _meta.profile (por defecto 10)
+VGC_SESSION_MAX             sesiones de create_session vivas a la vez; se descarta la usada hace más tiempo (por defecto 256)
+VGC_SESSION_TTL_S           segundos sin uso tras los que caduca una sesión (por defecto 1800)
+VGC_SIM_WORKERS             procesos de simulate_matchup (por defecto uno por CPU; 1 = sin pool)
+"""
+import os
+from pathlib import Path
+
+
+def cache_dir() -> Path:
+    """Directorio de caché en disco; se crea al primer uso."""
+    path = Path(os.environ.get("VGC_CACHE_DIR") or Path.home() / ".cache" / "vgc-teambuilder")
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def archive_root() -> Path:
+    """Raíz de los archivos que puede leer archive_stats (las rutas de los clientes no salen de aquí)."""
+    return Path(os.environ.get("VGC_ARCHIVE_ROOT") or Path.cwd()).expanduser().resolve()
+
+
+def env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name) or default)
+    except ValueError:
+        return default
@@ -0,0 +1,63 @@
+# server/core/deadline.py
+"""
+Presupuesto de tiempo por llamada a herramienta.
+
+Cada tools/call acepta `_deadline_ms`; si no viene se usa VGC_DEADLINE_MS
+(sin definir o vacío = sin límite). En los dos sitios 0 significa lo mismo:
+presupuesto agotado desde el principio. Los motores caros consultan
+`expired()` entre bloques de trabajo y, si se acabó el tiempo (o el cliente
+canceló con notifications/cancelled), devuelven lo que llevan con
+"truncated": true.
+"""
+import os
+import time
+from typing import Any, Optional
+
+
+def default_budget_ms() -> Optional[float]:
+    """VGC_DEADLINE_MS; sin definir, vacío, no numérico o negativo -> sin límite."""
+    raw = os.environ.get("VGC_DEADLINE_MS", "").strip()
+    try:
+        value = float(raw) if raw else -1.0
+    except ValueError:
+        return None
+    return value if value >= 0 else None
+
+
+class Deadline:
+    __slots__ = ("expires_at", "cancelled", "truncated", "__weakref__")
+
+    def __init__(self, budget_ms: Optional[float] = None):
+        self.expires_at = time.monotonic() + budget_ms / 1000.0 if budget_ms is not None else None
+        self.cancelled = False
+        self.truncated = False
+
+    @classmethod
+    def from_argument(cls, value: Any) -> "Deadline":
+        """`_deadline_ms` de la llamada; None -> default del servidor. Lanza ValueError si no es numérico."""
+        if value is None:
+            return cls(default_budget_ms())
+        budget = float(value)
+        if budget < 0:
+            raise ValueError("_deadline_ms must be >= 0")
+        return cls(budget)
+
+    def remaining_ms(self) -> Optional[float]:
+        if self.expires_at is None:
+            return None
+        return max(0.0, (self.expires_at - time.monotonic()) * 1000.0)
+
+    def expired(self) -> bool:
+        """True si hay que cortar; marca el resultado como truncado."""
+        if self.cancelled or (self.expires_at is not None and time.monotonic() >= self.expires_at):
+            self.truncated = True
+            return True
+        return False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+
+def expired(deadline: Optional[Deadline]) -> bool:
+    """Atajo para motores con deadline opcional."""
+    return deadline is not None and deadline.expired()
@@ -0,0 +1,209 @@
+# server/core/diskcache.py
+"""
+Caché de resultados persistente en disco, compartida por todos los procesos
+del host (VGC_DISK_CACHE=1).
+
+Cada cliente MCP por stdio arranca su propio proceso, así que el LRU en
+memoria (encoding.ResultCache) muere con la sesión. Este segundo nivel guarda
+el resultado en compact JSON en un SQLite en modo WAL bajo VGC_CACHE_DIR:
+- clave: sha256(espacio de nombres, herramienta, argumentos canónicos); el
+  espacio de nombres junta la versión del dataset, la de las reglas de formato
+  y una huella del código del servidor, así que un cambio en cualquiera deja
+  de ver lo anterior (y la evicción lo acaba borrando)
+- WAL: lectores y escritores de varios procesos a la vez; las escrituras
+  esperan el lock hasta BUSY_TIMEOUT_MS
+- tamaño acotado (VGC_DISK_CACHE_MB): el total vive en la tabla meta y al
+  pasarse se borran las entradas con atime más antiguo (LRU). atime sólo se
+  actualiza si tiene más de ATIME_RESOLUTION segundos, para que las lecturas
+  no escriban en cada acierto
+Cualquier error de SQLite se registra y se trata como fallo de caché: la
+herramienta se calcula igual.
+"""
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+from .config import cache_dir, env_int
+from .encoding import EncodedResult
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_MB = 256
+BUSY_TIMEOUT_MS = 5000
+ATIME_RESOLUTION = 60.0
+# al evictar se baja hasta esta fracción del máximo (no evictar en cada put)
+EVICT_TO = 0.9
+# resultados más grandes se guardan comprimidos con zlib
+COMPRESS_OVER = 4096
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key BLOB PRIMARY KEY,
+    value BLOB NOT NULL,
+    compressed INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    atime REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS results_atime ON results (atime);
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO meta VALUES ('bytes', 0);
+"""
+
+
+def code_version(root: Path = Path(__file__).resolve().parents[1]) -> str:
+    """Huella de los fuentes y esquemas del servidor (tamaño + mtime: basta un stat por archivo)."""
+    h = hashlib.sha1()
+    for path in sorted(root.rglob("*")):
+        if path.suffix in (".py", ".json") and "__pycache__" not in path.parts:
+            st = path.stat()
+            h.update(f"{path.relative_to(root)}|{st.st_size}|{st.st_mtime_ns}\n".encode("utf-8"))
+    return h.hexdigest()[:12]
+
+
+class DiskCache:
+    """Caché clave -> compact JSON en SQLite (WAL), con LRU acotado por bytes. Una conexión por hilo."""
+
+    def __init__(self, path: Path, namespace: Callable[[], str], max_bytes: int = DEFAULT_MAX_MB << 20):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self._namespace = namespace
+        self._ns: Optional[str] = None
+        self._local = threading.local()
+        self.disabled = False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+            conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                self._create(conn)
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _create(conn: sqlite3.Connection) -> None:
+        """Crea (o rehace, si cambió SCHEMA_VERSION) las tablas; otro proceso puede haberlo hecho ya."""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                conn.execute("DROP TABLE IF EXISTS results")
+                conn.execute("DROP TABLE IF EXISTS meta")
+                for stmt in filter(str.strip, _SCHEMA.split(";")):
+                    conn.execute(stmt)
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def key(self, tool_name: str, canonical: str) -> bytes:
+        if self._ns is None:
+            self._ns = self._namespace()
+        return hashlib.sha256(f"{self._ns}\0{tool_name}\0{canonical}".encode("utf-8")).digest()
+
+    def _failed(self, what: str, e: BaseException) -> None:
+        logger.warning(f"Caché en disco ({self.path}): {what} falló: {e}")
+        if isinstance(e, sqlite3.DatabaseError) and not isinstance(e, sqlite3.OperationalError):
+            self.disabled = True  # archivo corrupto o no es SQLite: no reintentar en cada llamada
+
+    def get(self, tool_name: str, canonical: str) -> Optional[EncodedResult]:
+        if self.disabled:
+            return None
+        try:
+            key = self.key(tool_name, canonical)
+            conn = self._conn()
+            row = conn.execute("SELECT value, compressed, atime FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, compressed, atime = row
+            now = time.time()
+            if now - atime > ATIME_RESOLUTION:
+                conn.execute("UPDATE results SET atime = ? WHERE key = ?", (now, key))
+            text = (zlib.decompress(value) if compressed else value).decode("utf-8")
+        except (sqlite3.Error, zlib.error, UnicodeDecodeError) as e:
+            self._failed("lectura", e)
+            return None
+        try:
+            return EncodedResult.from_json(text)
+        except ValueError as e:
+            self._failed("lectura", e)
+            return None
+
+    def put(self, tool_name: str, canonical: str, entry: EncodedResult) -> None:
+        if self.disabled:
+            return
+        try:
+            data = entry.to_json().encode("utf-8")
+            compressed = len(data) > COMPRESS_OVER
+            if compressed:
+                data = zlib.compress(data, 1)
+            if len(data) > self.max_bytes * (1 - EVICT_TO):
+                return  # no cabe sin vaciar media caché
+            key = self.key(tool_name, canonical)
+            conn = self._conn()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                old = conn.execute("SELECT size FROM results WHERE key = ?", (key,)).fetchone()
+                conn.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                             (key, data, int(compressed), len(data), time.time()))
+                conn.execute("UPDATE meta SET value = value + ? WHERE name = 'bytes'",
+                             (len(data) - (old[0] if old else 0),))
+                total = conn.execute("SELECT value FROM meta WHERE name = 'bytes'").fetchone()[0]
+                if total > self.max_bytes:
+                    self._evict(conn, total)
+                conn.execute("COMMIT")
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            self._failed("escritura", e)
+
+    def _evict(self, conn: sqlite3.Connection, total: int) -> None:
+        """Borra por atime ascendente hasta EVICT_TO * max_bytes (dentro de la transacción de put)."""
+        target = int(self.max_bytes * EVICT_TO)
+        freed = 0
+        while total - freed > target:
+            batch = conn.execute("SELECT key, size FROM results ORDER BY atime LIMIT 256").fetchall()
+            if not batch:
+                break
+            for key, size in batch:
+                if total - freed <= target:
+                    break
+                conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                freed += size
+        conn.execute("UPDATE meta SET value = value - ? WHERE name = 'bytes'", (freed,))
+
+    def stats(self) -> Tuple[int, int]:
+        """(entradas, bytes)."""
+        conn = self._conn()
+        n = conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        total = conn.execute("SELECT value FROM meta WHERE name = 'bytes'").fetchone()[0]
+        return int(n), int(total)
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def open_disk_cache(namespace: Callable[[], str]) -> Optional[DiskCache]:
+    """DiskCache bajo VGC_CACHE_DIR si VGC_DISK_CACHE=1 (si no, o si falla al abrir, None)."""
+    if env_int("VGC_DISK_CACHE", 0) <= 0:
+        return None
+    try:
+        return DiskCache(cache_dir() / "results.sqlite3", namespace, env_int("VGC_DISK_CACHE_MB", DEFAULT_MAX_MB) << 20)
+    except OSError as e:
+        logger.warning(f"Caché en disco desactivada: {e}")
+        return None
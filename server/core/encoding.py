@@ -0,0 +1,218 @@
+# server/core/encoding.py
+"""
+Codificación de las respuestas de herramientas.
+
+Modos disponibles:
+- pretty:  JSON indentado (comportamiento histórico, por defecto)
+- compact: JSON sin espacios
+- columns: JSON compacto; las listas de registros pasan a formato columnar
+           ({"Name": [...], "HP": [...]}) para no repetir claves por fila
+- table:   texto tabular terso (cabecera + filas separadas por '|')
+"""
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional; sin él usamos json estándar
+    orjson = None
+
+ENCODINGS = ("pretty", "compact", "columns", "table")
+DEFAULT_ENCODING = "pretty"
+
+
+def normalize_encoding(mode: Optional[str], default: str = DEFAULT_ENCODING) -> str:
+    """Valida el modo pedido por el cliente; None -> default."""
+    if mode is None or mode == "":
+        return default
+    m = str(mode).strip().lower()
+    if m not in ENCODINGS:
+        raise ValueError(f"Unknown encoding '{mode}'. Use one of: {', '.join(ENCODINGS)}")
+    return m
+
+
+def _default(o: Any) -> Any:
+    # numpy / pandas scalars y sets
+    if hasattr(o, "item"):
+        return o.item()
+    if isinstance(o, (set, frozenset, tuple)):
+        return list(o)
+    if hasattr(o, "model_dump"):
+        return o.model_dump()
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def dumps_compact(obj: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_SERIALIZE_NUMPY).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_default)
+
+
+def raw_json(text: str) -> Any:
+    """
+    JSON ya serializado para incrustar en una respuesta. Con orjson es un Fragment que
+    dumps_compact copia tal cual; sin orjson se devuelve el objeto (una sola vez).
+    """
+    if orjson is not None and hasattr(orjson, "Fragment"):
+        return orjson.Fragment(text)
+    return json.loads(text)
+
+
+def dumps_pretty(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, indent=2, default=_default)
+
+
+def _is_records(x: Any) -> bool:
+    return isinstance(x, list) and len(x) > 0 and all(isinstance(r, dict) for r in x)
+
+
+def _record_keys(rows: List[dict]) -> List[str]:
+    keys: List[str] = list(rows[0].keys())
+    seen = set(keys)
+    for r in rows[1:]:
+        for k in r:
+            if k not in seen:
+                seen.add(k)
+                keys.append(k)
+    return keys
+
+
+def to_columns(obj: Any) -> Any:
+    """Convierte recursivamente listas de registros a formato columnar."""
+    if _is_records(obj):
+        keys = _record_keys(obj)
+        cols = {}
+        for k in keys:
+            col = [r.get(k) for r in obj]
+            if any(isinstance(v, (dict, list)) for v in col):
+                col = [to_columns(v) for v in col]
+            cols[k] = col
+        return cols
+    if isinstance(obj, dict):
+        return {k: to_columns(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [to_columns(v) for v in obj]
+    return obj
+
+
+def _cell(v: Any) -> str:
+    if v is None:
+        return ""
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))
+    if isinstance(v, (list, tuple, set)):
+        return ",".join(_cell(x) for x in v)
+    if isinstance(v, dict):
+        return dumps_compact(v)
+    return str(v)
+
+
+def _table_lines(obj: Any, out: List[str]) -> None:
+    if _is_records(obj):
+        keys = _record_keys(obj)
+        out.append("|".join(keys))
+        out.extend("|".join(_cell(r.get(k)) for k in keys) for r in obj)
+        return
+    if isinstance(obj, dict):
+        # dicts escalares (p. ej. cobertura por tipo) van en una sola línea k=v
+        if all(not isinstance(v, (dict, list)) for v in obj.values()):
+            out.append(" ".join(f"{k}={_cell(v)}" for k, v in obj.items()))
+            return
+        for k, v in obj.items():
+            if isinstance(v, dict) or _is_records(v):
+                out.append(f"[{k}]")
+                _table_lines(v, out)
+            else:
+                out.append(f"{k}: {_cell(v)}")
+        return
+    out.append(_cell(obj))
+
+
+def to_table(obj: Any) -> str:
+    out: List[str] = []
+    _table_lines(obj, out)
+    return "\n".join(out)
+
+
+def encode(obj: Any, mode: str = DEFAULT_ENCODING) -> str:
+    """Serializa un resultado de herramienta según el modo negociado."""
+    if isinstance(obj, str):
+        return obj  # p. ej. export_showdown ya devuelve texto
+    if mode == "compact":
+        return dumps_compact(obj)
+    if mode == "columns":
+        return dumps_compact(to_columns(obj))
+    if mode == "table":
+        return to_table(obj)
+    return dumps_pretty(obj)
+
+
+class EncodedResult:
+    """Resultado de una herramienta con sus serializaciones cacheadas por modo."""
+
+    __slots__ = ("value", "_encoded")
+
+    def __init__(self, value: Any):
+        self.value = value
+        self._encoded: Dict[str, str] = {}
+
+    def to_json(self) -> str:
+        """Compact JSON del valor (también para resultados de texto), para persistirlo."""
+        return dumps_compact(self.value) if isinstance(self.value, str) else self.encode("compact")
+
+    @classmethod
+    def from_json(cls, text: str) -> "EncodedResult":
+        """Inverso de to_json; el modo compact queda ya serializado."""
+        entry = cls(json.loads(text))
+        if not isinstance(entry.value, str):
+            entry._encoded["compact"] = text
+        return entry
+
+    def encode(self, mode: str = DEFAULT_ENCODING) -> str:
+        text = self._encoded.get(mode)
+        if text is None:
+            text = encode(self.value, mode)
+            self._encoded[mode] = text
+        return text
+
+
+def canonical_args(arguments: Optional[dict]) -> str:
+    """Clave estable para unos argumentos JSON (orden de claves irrelevante)."""
+    return json.dumps(arguments or {}, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=_default)
+
+
+class ResultCache:
+    """LRU pequeño de resultados por (herramienta, argumentos canónicos). Seguro entre hilos."""
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, EncodedResult]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, tool_name: str, arguments: Optional[dict]) -> Hashable:
+        return (tool_name, canonical_args(arguments))
+
+    def get(self, key: Hashable) -> Optional[EncodedResult]:
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is not None:
+                self._data.move_to_end(key)
+            return hit
+
+    def put(self, key: Hashable, value: Any) -> EncodedResult:
+        entry = value if isinstance(value, EncodedResult) else EncodedResult(value)
+        with self._lock:
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
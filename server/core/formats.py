@@ -1,5 +1,8 @@
 # server/core/formats.py
+import hashlib
+from functools import lru_cache
 from pathlib import Path
+from typing import Optional
 
 ROOT = Path(__file__).resolve().parents[1]
 DATA = ROOT.parent / "data"
@@ -11,6 +14,14 @@ DENYLIST_FILES = {
     "vgc2022": DATA / "ilegal" / "vgc2022.txt",
 }
 
+RESTRICTED_FILES = {
+    "vgc2020": DATA / "restricted" / "vgc2020.txt",
+    "vgc2021": DATA / "restricted" / "vgc2021.txt",
+    "vgc2022": DATA / "restricted" / "vgc2022.txt",
+}
+
+FORMATS = tuple(DENYLIST_FILES)
+
 # Limit of restricted items by format (gen8)
 RESTRICTED_LIMIT = {
     "vgc2020": 0,  # Series 1–3
@@ -32,6 +43,14 @@ def _read_lines(path: Path) -> set[str]:
         return set()
     return {line.strip() for line in path.read_text(encoding="utf-8").splitlines() if line.strip()}
 
+@lru_cache(maxsize=None)
+def rules_version() -> str:
+    """Huella corta de las reglas de formato (denylists, restringidos y cupos); invalida cachés en disco."""
+    h = hashlib.sha1(repr((sorted(RESTRICTED_LIMIT.items()), sorted(RESTRICTED_GEN8))).encode("utf-8"))
+    for path in (*DENYLIST_FILES.values(), *RESTRICTED_FILES.values()):
+        h.update(path.read_bytes() if path.exists() else b"-")
+    return h.hexdigest()[:12]
+
 def get_denylist(fmt: str) -> set[str]:
     return _read_lines(DENYLIST_FILES.get(fmt, Path("/does/not/exist")))
 
@@ -40,3 +59,71 @@ def get_restricted_limit(fmt: str) -> int:
 
 def is_restricted(name: str) -> bool:
     return name.strip() in RESTRICTED_GEN8
+
+def species_key(name: str) -> str:
+    """
+    Devuelve una clave de especie canónica para evitar duplicados por familia/forma.
+    Reglas específicas + heurística simple.
+    """
+    n = " ".join(str(name or "").split()).lower()
+
+    # Casos con formas
+    if "necrozma" in n:
+        return "necrozma"
+    if "calyrex" in n:
+        return "calyrex"
+    if "giratina" in n:
+        return "giratina"
+    if "zygarde" in n:
+        return "zygarde"
+    if "rotom" in n:
+        return "rotom"
+    if "urshifu" in n:
+        return "urshifu"
+    if "indeedee" in n:
+        return "indeedee"
+    if "landorus" in n:
+        return "landorus"
+    if "thundurus" in n:
+        return "thundurus"
+    if "tornadus" in n:
+        return "tornadus"
+    if "enamorus" in n:
+        return "enamorus"
+    if "shaymin" in n:
+        return "shaymin"
+    if "kyurem" in n:
+        return "kyurem"
+    if "wishiwashi" in n:
+        return "wishiwashi"
+
+    # Heurística genérica:
+    parts = n.split()
+    if len(parts) >= 2:
+        # Si la última palabra parece ser una especie "nuclear" conocida, úsala
+        tail = parts[-1]
+        # Lista corta de núcleos frecuentes para no pasarnos de listados
+        core_last_words = {
+            "necrozma","giratina","calyrex","urshifu","rotom",
+            "landorus","thundurus","tornadus","enamorus","shaymin","kyurem"
+        }
+        if tail in core_last_words:
+            return tail
+        # Si la primera palabra parece el núcleo, úsala
+        return parts[0]
+
+    # Fallback: el nombre tal cual
+    return n
+
+@lru_cache(maxsize=None)
+def get_restricted_species(fmt: str) -> frozenset:
+    """Claves de especie (species_key) restringidas en el formato (data/restricted/{fmt}.txt)."""
+    return frozenset(species_key(n) for n in _read_lines(RESTRICTED_FILES.get(fmt, Path("/does/not/exist"))))
+
+def format_from_label(label: str, default: Optional[str] = None) -> Optional[str]:
+    """Extrae el formato soportado de una etiqueta tipo 'gen8vgc2022' o 'VGC 2021'."""
+    norm = "".join(str(label or "").lower().split())
+    for fmt in FORMATS:
+        if fmt in norm:
+            return fmt
+    return default
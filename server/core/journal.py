@@ -0,0 +1,70 @@
+# server/core/journal.py
+"""
+Diario de peticiones entrantes (VGC_JOURNAL=<archivo> o --journal).
+
+Cada mensaje JSON-RPC que llega a handle_request se añade como una línea
+JSONL {"ts": epoch en segundos, "session": id, "request": mensaje} antes de
+atenderlo. El id de sesión es uno por cliente (la sesión stdio del proceso o
+cada Mcp-Session-Id de HTTP), así que varios procesos pueden escribir en el
+mismo archivo: cada línea va en un solo write en modo append.
+Cuando el servidor asigna un id de sesión de construcción (create_session)
+se añade además {"ts", "session", "created": {"id": id de la petición,
+"session": id asignado}}, para que server.replay traduzca los ids grabados a
+los que asigne el servidor de la reproducción.
+server.replay reproduce estos diarios.
+"""
+import logging
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .encoding import dumps_compact
+
+logger = logging.getLogger(__name__)
+
+
+class Journal:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._lock = threading.Lock()
+
+    def record(self, request: Any, session: Dict[str, Any]) -> None:
+        self._write({"request": request}, session)
+
+    def created(self, session: Dict[str, Any], request_id: Any, server_session: str) -> None:
+        """Id de sesión que asignó el servidor a la petición `request_id` (create_session)."""
+        self._write({"created": {"id": request_id, "session": server_session}}, session)
+
+    def _write(self, entry: Dict[str, Any], session: Dict[str, Any]) -> None:
+        sid = session.get("journal_id")
+        if sid is None:
+            sid = session.setdefault("journal_id", uuid.uuid4().hex[:12])
+        line = dumps_compact({"ts": round(time.time(), 6), "session": sid, **entry}) + "\n"
+        try:
+            with self._lock:
+                os.write(self._fd, line.encode("utf-8"))
+        except OSError as e:
+            logger.warning(f"No se pudo escribir en el diario {self.path}: {e}")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fd >= 0:
+                os.close(self._fd)
+                self._fd = -1
+
+
+def open_journal(path: Optional[str] = None) -> Optional[Journal]:
+    """Journal en `path` o en VGC_JOURNAL (None si ninguno está puesto o no se puede abrir)."""
+    path = path or os.environ.get("VGC_JOURNAL")
+    if not path:
+        return None
+    try:
+        return Journal(Path(path))
+    except OSError as e:
+        logger.warning(f"Diario desactivado: {e}")
+        return None
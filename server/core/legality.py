@@ -0,0 +1,171 @@
+# server/core/legality.py
+"""
+Motor de legalidad por formato, compilado una vez sobre ids del DexStore.
+
+Reglas (VGC Gen 8):
+- banned: denylist del formato (data/ilegal), formas que no existen en Gen 8
+  (Mega/Primal/Ultra, Zygarde Complete) y generaciones > 8
+- species clause: no repetir número de Pokédex (las formas cuentan como la misma especie)
+- item clause: no repetir objeto
+- restricted cap: como mucho RESTRICTED_LIMIT[fmt] restringidos (RESTRICTED_GEN8 + data/restricted)
+- tamaño: 1..6 Pokémon
+
+Los equipos se validan en bloque como una matriz (T, K) de ids (-1 = hueco),
+así que miles de equipos se comprueban con unas pocas operaciones de NumPy.
+"""
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .formats import FORMATS, RESTRICTED_GEN8, get_denylist, get_restricted_limit, get_restricted_species, species_key
+
+TEAM_SIZE = 6
+
+IMPOSSIBLE_PREFIXES = ("Mega ", "Mega-", "Primal ", "Primal-", "Ultra ", "Ultra-")
+IMPOSSIBLE_NAMES = {"Zygarde Complete", "Zygarde-Complete"}
+
+# Bits de error por equipo
+ERR_UNKNOWN = 1
+ERR_BANNED = 2
+ERR_SPECIES = 4
+ERR_ITEM = 8
+ERR_RESTRICTED = 16
+ERR_SIZE = 32
+
+
+def is_impossible_form(name: str) -> bool:
+    """Formas que no existen en Gen 8 (Mega/Primal/Ultra, Zygarde Complete)."""
+    n = " ".join(str(name or "").split())
+    return n.startswith(IMPOSSIBLE_PREFIXES) or n in IMPOSSIBLE_NAMES
+
+
+class FormatRules:
+    """Reglas de un formato precalculadas como máscaras por fila del DexStore."""
+
+    def __init__(self, fmt: str, store):
+        self.fmt = fmt
+        self.store = store
+        deny = get_denylist(fmt)
+        gens = np.array([int(getattr(p, "generation", 0) or 0) for p in store.pokemon], dtype=np.int16)
+        self.banned = np.array([n in deny or is_impossible_form(n) for n in store.names], dtype=bool) | (gens > 8)
+        restricted_keys = {species_key(n) for n in RESTRICTED_GEN8} | set(get_restricted_species(fmt))
+        self.restricted = store.species_mask(restricted_keys)
+        self.restricted_cap = get_restricted_limit(fmt)
+        self.numbers = store.numbers.astype(np.int64)
+        # filas utilizables en el formato (con cupo 0 los restringidos quedan fuera)
+        self.legal = ~self.banned & (~self.restricted | (self.restricted_cap > 0))
+        self.legal_names = frozenset(store.names[i] for i in np.nonzero(self.legal)[0])
+
+    def check_ids(self, ids: np.ndarray, items: Optional[np.ndarray] = None,
+                  unknown: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        ids: (T, K) filas del store, -1 = hueco. items: (T, K) ids de objeto, -1 = sin objeto.
+        unknown: (T, K) bool, sets presentes que no se pudieron resolver.
+        Devuelve (T,) con los bits ERR_* de cada equipo.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        t, k = ids.shape
+        present = ids >= 0
+        safe = np.where(present, ids, 0)
+        cols = np.arange(k, dtype=np.int64)[None, :]
+        err = np.zeros(t, dtype=np.int64)
+
+        if unknown is not None:
+            err |= np.where(np.asarray(unknown).any(axis=1), ERR_UNKNOWN, 0)
+            present_n = present.sum(axis=1) + np.asarray(unknown).sum(axis=1)
+        else:
+            present_n = present.sum(axis=1)
+        err |= np.where((present_n == 0) | (present_n > TEAM_SIZE), ERR_SIZE, 0)
+        err |= np.where((self.banned[safe] & present).any(axis=1), ERR_BANNED, 0)
+        err |= np.where((self.restricted[safe] & present).sum(axis=1) > self.restricted_cap, ERR_RESTRICTED, 0)
+
+        # duplicados: los huecos reciben valores negativos únicos por columna
+        species = np.sort(np.where(present, self.numbers[safe], -1 - cols), axis=1)
+        err |= np.where((species[:, 1:] == species[:, :-1]).any(axis=1), ERR_SPECIES, 0)
+        if items is not None:
+            items = np.asarray(items, dtype=np.int64)
+            held = np.sort(np.where(items >= 0, items, -1 - cols), axis=1)
+            err |= np.where((held[:, 1:] == held[:, :-1]).any(axis=1), ERR_ITEM, 0)
+        return err
+
+    def explain(self, names: Sequence[str], ids: Sequence[int], items: Sequence[Optional[str]],
+                unknown: Sequence[str]) -> List[str]:
+        """Mensajes legibles para un equipo (sólo se llama con equipos inválidos)."""
+        errors: List[str] = [f"{n}: unknown Pokémon" for n in unknown]
+        total = len(ids) + len(unknown)
+        if total == 0 or total > TEAM_SIZE:
+            errors.append(f"team size {total} (must be 1-{TEAM_SIZE})")
+        for n, i in zip(names, ids):
+            if self.banned[i]:
+                errors.append(f"{n}: not allowed in {self.fmt}")
+        seen: Dict[int, str] = {}
+        for n, i in zip(names, ids):
+            num = int(self.numbers[i])
+            if num in seen:
+                errors.append(f"species clause: {seen[num]} and {n}")
+            else:
+                seen[num] = n
+        held: Dict[str, str] = {}
+        for n, it in zip(names, items):
+            key = (it or "").strip().lower()
+            if not key:
+                continue
+            if key in held:
+                errors.append(f"item clause: {held[key]} and {n} both hold {it}")
+            else:
+                held[key] = n
+        restricted = [n for n, i in zip(names, ids) if self.restricted[i]]
+        if len(restricted) > self.restricted_cap:
+            errors.append(f"{len(restricted)} restricted ({', '.join(restricted)}); {self.fmt} allows {self.restricted_cap}")
+        return errors
+
+
+@lru_cache(maxsize=None)
+def format_rules(fmt: str) -> FormatRules:
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown format {fmt!r} (supported: {', '.join(FORMATS)})")  # la caché queda acotada
+    from ..tools.store import default_store  # import diferido: core no depende de tools al importar
+    return FormatRules(fmt, default_store())
+
+
+def validate_teams(teams: Sequence[Any], fmt: str = "vgc2022", rules: Optional[FormatRules] = None) -> List[Dict[str, Any]]:
+    """
+    Valida equipos (listas de sets o dicts con "pokemon"). Devuelve por equipo
+    {"valid": bool, "errors": [...]}. Todo el cribado va en una sola pasada vectorizada.
+    """
+    rules = rules or format_rules(fmt)
+    store = rules.store
+    members = [t.get("pokemon", []) if isinstance(t, dict) else list(t) for t in teams]
+    width = max([len(m) for m in members] + [TEAM_SIZE])
+    ids = np.full((len(members), width), -1, dtype=np.int64)
+    items = np.full((len(members), width), -1, dtype=np.int64)
+    unknown = np.zeros((len(members), width), dtype=bool)
+    item_ids: Dict[str, int] = {}
+    for r, sets in enumerate(members):
+        for c, s in enumerate(sets):
+            s = {"name": s} if isinstance(s, str) else s
+            i = store.resolve(s.get("name") or "")
+            if i is None:
+                unknown[r, c] = True
+                continue
+            ids[r, c] = i
+            item = str(s.get("item") or "").strip().lower()
+            if item:
+                items[r, c] = item_ids.setdefault(item, len(item_ids))
+
+    err = rules.check_ids(ids, items, unknown)
+    out: List[Dict[str, Any]] = []
+    for r, sets in enumerate(members):
+        if not err[r]:
+            out.append({"valid": True, "errors": []})
+            continue
+        sets = [{"name": s} if isinstance(s, str) else s for s in sets]
+        known = [c for c in range(len(sets)) if not unknown[r, c]]
+        out.append({"valid": False, "errors": rules.explain(
+            [store.names[ids[r, c]] for c in known],
+            [int(ids[r, c]) for c in known],
+            [sets[c].get("item") for c in known],
+            [sets[c].get("name") or "" for c in range(len(sets)) if unknown[r, c]],
+        )})
+    return out
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Literal
+from typing import Any, Optional, List, Dict, Literal
 
 TypeName = Literal[
     "Normal","Fire","Water","Electric","Grass","Ice","Fighting","Poison","Ground","Flying",
@@ -57,17 +57,38 @@ class Constraints(BaseModel):
     ]] = []
 
 class SuggestParams(BaseModel):
-    format: str = "VGC2025"
-    constraints: Constraints = Field(default_factory=Constraints)
+    """Argumentos de suggest_team (los mismos que expone la herramienta MCP)."""
+    format: Optional[str] = "vgc2022"
+    playstyle: Optional[str] = "balanced"
+    core_pokemon: Optional[List[str]] = None
+    banned_pokemon: Optional[List[str]] = None
+    constraints: Optional[Dict[str, Any]] = None
+    num_teams: Optional[int] = 1
+    max_overlap: Optional[int] = 3
+    seed: Optional[int] = 0
 
-class TeamMember(BaseModel):
+class PokemonSet(BaseModel):
+    """Un miembro de equipo tal como llega de/va a Showdown."""
     name: str
-    type1: TypeName
-    type2: Optional[TypeName] = None
-    role: str = "balanced"
+    species: Optional[str] = None
+    nickname: Optional[str] = None
+    gender: Optional[str] = None
+    item: Optional[str] = None
+    ability: Optional[str] = None
+    moves: Optional[List[str]] = None
+    nature: Optional[str] = None
+    evs: Optional[Dict[str, int]] = None
+    ivs: Optional[Dict[str, int]] = None
+    level: Optional[int] = 50
+    shiny: Optional[bool] = None
+    happiness: Optional[int] = None
+    dynamax_level: Optional[int] = None
+    gigantamax: Optional[bool] = None
 
 class Team(BaseModel):
-    members: List[TeamMember]
+    pokemon: List[PokemonSet]
+    format: Optional[str] = "vgc2022"
+    name: Optional[str] = None
 
 class SynergyReport(BaseModel):
     coverage_offensive: Dict[TypeName, int]  # cuántos miembros golpean 2x a cada tipo
@@ -0,0 +1,103 @@
+# server/core/profiling.py
+"""
+Perfilado opcional de tools/call con cProfile.
+
+Se activa por llamada con `_profile: true` o por muestreo con VGC_PROFILE=N
+(una de cada N tools/call; `_profile: false` lo desactiva para esa llamada).
+Cada llamada perfilada:
+- escribe un .prof (formato pstats: `python -m pstats`, snakeviz...) en
+  VGC_PROFILE_DIR (por defecto VGC_CACHE_DIR/profiles), con nombre
+  <herramienta>-<id>-<milisegundos>.prof
+- añade al resultado `_meta.profile` con la ruta, el tiempo total y las
+  VGC_PROFILE_TOP funciones (10 por defecto) con más tiempo acumulado
+Nada se escribe en stdout, así que sirve con el servidor stdio.
+
+cProfile sólo ve el hilo que atiende la llamada (los procesos de
+simulate_matchup o archive_stats quedan fuera), y a partir de Python 3.12
+no admite dos perfiles a la vez: si ya hay una llamada perfilándose, la
+nueva se ejecuta sin perfil y lo indica en `_meta.profile.skipped`.
+"""
+import cProfile
+import itertools
+import logging
+import os
+import pstats
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from .config import cache_dir, env_int
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOP = 10
+ROOT = Path(__file__).resolve().parents[2]
+
+_COUNTER = itertools.count(1)
+_ACTIVE = threading.Lock()
+
+
+def wanted(flag: Any) -> bool:
+    """`_profile` de la llamada o, si no viene, el muestreo de VGC_PROFILE. Lanza ValueError si no es booleano."""
+    if flag is not None:
+        if not isinstance(flag, bool):
+            raise ValueError("_profile must be a boolean")
+        return flag
+    every = env_int("VGC_PROFILE", 0)
+    return every > 0 and next(_COUNTER) % every == 0
+
+
+def profile_dir() -> Path:
+    path = Path(os.environ["VGC_PROFILE_DIR"]) if os.environ.get("VGC_PROFILE_DIR") else cache_dir() / "profiles"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _safe(part: Any) -> str:
+    return re.sub(r"[^\w.-]+", "_", str(part))[:64] or "_"
+
+
+def _where(filename: str, line: int, func: str) -> str:
+    if filename == "~":
+        return func  # built-ins: "<built-in method ...>"
+    path = Path(filename)
+    try:
+        filename = str(path.relative_to(ROOT))
+    except ValueError:
+        filename = path.name
+    return f"{filename}:{line}({func})"
+
+
+def top_functions(stats: pstats.Stats, n: int) -> List[Dict[str, Any]]:
+    """Las n funciones con más tiempo acumulado (ms) y sus llamadas."""
+    rows = sorted(stats.stats.items(), key=lambda kv: kv[1][3], reverse=True)[:n]
+    return [{"function": _where(*key), "calls": nc, "own_ms": round(tt * 1000, 3), "cumulative_ms": round(ct * 1000, 3)}
+            for key, (cc, nc, tt, ct, callers) in rows]
+
+
+def profile_call(fn: Callable[[], Any], tool_name: str, request_id: Any) -> Tuple[Any, Dict[str, Any]]:
+    """Ejecuta fn bajo cProfile: (resultado, resumen para _meta.profile)."""
+    if not _ACTIVE.acquire(blocking=False):
+        return fn(), {"skipped": "another call is being profiled"}
+    try:
+        prof = cProfile.Profile()
+        t0 = time.perf_counter()
+        try:
+            out = prof.runcall(fn)
+        finally:
+            total_ms = (time.perf_counter() - t0) * 1000
+        stats = pstats.Stats(prof)
+        summary: Dict[str, Any] = {"total_ms": round(total_ms, 3),
+                                   "top": top_functions(stats, env_int("VGC_PROFILE_TOP", DEFAULT_TOP))}
+        try:
+            path = profile_dir() / f"{_safe(tool_name)}-{_safe(request_id)}-{time.time_ns() // 1_000_000}.prof"
+            stats.dump_stats(str(path))
+            summary["file"] = str(path)
+            logger.info(f"Perfil de {tool_name} (id {request_id}): {path} ({total_ms:.1f} ms)")
+        except OSError as e:
+            logger.warning(f"No se pudo guardar el perfil de {tool_name}: {e}")
+        return out, summary
+    finally:
+        _ACTIVE.release()
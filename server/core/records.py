@@ -0,0 +1,140 @@
+# server/core/records.py
+"""
+Registros internos del dataset (una fila del CSV por Pokémon).
+
+`models.Pokemon` (pydantic) sigue siendo el esquema de la API; dentro del
+servidor cada fila es un PokemonRecord con __slots__ (sin __dict__ ni
+descriptores de pydantic). Lo que no se lee en bucles no se guarda por fila:
+- los 18 multiplicadores `against` viven en una matriz (N, 18) float32
+  compartida; `p.against` es una vista de sólo lectura sobre su fila con la
+  misma interfaz de dict ({Tipo: mult})
+- las columnas numéricas opcionales (BST, Mean, Height...) viven en una matriz
+  (N, 9) float64 (NaN = vacío) y se leen como propiedades
+"""
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+
+# Orden de columnas de la matriz against (el mismo que tools.synergy.TYPES)
+TYPES: Tuple[str, ...] = (
+    "Normal", "Fire", "Water", "Electric", "Grass", "Ice", "Fighting", "Poison", "Ground", "Flying",
+    "Psychic", "Bug", "Rock", "Ghost", "Dragon", "Dark", "Steel", "Fairy",
+)
+TYPE_POS: Dict[str, int] = {t: i for i, t in enumerate(TYPES)}
+
+# (atributo, columna del CSV) en el orden de models.Pokemon
+FIELDS: Tuple[Tuple[str, str], ...] = (
+    ("number", "Number"), ("name", "Name"), ("type1", "Type 1"), ("type2", "Type 2"), ("abilities", "Abilities"),
+    ("hp", "HP"), ("att", "Att"), ("deff", "Def"), ("spa", "Spa"), ("spd", "Spd"), ("spe", "Spe"),
+    ("bst", "BST"), ("mean", "Mean"), ("std", "Standard Deviation"),
+    ("generation", "Generation"), ("experience_type", "Experience type"), ("exp_to_100", "Experience to level 100"),
+    ("final_evolution", "Final Evolution"), ("catch_rate", "Catch Rate"), ("legendary", "Legendary"),
+    ("mega_evolution", "Mega Evolution"), ("alolan_form", "Alolan Form"), ("galarian_form", "Galarian Form"),
+    ("height_m", "Height"), ("weight_kg", "Weight"), ("bmi", "BMI"),
+)
+FIELD_NAMES: Tuple[str, ...] = tuple(name for name, _ in FIELDS)
+# Columnas frías: se guardan en DexTable.extra, no en el registro
+EXTRA_FIELDS: Tuple[Tuple[str, type], ...] = (
+    ("bst", int), ("mean", float), ("std", float), ("generation", int), ("exp_to_100", int),
+    ("catch_rate", int), ("height_m", float), ("weight_kg", float), ("bmi", float),
+)
+_EXTRA_POS = {name: i for i, (name, _) in enumerate(EXTRA_FIELDS)}
+SLOT_FIELDS: Tuple[str, ...] = tuple(name for name in FIELD_NAMES if name not in _EXTRA_POS)
+
+
+class DexTable:
+    """Matrices compartidas por todos los registros de un dataset."""
+
+    __slots__ = ("against", "extra")
+
+    def __init__(self, against: Any, extra: Any):
+        self.against = against  # (N, 18) float32, orden TYPES
+        self.extra = extra      # (N, len(EXTRA_FIELDS)) float64, NaN = vacío
+
+
+class AgainstRow(Mapping):
+    """Vista {Tipo: multiplicador} sobre una fila de la matriz against compartida."""
+
+    __slots__ = ("_matrix", "_row")
+
+    def __init__(self, matrix: Any, row: int):
+        self._matrix = matrix
+        self._row = row
+
+    def __getitem__(self, t: str) -> float:
+        return self._matrix.item(self._row, TYPE_POS[t])
+
+    def get(self, t: str, default: Any = None) -> Any:
+        i = TYPE_POS.get(t)
+        return default if i is None else self._matrix.item(self._row, i)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(TYPES)
+
+    def __len__(self) -> int:
+        return len(TYPES)
+
+    def __repr__(self) -> str:
+        return f"AgainstRow({dict(self)!r})"
+
+
+def _extra(name: str, kind: type) -> property:
+    col = _EXTRA_POS[name]
+
+    def get(self) -> Any:
+        v = self.table.extra.item(self.row, col)
+        return None if v != v else kind(v)  # NaN -> None
+    return property(get)
+
+
+class PokemonRecord:
+    """Fila del dataset: lecturas de atributo directas; `row` es su fila en las matrices de `table`."""
+
+    __slots__ = SLOT_FIELDS + ("row", "table")
+
+    def __init__(self, values: Sequence[Any], row: int, table: DexTable):
+        for name, value in zip(SLOT_FIELDS, values):
+            setattr(self, name, value)
+        self.row = row
+        self.table = table
+
+    @property
+    def against(self) -> AgainstRow:
+        return AgainstRow(self.table.against, self.row)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Mismo dict que Pokemon.model_dump() (nombres de atributo, against como dict)."""
+        d = {name: getattr(self, name) for name in FIELD_NAMES}
+        d["abilities"] = list(self.abilities)
+        d["against"] = dict(self.against)
+        return d
+
+    def to_model(self):
+        """Pokemon de pydantic para la frontera de la API (valida en ese momento)."""
+        from .models import Pokemon
+        return Pokemon(**self.as_dict())
+
+    def __repr__(self) -> str:
+        return f"PokemonRecord(name={self.name!r}, row={self.row})"
+
+
+for _name, _kind in EXTRA_FIELDS:
+    setattr(PokemonRecord, _name, _extra(_name, _kind))
+
+
+def against_rows(pokes: Sequence[Any]) -> Optional[Any]:
+    """Submatriz (K, 18) de los registros si todos comparten la misma matriz; si no (p. ej. modelos pydantic), None."""
+    table = getattr(pokes[0], "table", None) if len(pokes) else None
+    if table is None or any(getattr(p, "table", None) is not table for p in pokes):
+        return None
+    return table.against[[p.row for p in pokes]]
+
+
+def shared_against(pokes: Sequence[Any]) -> Optional[Any]:
+    """La matriz against compartida si `pokes` son exactamente sus filas 0..N-1 en orden; si no, None."""
+    table = getattr(pokes[0], "table", None) if len(pokes) else None
+    if table is None or len(table.against) != len(pokes):
+        return None
+    for i, p in enumerate(pokes):
+        if getattr(p, "table", None) is not table or p.row != i:
+            return None
+    return table.against
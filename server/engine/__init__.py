@@ -0,0 +1,5 @@
+# server/engine/__init__.py
+"""Motores de construcción de equipos, utilizables sin la capa MCP."""
+from .builder import Draft, suggest_team
+
+__all__ = ["Draft", "suggest_team"]
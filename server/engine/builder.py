@@ -0,0 +1,312 @@
+# server/engine/builder.py
+"""
+Motor de construcción de equipos (suggest_team), independiente de JSON-RPC.
+
+Trabaja sobre el DexStore compartido (mismos objetos y mismas filas que el
+resto de motores), así que no vuelve a leer el CSV en cada llamada:
+
+1. pool: legales del formato (FormatRules.legal) + filtros de la petición
+2. puntuación por estrategia, por bloques (se corta si vence el deadline)
+3. núcleo: lock/core_pokemon con cláusula de especie y cupo de restringidos
+4. relleno voraz: puntuación propia + afinidad con lo elegido (PairMatrix)
+5. num_teams > 1: reutiliza 1-4 y sólo repite el paso 4 con ruido con semilla
+"""
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+import numpy as np
+
+from ..core.deadline import Deadline, expired
+from ..core.legality import ERR_RESTRICTED, ERR_SPECIES, format_rules
+from ..core.models import SuggestParams
+from ..tools.filters import bulk_score
+from ..tools.pairs import default_pairs
+from ..tools.query import combined_mask, from_constraints
+from ..tools.roles import infer_roles
+from ..tools.store import DexStore, default_store
+from ..tools.synergy import compute_synergy
+
+TEAM_SIZE = 6
+# Candidatos puntuados entre comprobaciones del deadline
+SCORE_CHUNK = 64
+# Equipos alternativos por llamada (num_teams)
+MAX_SUGGEST_TEAMS = 20
+DIVERSITY_JITTER = 40.0  # desviación (en puntos de score) del ruido para equipos alternativos
+
+
+class ConstraintError(ValueError):
+    """`constraints` que no se pueden interpretar (la capa MCP responde -32602)."""
+
+
+def _as_list(x):
+    if x is None:
+        return []
+    return x if isinstance(x, list) else [x]
+
+
+def restricted_species(fmt: str) -> Set[str]:
+    """Claves de especie restringidas (las mismas que usa validate_team)."""
+    rules = format_rules(fmt)
+    return {rules.store.species[i] for i in np.nonzero(rules.restricted)[0]}
+
+
+def legal_pool(store: DexStore, fmt: str, banned: Set[str]) -> List[Any]:
+    """Legales del formato sin los vetados, en orden del dataset."""
+    rows = np.nonzero(format_rules(fmt).legal)[0]
+    return [store.pokemon[i] for i in rows if store.names[i].lower() not in banned]
+
+
+# filtros de constraints que acotan el pool (cada uno se compila a una consulta de tools.query)
+FILTER_KEYS = ("include_types", "exclude_types", "min_speed", "max_speed", "min_att", "min_spa", "min_spdef",
+               "min_bulk", "require_abilities")
+
+
+def constraint_queries(c: Dict[str, Any], tr_mode: bool, keys=FILTER_KEYS) -> Dict[str, str]:
+    """{filtro: consulta} de los filtros activos; `query` (texto libre) va tal cual."""
+    out = {}
+    for key in keys:
+        if key == "min_speed" and tr_mode:
+            continue  # en Trick Room la velocidad mínima no aplica
+        if key == "min_spdef" and not c.get(key):
+            continue
+        text = from_constraints({key: c.get(key)})
+        if text:
+            out[key] = text
+    if str(c.get("query") or "").strip():
+        out["query"] = str(c["query"])
+    return out
+
+
+def candidate_pool(store: DexStore, fmt: str, c: Dict[str, Any], banned: Set[str]) -> List[Any]:
+    """Legales del formato que pasan los filtros de `constraints`."""
+    strategy = c.get("strategy", {}) or {}
+    queries = constraint_queries(c, bool(strategy.get("trick_room")))
+    rows = np.nonzero(format_rules(fmt).legal & combined_mask(store, queries.values()))[0]
+    return [store.pokemon[i] for i in rows if store.names[i].lower() not in banned]
+
+
+def strategy_score(c: Dict[str, Any]):
+    """Función de puntuación según strategy y need_roles."""
+    strategy = c.get("strategy", {}) or {}
+    tr_mode = bool(strategy.get("trick_room"))
+    weather = strategy.get("weather")
+    want_speed_control = bool(strategy.get("speed_control"))
+    need_roles = set(r.lower() for r in _as_list(c.get("need_roles")) if str(r).strip())
+
+    def score(p) -> int:
+        atk = max(p.att, p.spa)
+        base = p.spe + atk + (bulk_score(p) // 2)
+        r = infer_roles(p)
+        if tr_mode:
+            base = (800 - p.spe) + (bulk_score(p)) + (p.att + p.spa)//2
+        if weather == "sun" and ("sun_abuser" in r): base += 120
+        if weather == "rain" and ("rain_abuser" in r): base += 120
+        if weather == "sand" and ("sand_abuser" in r): base += 120
+        if weather == "snow" and ("snow_abuser" in r): base += 120
+        if want_speed_control and ("speed_control" in r): base += 80
+        # roles especificos, sube a los que aportan
+        for need in need_roles:
+            if need in r:
+                base += 70
+            # atacantes por tipo de daño
+            if need == "special_attacker" and p.spa >= p.att and p.spa >= 100: base += 50
+            if need == "physical_attacker" and p.att > p.spa and p.att >= 100: base += 50
+            if need == "fast" and p.spe >= 100 and not tr_mode: base += 50
+        return base
+
+    return score
+
+
+class Draft:
+    """Estado compartido de una búsqueda: núcleo fijado, candidatos ordenados y afinidades."""
+
+    def __init__(self, store: DexStore, fmt: str, locked: List[Any], scored: List[Any], restricted_cap: int):
+        self.store = store
+        self.pairs = default_pairs(fmt)
+        # cláusula de especie y restringidos con las mismas reglas que validate_team
+        self.rules = format_rules(fmt)
+        self.restricted_cap = restricted_cap
+
+        # núcleo: se añade uno a uno y se comprueba con check_ids; lo que no cabe se informa
+        self.core: List[Any] = []
+        self.rejected: List[Dict[str, str]] = []
+        core_rows: List[int] = []
+        for p in locked:
+            i = store.resolve(p.name)
+            err = int(self.rules.check_ids(np.array([core_rows + [i]], dtype=np.int64))[0])
+            if err & ERR_SPECIES:
+                self.rejected.append({"name": p.name, "reason": "species clause"})
+            elif err & ERR_RESTRICTED or (self.rules.restricted[i] and
+                                          int(self.rules.restricted[core_rows].sum()) >= restricted_cap):
+                self.rejected.append({"name": p.name, "reason": f"restricted cap ({restricted_cap})"})
+            else:
+                self.core.append(p)
+                core_rows.append(i)
+        self.numbers: Set[int] = {int(n) for n in self.rules.numbers[core_rows]} if core_rows else set()
+        self.n_restricted = int(self.rules.restricted[core_rows].sum()) if core_rows else 0
+
+        core_names = {p.name for p in self.core}
+        scored = [(sc, p) for sc, p in scored if p.name not in core_names]
+        self.cands = [p for _, p in scored]
+        self.rows = np.array([store.resolve(p.name) for p in self.cands], dtype=np.int64)
+        self.number = self.rules.numbers[self.rows]
+        self.restricted = self.rules.restricted[self.rows]
+        self.base_total = np.array([sc for sc, _ in scored], dtype=np.int64) + \
+            self.pairs.scores(self.rows, core_rows)
+
+    def complete(self, total: np.ndarray, blocked_by: np.ndarray, max_overlap: int,
+                 fixed: Sequence[int] = (), allowed: Optional[np.ndarray] = None) -> List[int]:
+        """
+        Rellena hasta 6 desde el núcleo; devuelve índices de self.cands (mismo orden de elección).
+        `fixed` entran primero tal cual (ya validados); `allowed` limita el relleno a esos candidatos.
+        """
+        team = len(self.core)
+        numbers, n_restricted = set(self.numbers), self.n_restricted
+        total = total.copy()
+        alive = np.ones(len(self.cands), dtype=bool) if allowed is None else allowed.copy()
+        # poda: fuera los que repiten número de Pokédex del núcleo y, sin cupo, los restringidos
+        alive &= ~np.isin(self.number, list(numbers))
+        if n_restricted >= self.restricted_cap:
+            alive &= ~self.restricted
+        overlap = np.zeros(len(blocked_by), dtype=np.int64)  # miembros compartidos con cada equipo anterior
+        chosen: List[int] = []
+        queue = list(fixed)
+        while team < TEAM_SIZE:
+            if queue:
+                j = queue.pop(0)
+            else:
+                live = alive & ~blocked_by[overlap >= max_overlap].any(axis=0)
+                if not live.any():
+                    break
+                j = int(np.argmax(np.where(live, total, np.iinfo(np.int64).min)))  # empate: el de mejor puntuación propia
+            alive[j] = False
+            number, restricted = int(self.number[j]), bool(self.restricted[j])
+            if number in numbers:
+                continue  # no duplicar especie (los de `fixed` no pasan por la poda)
+            if restricted and n_restricted >= self.restricted_cap:
+                continue  # respeta CAP de restringidos
+            team += 1
+            chosen.append(j)
+            numbers.add(number)
+            alive &= self.number != number
+            if restricted:
+                n_restricted += 1
+                if n_restricted >= self.restricted_cap:
+                    alive &= ~self.restricted
+            overlap += blocked_by[:, j]
+            total += self.pairs.scores(self.rows, [self.rows[j]])
+        return chosen
+
+    def members(self, chosen: List[int]) -> List[Any]:
+        return (self.core + [self.cands[j] for j in chosen])[:TEAM_SIZE]
+
+    def search(self, num_teams: int = 1, max_overlap: int = 3, seed: Optional[int] = 0,
+               deadline: Optional[Deadline] = None) -> List[List[Any]]:
+        """
+        K equipos distintos en una sola pasada: mismo pool, puntuaciones y matriz; del segundo en
+        adelante se añade ruido con semilla y se limita cuántos miembros (no fijados) comparten con los anteriores.
+        """
+        rng = np.random.default_rng(seed)
+        previous = np.zeros((0, len(self.cands)), dtype=bool)
+        teams: List[List[Any]] = []
+        for k in range(num_teams):
+            total = self.base_total
+            if k:
+                total = self.base_total + rng.normal(0.0, DIVERSITY_JITTER, len(total)).astype(np.int64)
+            chosen = self.complete(total, previous, max_overlap)
+            if k and len(self.core) + len(chosen) < len(teams[0]):
+                break  # ya no quedan equipos completos con ese solapamiento
+            teams.append(self.members(chosen))
+            row = np.zeros((1, len(self.cands)), dtype=bool)
+            row[0, chosen] = True
+            previous = np.vstack([previous, row])
+            if expired(deadline):
+                break
+        return teams
+
+
+def suggest_team(params: SuggestParams, deadline: Optional[Deadline] = None,
+                 store: Optional[DexStore] = None) -> Dict[str, Any]:
+    store = store or default_store()
+    fmt = (params.format or "vgc2022").strip().lower()
+    rules = format_rules(fmt)
+    c = params.constraints or {}
+    strategy = c.get("strategy", {}) or {}
+    # el cupo del formato manda; la estrategia sólo puede pedir menos
+    try:
+        restricted_cap = int(strategy.get("restricted_cap", rules.restricted_cap))
+    except (TypeError, ValueError):
+        raise ConstraintError("constraints.strategy.restricted_cap must be an integer") from None
+    if restricted_cap < 0:
+        raise ConstraintError("constraints.strategy.restricted_cap must be >= 0")
+    restricted_cap = min(restricted_cap, rules.restricted_cap)
+    banned = {str(n).lower() for n in _as_list(params.banned_pokemon) if str(n).strip()}
+
+    # modo exacto: los filtros y requisitos los aplica exact_teams (y puede relajarlos)
+    exact = bool(c.get("exact"))
+    pool = legal_pool(store, fmt, banned) if exact else candidate_pool(store, fmt, c, banned)
+
+    # lock + core_pokemon, sólo si son legales en el formato; los descartados se informan
+    locked, rejected = [], []
+    for n in _as_list(c.get("lock")) + _as_list(params.core_pokemon):
+        if not str(n).strip():
+            continue
+        i = store.resolve(str(n))
+        if i is None:
+            rejected.append({"name": str(n), "reason": "unknown Pokémon"})
+        elif not rules.legal[i] or store.names[i].lower() in banned:
+            rejected.append({"name": store.names[i], "reason": f"not allowed in {fmt}"})
+        else:
+            locked.append(store.pokemon[i])
+
+    score = strategy_score(c)
+    # puntuación por bloques: si se acaba el tiempo se ordena sólo lo ya puntuado
+    scored = []
+    for k in range(0, len(pool), SCORE_CHUNK):
+        scored.extend((score(p), p) for p in pool[k:k + SCORE_CHUNK])
+        if expired(deadline):
+            break
+    scored.sort(key=lambda x: x[0], reverse=True)
+
+    draft = Draft(store, fmt, locked, scored, restricted_cap)
+    num_teams = max(1, min(int(params.num_teams or 1), MAX_SUGGEST_TEAMS))
+    max_overlap = int(params.max_overlap if params.max_overlap is not None else 3)
+    report = None
+    if exact:
+        from .exact import exact_teams  # exact importa este módulo
+        found, report = exact_teams(store, draft, c, bool(strategy.get("trick_room")), num_teams, max_overlap,
+                                    params.seed, deadline)
+    else:
+        found = draft.search(num_teams, max_overlap, params.seed, deadline)
+    teams = []
+    for members in found:
+        syn = compute_synergy(members)
+        teams.append({
+            "team": {"pokemon": [{"name": p.name} for p in members], "format": params.format, "name": "Suggested Team"},
+            "synergy": syn.model_dump() if hasattr(syn, "model_dump") else syn,
+        })
+
+    result = {
+        "team": teams[0]["team"],
+        "synergy": teams[0]["synergy"],
+        "success": True,
+        "message": "Team generated with constraints"
+    }
+    if num_teams > 1:
+        result["teams"] = teams
+        if len(teams) < num_teams:
+            result["message"] = f"Only {len(teams)} distinct teams with max_overlap={max_overlap}"
+    rejected += draft.rejected
+    if rejected:
+        result["rejected"] = rejected
+        result["success"] = False
+        result["message"] = "Some locked Pokémon could not be placed: " + \
+            ", ".join(f"{r['name']} ({r['reason']})" for r in rejected)
+    if report is not None:
+        result["exact"] = report
+        if not report["feasible"]:
+            result["success"] = False
+            result["message"] = "No team meets every constraint; built with the minimal relaxation: " + \
+                ", ".join(report["relaxed"])
+    if deadline is not None and deadline.truncated:
+        result["truncated"] = True
+    return result
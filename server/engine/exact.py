@@ -0,0 +1,258 @@
+# server/engine/exact.py
+"""
+Modo exacto de suggest_team (constraints.exact = true).
+
+En el modo normal need_roles sólo suma puntos e include_types filtra el pool,
+así que un equipo puede salir sin un rol pedido. Aquí son restricciones duras,
+junto con la cláusula de especie y el cupo de restringidos:
+- need_roles: cada rol lo cubre al menos un miembro (infer_roles); los roles
+  de movimientos también los cubren filas sin learnset, y el informe las
+  lista en `unverified`
+- include_types: cada tipo lo lleva al menos un miembro (no filtra el pool)
+- el resto de filtros (min_speed, exclude_types, query...) acotan el pool como siempre
+
+Cada requisito es un bit y cada candidato la máscara de los que cubre (roles
+de tools.roles.role_table, tipos desde DexStore.stab). La búsqueda es
+un backtracking de cobertura: se ramifica sobre el requisito pendiente con
+menos candidatos, en orden de puntuación, y se poda con la cota huecos × bits
+por candidato. Los candidatos con la misma máscara sólo se distinguen por las
+cláusulas, así que de cada máscara se prueban a lo sumo REPRESENTATIVES de
+números de Pokédex distintos: con 5 compañeros como mucho se bloquean 5, así
+que la búsqueda sigue siendo exacta. El resto del equipo lo rellena Draft.
+
+Si no hay equipo se devuelve la relajación mínima: el menor conjunto de
+requisitos y filtros que hay que quitar para que lo haya.
+"""
+from itertools import combinations
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from ..core.deadline import Deadline, expired
+from ..tools.learnsets import no_learnset
+from ..tools.query import combined_mask
+from ..tools.roles import role_table
+from ..tools.store import TYPE_INDEX, DexStore
+from .builder import DIVERSITY_JITTER, FILTER_KEYS, TEAM_SIZE, ConstraintError, Draft, _as_list, constraint_queries
+
+# Representantes por (máscara, restringido): 1 por compañero posible + 1
+REPRESENTATIVES = TEAM_SIZE
+# Nodos del backtracking por búsqueda antes de darla por imposible
+MAX_NODES = 200_000
+# Elementos extra (además de los imposibles) que se prueban a quitar en la relajación
+MAX_RELAX = 3
+MAX_REQUIREMENTS = 62
+
+
+class SearchExhausted(Exception):
+    pass
+
+
+class TooManyRequirements(ConstraintError):
+    """Más roles/tipos de los que caben en la máscara de bits (MAX_REQUIREMENTS)."""
+
+
+def requirements(store: DexStore, c: Dict[str, Any]) -> List[Tuple[str, np.ndarray]]:
+    """(etiqueta, filas que lo cubren) por cada rol y tipo pedido; un rol o tipo desconocido es ConstraintError."""
+    pos, table = role_table(store)
+    roles = [r for r in (str(r).strip().lower() for r in _as_list(c.get("need_roles"))) if r]
+    unknown = sorted({r for r in roles if r not in pos})
+    if unknown:
+        raise ConstraintError(f"unknown need_roles: {', '.join(unknown)} (roles: {', '.join(sorted(pos))})")
+    out: Dict[str, np.ndarray] = {}
+    for r in roles:
+        out.setdefault(f"need_roles:{r}", table[:, pos[r]] | no_learnset(store, r))
+    types = [t for t in (str(t).strip().capitalize() for t in _as_list(c.get("include_types"))) if t]
+    unknown = sorted({t for t in types if t not in TYPE_INDEX})
+    if unknown:
+        raise ConstraintError(f"unknown include_types: {', '.join(unknown)}")
+    for t in types:
+        out.setdefault(f"include_types:{t}", store.stab[:, TYPE_INDEX[t]])
+    if len(out) > MAX_REQUIREMENTS:
+        raise TooManyRequirements(f"exact mode supports at most {MAX_REQUIREMENTS} need_roles/include_types "
+                                  f"(got {len(out)})")
+    return list(out.items())
+
+
+def filter_masks(store: DexStore, c: Dict[str, Any], tr_mode: bool) -> Dict[str, np.ndarray]:
+    """Una máscara de filas por filtro activo (las mismas consultas que candidate_pool, sin include_types)."""
+    keys = tuple(k for k in FILTER_KEYS if k != "include_types")
+    return {k: combined_mask(store, [q]) for k, q in constraint_queries(c, tr_mode, keys).items()}
+
+
+class CoverSearch:
+    """Backtracking de cobertura sobre los candidatos de un Draft (índices de draft.cands)."""
+
+    def __init__(self, draft: Draft, masks: Sequence[int], allowed: np.ndarray, order: Sequence[int]):
+        self.draft = draft
+        self.masks = masks
+        # cláusula de especie por número de Pokédex y restringidos según FormatRules (como Draft)
+        self.number = draft.number.tolist()
+        self.restricted = draft.restricted.tolist()
+        groups: Dict[Tuple[int, bool], List[int]] = {}
+        self.by_bit: Dict[int, List[int]] = {}
+        for j in order:
+            m = masks[j]
+            if not m or not allowed[j]:
+                continue
+            g = groups.setdefault((m, self.restricted[j]), [])
+            if len(g) >= REPRESENTATIVES or any(self.number[j] == self.number[k] for k in g):
+                continue
+            g.append(j)
+            bit = 0
+            while m:
+                if m & 1:
+                    self.by_bit.setdefault(bit, []).append(j)
+                m >>= 1
+                bit += 1
+        self.max_bits = max((bin(m).count("1") for m, _ in groups), default=0)
+        self.nodes = 0
+
+    def solve(self, need: int, previous: Sequence[Set[int]] = (), max_overlap: int = TEAM_SIZE) -> Optional[List[int]]:
+        """Candidatos que cubren todos los bits de `need` en los huecos libres, o None si no existen."""
+        if any(not self.by_bit.get(b) for b in _bits(need)):
+            return None
+        d = self.draft
+        self.nodes = 0
+        return self._dfs(need, TEAM_SIZE - len(d.core), [], set(d.numbers), d.n_restricted,
+                         list(previous), [0] * len(previous), max_overlap)
+
+    def _dfs(self, need, slots, chosen, numbers, n_restricted, previous, overlap, max_overlap):
+        if not need:
+            return list(chosen)
+        if slots == 0 or bin(need).count("1") > slots * self.max_bits:
+            return None
+        self.nodes += 1
+        if self.nodes > MAX_NODES:
+            raise SearchExhausted()
+        # el requisito pendiente con menos candidatos
+        bit = min(_bits(need), key=lambda b: len(self.by_bit.get(b, ())))
+        for j in self.by_bit.get(bit, ()):
+            number, restricted = self.number[j], self.restricted[j]
+            if number in numbers:
+                continue
+            if restricted and n_restricted >= self.draft.restricted_cap:
+                continue
+            hits = [t for t, team in enumerate(previous) if j in team]
+            if any(overlap[t] >= max_overlap for t in hits):
+                continue
+            chosen.append(j)
+            numbers.add(number)
+            for t in hits:
+                overlap[t] += 1
+            found = self._dfs(need & ~self.masks[j], slots - 1, chosen, numbers,
+                              n_restricted + restricted, previous, overlap, max_overlap)
+            chosen.pop()
+            numbers.discard(number)
+            for t in hits:
+                overlap[t] -= 1
+            if found is not None:
+                return found
+        return None
+
+
+def _bits(mask: int) -> List[int]:
+    out, bit = [], 0
+    while mask:
+        if mask & 1:
+            out.append(bit)
+        mask >>= 1
+        bit += 1
+    return out
+
+
+def exact_teams(store: DexStore, draft: Draft, c: Dict[str, Any], tr_mode: bool, num_teams: int = 1, max_overlap: int = 3, seed: Optional[int] = 0,
+                deadline: Optional[Deadline] = None) -> Tuple[List[List[Any]], Dict[str, Any]]:
+    """
+    Equipos que cumplen todos los requisitos y filtros, más el informe {feasible, requirements, covered_by,
+    relaxed}. Sin solución, los equipos se construyen con la relajación mínima aplicada.
+    """
+    rows = draft.rows
+    reqs = requirements(store, c)
+    filters = filter_masks(store, c, tr_mode)
+    req_cover = np.array([cov[rows] for _, cov in reqs], dtype=np.int64).reshape(len(reqs), len(rows))
+    masks = (req_cover << np.arange(len(reqs), dtype=np.int64)[:, None]).sum(axis=0).tolist()
+    core_rows = [store.resolve(p.name) for p in draft.core]
+    core_mask = sum(1 << k for k, (_, cov) in enumerate(reqs) if cov[core_rows].any()) if core_rows else 0
+    full = (1 << len(reqs)) - 1
+    labels = [label for label, _ in reqs]
+    bit_of = {label: k for k, label in enumerate(labels)}
+    order = list(range(len(rows)))  # draft.cands ya va de mayor a menor puntuación
+
+    def pool(dropped: Sequence[str] = ()) -> np.ndarray:
+        allowed = np.ones(len(rows), dtype=bool)
+        for name, m in filters.items():
+            if name not in dropped:
+                allowed &= m[rows]
+        return allowed
+
+    def need_of(dropped: Sequence[str]) -> int:
+        return full & ~core_mask & ~sum(1 << bit_of[d] for d in dropped if d in bit_of)
+
+    def attempt(dropped: Sequence[str], total: np.ndarray, order: Sequence[int], previous: List[Set[int]],
+                blocked: np.ndarray) -> Optional[List[int]]:
+        allowed = pool(dropped)
+        try:
+            cover = CoverSearch(draft, masks, allowed, order).solve(need_of(dropped), previous, max_overlap)
+        except SearchExhausted:
+            return None
+        if cover is None:
+            return None
+        chosen = draft.complete(total, blocked, max_overlap, fixed=cover, allowed=allowed)
+        return chosen if len(draft.core) + len(chosen) == TEAM_SIZE else None
+
+    empty = np.zeros((0, len(rows)), dtype=bool)
+    report: Dict[str, Any] = {"feasible": True, "requirements": labels, "filters": sorted(filters)}
+    dropped: Tuple[str, ...] = ()
+    first = attempt(dropped, draft.base_total, order, [], empty)
+    if first is None:
+        # imposibles aun sin filtros: siempre hay que quitarlos
+        everything = pool(tuple(filters))
+        forced = tuple(labels[b] for b in _bits(need_of(())) if not req_cover[b][everything].any())
+        items = [label for label in labels if label not in forced] + sorted(filters)
+        for size in range(0, min(MAX_RELAX, len(items)) + 1):
+            for extra in combinations(items, size):
+                first = attempt(forced + extra, draft.base_total, order, [], empty)
+                if first is not None:
+                    dropped = forced + extra
+                    break
+            if first is not None or expired(deadline):
+                break
+        if first is None:
+            dropped = tuple(labels) + tuple(sorted(filters))
+            first = draft.complete(draft.base_total, empty, max_overlap, allowed=pool(dropped))
+        report.update(feasible=False, relaxed=list(dropped))
+
+    teams = [first]
+    previous = [set(first)]
+    blocked = np.zeros((1, len(rows)), dtype=bool)
+    blocked[0, first] = True
+    rng = np.random.default_rng(seed)
+    for _ in range(1, num_teams):
+        if expired(deadline):
+            break
+        total = draft.base_total + rng.normal(0.0, DIVERSITY_JITTER, len(rows)).astype(np.int64)
+        chosen = attempt(dropped, total, np.argsort(-total, kind="stable").tolist(), previous, blocked)
+        if chosen is None:
+            break  # ya no quedan equipos que cumplan con ese solapamiento
+        teams.append(chosen)
+        previous.append(set(chosen))
+        row = np.zeros((1, len(rows)), dtype=bool)
+        row[0, chosen] = True
+        blocked = np.vstack([blocked, row])
+
+    members = [draft.members(chosen) for chosen in teams]
+    covered: Dict[str, List[str]] = {}
+    unverified: Dict[str, List[str]] = {}
+    for label, cov in reqs:
+        if label not in dropped:
+            covered[label] = [p.name for p in members[0] if cov[store.resolve(p.name)]]
+            guess = no_learnset(store, label.partition(":")[2]) if label.startswith("need_roles:") else None
+            if guess is not None and guess.any():
+                names = [n for n in covered[label] if guess[store.resolve(n)]]
+                if names:
+                    unverified[label] = names
+    report["covered_by"] = covered
+    if unverified:
+        report["unverified"] = unverified
+    return members, report
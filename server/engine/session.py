@@ -0,0 +1,263 @@
+# server/engine/session.py
+"""
+Sesiones de construcción paso a paso (create_session / update_session).
+
+Sin sesión, cada suggest_member o team_synergy recibe el equipo entero y lo
+recalcula todo desde los nombres. Una TeamSession guarda el equipo en el
+servidor con acumuladores que sólo cambian por el miembro que entra o sale:
+- sinergia: suma de filas `against` (huecos), conteo de resistencias y
+  conteo de cobertura ofensiva por modo (stab, moves, learnset) -> O(18)
+- cláusulas: cuántos miembros bloquean cada fila (mismo número de Pokédex,
+  como validate_team) y restringidos usados -> pool de candidatos sin recorrer el equipo
+- afinidad de cada legal con el equipo (PairMatrix) -> una fila por cambio
+Así suggest_member y team_synergy con `session` cuestan O(cambio) más la
+selección vectorizada de siempre, y sus argumentos no llevan el equipo.
+
+SessionStore acota la memoria: como mucho VGC_SESSION_MAX sesiones (se
+descarta la usada hace más tiempo) y las que llevan VGC_SESSION_TTL_S
+segundos sin uso caducan.
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ..core.config import env_int
+from ..core.legality import format_rules
+from ..tools.learnsets import Learnsets
+from ..tools.pairs import default_pairs
+from ..tools.store import DexStore
+from ..tools.synergy import ALL_TYPES, OFFENSIVE
+from .builder import TEAM_SIZE
+
+DEFAULT_MAX_SESSIONS = 256
+DEFAULT_TTL_S = 1800
+COVERAGE_MODES = ("stab", "moves", "learnset")
+
+# SUPER[a, d]: el tipo atacante a golpea x2 (o más) al tipo defensor d
+SUPER = np.array([[OFFENSIVE[a][d] >= 2.0 for d in ALL_TYPES] for a in ALL_TYPES], dtype=bool)
+
+
+class SessionError(ValueError):
+    """Sesión desconocida o caducada."""
+
+
+class Member:
+    __slots__ = ("row", "set", "locked", "blocks", "against", "cover")
+
+    def __init__(self, row: int, pokemon_set: Dict[str, Any], locked: bool, blocks: np.ndarray,
+                 against: np.ndarray, cover: Dict[str, np.ndarray]):
+        self.row = row
+        self.set = pokemon_set
+        self.locked = locked
+        self.blocks = blocks      # filas con su número de Pokédex (cláusula de especie)
+        self.against = against    # (18,) multiplicadores recibidos
+        self.cover = cover        # modo -> (18,) tipos defensores a los que pega x2
+
+
+class TeamSession:
+    """Equipo en construcción con sus acumuladores; los cambios pasan por add/remove (bajo self.lock)."""
+
+    def __init__(self, sid: str, fmt: str, store: DexStore, ls: Learnsets):
+        self.id = sid
+        self.fmt = fmt
+        self.store = store
+        self.ls = ls
+        rules = format_rules(fmt)
+        self.legal = rules.legal
+        self.restricted = rules.restricted
+        self.restricted_cap = rules.restricted_cap
+        self.numbers = rules.numbers
+        self.pairs = default_pairs(fmt)
+        self.members: List[Member] = []
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+
+        n = len(store)
+        self.blocked = np.zeros(n, dtype=np.int16)
+        self.against_sum = np.zeros(len(ALL_TYPES))
+        self.resists = np.zeros(len(ALL_TYPES), dtype=np.int64)
+        self.cover = {m: np.zeros(len(ALL_TYPES), dtype=np.int64) for m in COVERAGE_MODES}
+        self.n_restricted = 0
+        self.n_with_moves = 0
+        # afinidad de cada fila legal con el equipo (orden de PairMatrix.rows)
+        self.affinity = np.zeros(len(self.pairs.rows), dtype=np.int64)
+
+    # --- cambios ---
+    def add(self, item: Any, locked: bool = False) -> Optional[str]:
+        """Añade un Pokémon (nombre o set); devuelve el motivo si no se puede."""
+        s = {"name": item} if isinstance(item, str) else dict(item)
+        name = str(s.get("name") or "").strip()
+        row = self.store.resolve(name) if name else None
+        if row is None:
+            return "unknown Pokémon"
+        if not self.legal[row]:
+            return f"not legal in {self.fmt}"
+        if len(self.members) >= TEAM_SIZE:
+            return "team is full"
+        if self.blocked[row]:
+            return "species clause"
+        if self.restricted[row] and self.n_restricted >= self.restricted_cap:
+            return f"{self.fmt} allows {self.restricted_cap} restricted"
+        s["name"] = self.store.names[row]
+        store = self.store
+        blocks = np.nonzero(self.numbers == self.numbers[row])[0]
+        stab = store.stab[row]
+        moves = [str(m) for m in s.get("moves") or [] if str(m).strip()]
+        move_types = np.zeros(len(ALL_TYPES), dtype=bool)
+        for t in self.ls.move_types(moves):
+            move_types[ALL_TYPES.index(t)] = True
+        learn_row = self.ls.store.resolve(s["name"])
+        learned = self.ls.attack_types[learn_row] if learn_row is not None else np.zeros(len(ALL_TYPES), dtype=bool)
+        cover = {mode: SUPER[types].any(axis=0).astype(np.int64)
+                 for mode, types in (("stab", stab), ("moves", stab | move_types), ("learnset", stab | learned))}
+        m = Member(row, s, locked, blocks, store.against[row].astype(np.float64), cover)
+        self._apply(m, +1)
+        self.members.append(m)
+        return None
+
+    def remove(self, name: str) -> Optional[str]:
+        m = self.find(name)
+        if m is None:
+            return "not in team"
+        if m.locked:
+            return "locked"
+        self._apply(m, -1)
+        self.members.remove(m)
+        return None
+
+    def set_locked(self, name: str, locked: bool) -> Optional[str]:
+        m = self.find(name)
+        if m is None:
+            return "not in team"
+        m.locked = locked
+        return None
+
+    def find(self, name: str) -> Optional[Member]:
+        row = self.store.resolve(str(name or "").strip())
+        return next((m for m in self.members if m.row == row), None)
+
+    def _apply(self, m: Member, sign: int) -> None:
+        self.blocked[m.blocks] += sign
+        self.against_sum += sign * m.against
+        self.resists += sign * (m.against <= 0.5)
+        for mode, vec in m.cover.items():
+            self.cover[mode] += sign * vec
+        self.n_restricted += sign * int(self.restricted[m.row])
+        self.n_with_moves += sign * bool(m.set.get("moves"))
+        self.affinity += sign * self.pairs.scores(self.pairs.rows, [m.row])
+
+    # --- lecturas ---
+    def rows(self) -> List[int]:
+        return [m.row for m in self.members]
+
+    def pool(self) -> np.ndarray:
+        """Máscara (N,) de legales que aún pueden entrar (cláusula de especie y cupo de restringidos)."""
+        mask = self.legal & (self.blocked == 0)
+        if self.n_restricted >= self.restricted_cap:
+            mask = mask & ~self.restricted
+        return mask
+
+    def affinity_of(self, rows: np.ndarray) -> np.ndarray:
+        """Afinidad con el equipo de esas filas (0 si no son legales), como PairMatrix.scores(rows, equipo)."""
+        pos = self.pairs.pos[rows]
+        return np.where(pos >= 0, self.affinity[np.maximum(pos, 0)], 0)
+
+    def synergy(self, coverage: Optional[str] = None) -> Dict[str, Any]:
+        """Lo mismo que team_synergy con el equipo de la sesión (por defecto moves si algún miembro los trae)."""
+        mode = coverage or ("moves" if self.n_with_moves else "stab")
+        if mode not in COVERAGE_MODES:
+            raise ValueError(f"coverage must be one of {', '.join(COVERAGE_MODES)}")
+        n = len(self.members)
+        holes = (self.against_sum > 1.5 * n) if n else np.zeros(len(ALL_TYPES), dtype=bool)
+        return {
+            "coverage_offensive": dict(zip(ALL_TYPES, self.cover[mode].tolist())),
+            "resistances_defensive": dict(zip(ALL_TYPES, self.resists.tolist())),
+            "holes": [t for t, bad in zip(ALL_TYPES, holes.tolist()) if bad],
+        }
+
+    def state(self) -> Dict[str, Any]:
+        return {
+            "session": self.id,
+            "format": self.fmt,
+            "members": [dict(m.set, locked=m.locked) for m in self.members],
+            "slots_left": TEAM_SIZE - len(self.members),
+            "restricted": {"used": self.n_restricted, "cap": self.restricted_cap},
+            "pool_size": int(self.pool().sum()) if len(self.members) < TEAM_SIZE else 0,
+            "synergy": self.synergy(),
+        }
+
+    def update(self, add: Sequence[Any] = (), remove: Sequence[str] = (), lock: Sequence[str] = (),
+               unlock: Sequence[str] = ()) -> List[Dict[str, str]]:
+        """Aplica remove, unlock, add y lock en ese orden; devuelve lo rechazado con su motivo."""
+        rejected = []
+        locking = {self.store.resolve(str(n)) for n in lock}
+        for name in unlock:
+            why = self.set_locked(name, False)
+            if why:
+                rejected.append({"unlock": str(name), "reason": why})
+        for name in remove:
+            why = self.remove(name)
+            if why:
+                rejected.append({"remove": str(name), "reason": why})
+        for item in add:
+            name = item if isinstance(item, str) else (item or {}).get("name")
+            why = self.add(item, locked=self.store.resolve(str(name or "")) in locking)
+            if why:
+                rejected.append({"add": str(name), "reason": why})
+        for name in lock:
+            why = self.set_locked(name, True)
+            if why:
+                rejected.append({"lock": str(name), "reason": why})
+        return rejected
+
+
+class SessionStore:
+    """Sesiones por id, LRU acotado en número y con caducidad por inactividad. Seguro entre hilos."""
+
+    def __init__(self, max_sessions: Optional[int] = None, ttl_s: Optional[float] = None):
+        self.max_sessions = max_sessions or env_int("VGC_SESSION_MAX", DEFAULT_MAX_SESSIONS)
+        self.ttl_s = ttl_s or env_int("VGC_SESSION_TTL_S", DEFAULT_TTL_S)
+        self._data: "OrderedDict[str, TeamSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _expire(self, now: float) -> None:
+        while self._data:
+            sid, s = next(iter(self._data.items()))
+            if now - s.last_used <= self.ttl_s and len(self._data) <= self.max_sessions:
+                break
+            del self._data[sid]
+
+    def create(self, fmt: str, store: DexStore, ls: Learnsets) -> TeamSession:
+        s = TeamSession(uuid.uuid4().hex[:16], fmt, store, ls)
+        with self._lock:
+            self._data[s.id] = s
+            self._expire(s.last_used)
+        return s
+
+    def get(self, sid: Any) -> TeamSession:
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            s = self._data.get(str(sid or ""))
+            if s is None:
+                raise SessionError(f"unknown or expired session: {sid}")
+            s.last_used = now
+            self._data.move_to_end(s.id)
+        return s
+
+    def close(self, sid: Any) -> bool:
+        with self._lock:
+            return self._data.pop(str(sid or ""), None) is not None
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+@lru_cache(maxsize=None)
+def default_sessions() -> SessionStore:
+    return SessionStore()
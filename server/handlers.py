@@ -0,0 +1,533 @@
+# server/handlers.py
+"""
+Handlers de las herramientas MCP (registrados en server.registry.TOOLS).
+
+Aquí viven todas las dependencias pesadas (NumPy, pydantic, dataset e índices):
+server.main no importa este módulo hasta el primer tools/call o el
+calentamiento en segundo plano, así que initialize y tools/list no las pagan.
+"""
+import logging
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from pydantic import ValidationError
+
+from .core.config import archive_root
+from .core.deadline import Deadline, expired
+from .core.formats import FORMATS, format_from_label
+from .core.legality import format_rules, is_impossible_form, validate_teams
+from .core.models import SuggestParams, Team
+from .engine import suggest_team
+from .engine.builder import ConstraintError
+from .engine.session import SessionError, TeamSession, default_sessions
+from .registry import TOOLS, InvalidParams
+from .tools import showdown
+from .tools.analytics import archive_stats, confine
+from .tools.damage import damage_matrix
+from .tools.export import team_to_showdown, teams_to_showdown
+from .tools.learnsets import MOVE_ROLES, default_learnsets
+from .tools.pairs import default_pairs
+from .tools.query import Plan, QueryError, compile_query, from_constraints, select
+from .tools.similar import similar_pokemon, similarity_index
+from .tools.simulate import UnknownTeam, simulate_matchup
+from .tools.speed import MODIFIERS, SPREADS, default_speed_index
+from .tools.spreads import optimize_spreads
+from .tools.store import default_store
+from .tools.synergy import ALL_TYPES, compute_synergy
+from .tools.threats import team_threats
+
+logger = logging.getLogger(__name__)
+
+def _clean_name(s: str) -> str:
+    return " ".join(str(s or "").split())
+
+def _is_impossible_gen8(name: str) -> bool:
+    return is_impossible_form(_clean_name(name))
+
+def _legal_names(fmt: str) -> frozenset:
+    """Nombres legales en el formato según el motor de reglas (server/core/legality.py)."""
+    return format_rules(fmt).legal_names
+
+_LEGAL_ROWS: Dict[Any, Any] = {}
+
+def _legal_rows(fmt: str, fully_evolved: bool = True):
+    """Filas del DexStore legales en el formato (cacheado por formato)."""
+    key = (fmt, fully_evolved)
+    if key not in _LEGAL_ROWS:
+        rules = format_rules(fmt)
+        rows = np.nonzero(rules.legal)[0]
+        if fully_evolved:
+            rows = [i for i in rows if rules.store.pokemon[i].final_evolution is not False]
+        _LEGAL_ROWS[key] = list(map(int, rows))
+    return _LEGAL_ROWS[key]
+
+def threats_for_team(arguments: Dict[str, Any], deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+    store = default_store()
+    ls = default_learnsets()
+    members = [m for m in arguments["team"]["pokemon"] if store.resolve(m.get("name") or "") is not None]
+    team_rows = [store.resolve(m["name"]) for m in members]
+    if arguments.get("threats"):
+        pool_rows = store.ids(_as_list(arguments["threats"]))
+    else:
+        pool_rows = _legal_rows((arguments.get("format") or "vgc2022").strip().lower(),
+                                bool(arguments.get("fully_evolved", True)))
+    team_extra = np.array([_type_mask(ls.move_types(_as_list(m.get("moves")))) for m in members], dtype=bool)
+    pool_extra = None
+    if arguments.get("coverage") == "learnset":
+        pool_extra = ls.attack_types[pool_rows]
+    top = int(arguments.get("top", 10))
+    result = team_threats(store, team_rows, pool_rows, team_extra.reshape(len(members), len(ALL_TYPES)),
+                          pool_extra, top=top)
+    if arguments.get("damage") and result["threats"]:
+        if expired(deadline):
+            result["truncated"] = True  # sin tiempo para refinar con la calculadora de daño
+        else:
+            # refina sólo el top-K con la calculadora de daño
+            dm = damage_matrix(members, [t["name"] for t in result["threats"]])
+            for k, t in enumerate(result["threats"]):
+                t["damage"] = {
+                    "best_ko_on_team": max(dm["threats_vs_team"]["ko"][k], default=0.0),
+                    "team_best_ko": max((row[k] for row in dm["team_vs_threats"]["ko"]), default=0.0),
+                }
+    return result
+
+def _type_mask(types) -> List[bool]:
+    return [t in types for t in ALL_TYPES]
+
+def _as_list(x):
+    """Normaliza a lista (Claude a veces manda string en vez de array)."""
+    if x is None:
+        return []
+    return x if isinstance(x, list) else [x]
+
+# Funciones de herramientas
+def import_showdown(arguments: Dict[str, Any], deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+    """Parsea uno o varios pastes de Showdown y valida los sets contra el dataset."""
+    validate = bool(arguments.get("validate", True))
+    pastes = _as_list(arguments.get("pastes"))
+    if arguments.get("paste"):
+        pastes = [arguments["paste"]] + pastes
+    teams = showdown.parse_pastes((str(p) for p in pastes), validate=validate, deadline=deadline)
+    if validate and teams:
+        _check_legality(teams, arguments.get("format"))
+    result = {
+        "teams": teams,
+        "count": len(teams),
+        "invalid": sum(1 for t in teams if t.get("errors")),
+    }
+    if deadline is not None and deadline.truncated:
+        result["truncated"] = True
+    return result
+
+def _check_legality(teams: List[Dict[str, Any]], default_fmt: Optional[str] = None) -> None:
+    """Añade a team["errors"] los fallos de legalidad, validando en bloque por formato."""
+    by_fmt: Dict[str, List[int]] = {}
+    default = format_from_label(default_fmt or "", default="vgc2022")
+    for k, t in enumerate(teams):
+        fmt = format_from_label(t.get("format") or "", default=default)
+        by_fmt.setdefault(fmt, []).append(k)
+    for fmt, idx in by_fmt.items():
+        for k, res in zip(idx, validate_teams([teams[k] for k in idx], fmt)):
+            if not res["valid"]:
+                errs = teams[k].setdefault("errors", [])
+                errs.extend(e for e in res["errors"] if e not in errs)
+
+def validate_team_tool(arguments: Dict[str, Any]) -> Dict[str, Any]:
+    fmt = (arguments.get("format") or "vgc2022").strip().lower()
+    teams = _as_list(arguments.get("teams"))
+    if arguments.get("team"):
+        teams = [arguments["team"]] + teams
+    results = validate_teams(teams, fmt)
+    return {
+        "format": fmt,
+        "count": len(results),
+        "invalid": sum(1 for r in results if not r["valid"]),
+        "results": results,
+    }
+
+def _check_speed_conditions(spread: str, target_spread: str, modifier: str, target_modifier: str) -> None:
+    for value, allowed in ((spread, SPREADS), (target_spread, SPREADS), (modifier, MODIFIERS), (target_modifier, MODIFIERS)):
+        if value not in allowed:
+            raise InvalidParams(f"unknown speed condition: {value}")
+
+def speed_tiers_tool(arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """Quién se mueve antes que un objetivo (o una velocidad) bajo unas condiciones."""
+    index = default_speed_index()
+    store = index.store
+    spread = arguments.get("spread") or "positive"
+    modifier = arguments.get("modifier") or "none"
+    target_spread = arguments.get("target_spread") or "positive"
+    target_modifier = arguments.get("target_modifier") or "none"
+    _check_speed_conditions(spread, target_spread, modifier, target_modifier)
+    trick_room = bool(arguments.get("trick_room", False))
+    limit = int(arguments.get("limit", 30))
+    if limit < 1:
+        raise InvalidParams("limit must be >= 1")
+
+    target = arguments.get("target")
+    if target:
+        row = store.resolve(target)
+        if row is None:
+            raise InvalidParams(f"unknown Pokémon: {target}")
+        target = store.names[row]
+        speed = index.speed_of(row, target_spread, target_modifier)
+    elif arguments.get("speed") is not None:
+        speed = int(arguments["speed"])
+    else:
+        raise InvalidParams("target or speed is required")
+
+    fmt = (arguments.get("format") or "vgc2022").strip().lower()
+    legal = format_rules(fmt).legal
+    split = index.compare(speed, spread, modifier, trick_room)
+
+    def _rows(key: str) -> List[Dict[str, Any]]:
+        rows, speeds = split[key]
+        keep = legal[rows]
+        return [{"name": store.names[r], "speed": int(v)} for r, v in zip(rows[keep].tolist(), speeds[keep].tolist())]
+
+    first = _rows("first")
+    return {
+        "target": target,
+        "target_speed": speed,
+        "condition": {"spread": spread, "modifier": modifier, "trick_room": trick_room, "format": fmt},
+        "count": len(first),
+        "first": first[:limit],
+        "ties": [t for t in _rows("ties") if t["name"] != target],
+    }
+
+def _stateless(arguments: Dict[str, Any]) -> bool:
+    """Política de caché: con `session` el resultado depende del estado de la sesión, no de los argumentos."""
+    return not arguments.get("session")
+
+def _model(cls, data: Any):
+    """Valida en la frontera de la API: errores de pydantic -> InvalidParams (-32602)."""
+    try:
+        return cls(**data)
+    except ValidationError as e:
+        raise InvalidParams(str(e)) from None
+
+def _query(text: str) -> Plan:
+    """Plan compilado (cacheado); una consulta mal formada es un error de argumentos (-32602)."""
+    try:
+        return compile_query(text)
+    except QueryError as e:
+        raise InvalidParams(f"query: {e}") from None
+
+def _query_mask(text: str, store) -> np.ndarray:
+    """Máscara de filas de la consulta; lo que falla al evaluarla (p. ej. role:bogus) también es -32602."""
+    plan = _query(text)
+    try:
+        return plan.mask(store)
+    except QueryError as e:
+        raise InvalidParams(f"query: {e}") from None
+
+def _select(plan: Plan, rows: np.ndarray, score: np.ndarray, limit: int, extra: Optional[np.ndarray] = None):
+    store = default_store()
+    try:
+        if extra is not None:
+            keep = extra[rows]
+            rows, score = rows[keep], score[keep]
+        return select(plan, store, rows, score, limit)
+    except QueryError as e:
+        raise InvalidParams(f"query: {e}") from None
+
+def _records(store, rows: np.ndarray, abilities: bool = False) -> List[Dict[str, Any]]:
+    """Filas (ya ordenadas) como registros del CSV."""
+    out = []
+    for r in rows.tolist():
+        hp, att, deff, spa, spd, spe = store.stats[r].tolist()
+        p = store.pokemon[r]
+        rec = {"Name": store.names[r], "Type 1": p.type1, "Type 2": p.type2,
+               "HP": hp, "Att": att, "Def": deff, "Spa": spa, "Spd": spd, "Spe": spe}
+        if abilities:
+            rec["Abilities"] = store.abilities[r]
+        rec["Bulk"] = hp + deff + spd
+        out.append(rec)
+    return out
+
+@TOOLS.tool("suggest_team", resources=(default_store,))
+def _suggest_team_tool(arguments: Dict[str, Any], deadline: Deadline) -> Dict[str, Any]:
+    suggest_params = _model(SuggestParams, arguments)
+    if suggest_params.format not in {"vgc2020", "vgc2021", "vgc2022"}:
+        raise InvalidParams("Dataset soporta Gen 1–8. Usa uno de: vgc2020, vgc2021, vgc2022.")
+    try:
+        return suggest_team(suggest_params, deadline)
+    except QueryError as e:
+        raise InvalidParams(f"query: {e}") from None
+    except ConstraintError as e:
+        raise InvalidParams(str(e)) from None
+
+@TOOLS.tool("export_showdown")
+def _export_showdown_tool(arguments: Dict[str, Any], deadline: Deadline) -> str:
+    if arguments.get("teams"):
+        return teams_to_showdown([_model(Team, t) for t in arguments["teams"]])
+    return team_to_showdown(_model(Team, arguments["team"]))
+
+@TOOLS.tool("import_showdown", resources=(default_store,))
+def _import_showdown_tool(arguments: Dict[str, Any], deadline: Deadline) -> Dict[str, Any]:
+    return import_showdown(arguments, deadline)
+
+# no se cachea en memoria: el contenido del directorio puede cambiar
+@TOOLS.tool("archive_stats", cache=False, resources=(default_store,))
+def _archive_stats_tool(arguments: Dict[str, Any], deadline: Deadline) -> Dict[str, Any]:
+    fmt = arguments.get("format")
+    root = archive_root()
+    try:
+        path = confine(str(arguments["path"]), root)
+    except ValueError as e:
+        raise InvalidParams(str(e)) from None
+    try:
+        return archive_stats(
+            str(path),
+            root=root,
+            top=int(arguments.get("top", 20)),
+            fmt=fmt.strip().lower() if fmt else None,
+            workers=arguments.get("workers"),
+            use_cache=bool(arguments.get("use_cache", True)),
+            deadline=deadline,
+        )
+    except FileNotFoundError as e:
+        raise InvalidParams(str(e)) from None
+
+@TOOLS.tool("validate_team", resources=(default_store,))
+def _validate_team_tool(arguments: Dict[str, Any], deadline: Deadline) -> Dict[str, Any]:
+    return validate_team_tool(arguments)
+
+@TOOLS.tool("damage_matrix", resources=(default_store, default_learnsets))
+def _damage_matrix_tool(arguments: Dict[str, Any], deadline: Deadline) -> Dict[str, Any]:
+    field = arguments.get("field") or {}
+    return damage_matrix(
+        arguments["team"]["pokemon"],
+        _as_list(arguments.get("threats")),
+        direction=arguments.get("direction", "both"),
+        weather=field.get("weather"),
+        doubles=bool(field.get("doubles", True)),
+        deadline=deadline,
+    )
+
+@TOOLS.tool("team_threats", resources=(default_store, default_learnsets))
+def _team_threats_tool(arguments: Dict[str, Any], deadline: Deadline) -> Dict[str, Any]:
+    return threats_for_team(arguments, deadline)
+
+@TOOLS.tool("speed_tiers", resources=(default_speed_index,))
+def _speed_tiers_tool(arguments: Dict[str, Any], deadline: Deadline) -> Dict[str, Any]:
+    return speed_tiers_tool(arguments)
+
+@TOOLS.tool("optimize_spreads", resources=(default_store, default_learnsets, default_speed_index))
+def _optimize_spreads_tool(arguments: Dict[str, Any], deadline: Deadline) -> Dict[str, Any]:
+    field = arguments.get("field") or {}
+    return optimize_spreads(
+        arguments["team"]["pokemon"],
+        _as_list(arguments.get("threats")),
+        mode=arguments.get("mode") or "survive",
+        weather=field.get("weather"),
+        doubles=bool(field.get("doubles", True)),
+        alternatives=int(arguments.get("alternatives", 3)),
+        deadline=deadline,
+    )
+
+@TOOLS.tool("simulate_matchup", resources=(default_store, default_learnsets))
+def _simulate_matchup_tool(arguments: Dict[str, Any], deadline: Deadline) -> Dict[str, Any]:
+    field = arguments.get("field") or {}
+    opponents = ([arguments["opponent"]] if arguments.get("opponent") else []) + _as_list(arguments.get("opponents"))
+    if not opponents:
+        raise InvalidParams("simulate_matchup needs 'opponent' or 'opponents'")
+    try:
+        return simulate_matchup(
+            arguments["team"]["pokemon"],
+            [o.get("pokemon") or [] for o in opponents],
+            games=int(arguments.get("games", 2000)),
+            seed=int(arguments.get("seed", 0)),
+            bring=int(arguments.get("bring", 4)),
+            weather=field.get("weather"),
+            trick_room=bool(field.get("trick_room", False)),
+            doubles=bool(field.get("doubles", True)),
+            names=[o.get("name") for o in opponents],
+            deadline=deadline,
+        )
+    except UnknownTeam as e:
+        raise InvalidParams(str(e)) from None
+
+@TOOLS.tool("pool_filter", resources=(default_store, default_speed_index, default_learnsets))
+def _pool_filter_tool(arguments: Dict[str, Any], deadline: Deadline) -> List[Dict[str, Any]]:
+    constraints = arguments.get("constraints", {}) or {}
+    limit = int(arguments.get("limit", 30))
+    store = default_store()
+
+    # Formato del filtro (por defecto vgc2022)
+    fmt = (constraints.get("format") or "vgc2022").strip().lower()
+    rows = np.nonzero(format_rules(fmt).legal)[0]
+
+    # filtros clásicos y `query` pasan por el mismo motor de consultas (planes cacheados)
+    try:
+        text = from_constraints(constraints)
+    except QueryError as e:
+        raise InvalidParams(f"constraints: {e}") from None
+    mask = _query_mask(text, store)
+    outspeeds = constraints.get("outspeeds")
+    if outspeeds:
+        o = {"target": outspeeds} if isinstance(outspeeds, str) else dict(outspeeds)
+        index = default_speed_index()
+        row = index.store.resolve(o.get("target") or "")
+        if row is None:
+            raise InvalidParams(f"unknown Pokémon: {o.get('target')}")
+        spread, modifier = o.get("spread") or "positive", o.get("modifier") or "none"
+        target_spread, target_modifier = o.get("target_spread") or "positive", o.get("target_modifier") or "none"
+        _check_speed_conditions(spread, target_spread, modifier, target_modifier)
+        speed = index.speed_of(row, target_spread, target_modifier)
+        first, _ = index.compare(speed, spread, modifier, bool(o.get("trick_room", False)))["first"]
+        mask = mask & np.isin(np.arange(len(store)), first)
+
+    # Top-N (prioriza Spe + atacante mayor) salvo que la consulta traiga `order by`
+    hp, att, deff, spa, spd, spe = store.stats[rows].astype(np.int64).T
+    score = spe + np.maximum(att, spa) + (hp + deff + spd) / 2
+    plan = _query(arguments.get("query") or "")
+    return _records(store, _select(plan, rows, score, limit, mask))
+
+@TOOLS.tool("team_synergy", cache=_stateless, resources=(default_store,))
+def _team_synergy_tool(arguments: Dict[str, Any], deadline: Deadline) -> Dict[str, Any]:
+    if arguments.get("session"):
+        session = _session(arguments)
+        with session.lock:
+            return session.synergy(arguments.get("coverage"))
+    if not arguments.get("team"):
+        raise InvalidParams("team_synergy needs 'team' or 'session'")
+    members = arguments["team"]["pokemon"]
+    store = default_store()
+    pairs = [(x, store.pokemon[store.resolve(x["name"])]) for x in members
+             if x.get("name") and store.resolve(x["name"]) is not None]
+    selected = [p for _, p in pairs]
+
+    # cobertura: stab (por defecto), moves (movimientos enviados) o learnset completo
+    coverage = arguments.get("coverage") or ("moves" if any(x.get("moves") for x, _ in pairs) else "stab")
+    attack_types = None
+    if coverage in ("moves", "learnset"):
+        ls = default_learnsets()
+        attack_types = []
+        for x, p in pairs:
+            if coverage == "moves":
+                attack_types.append(ls.move_types(_as_list(x.get("moves"))))
+            else:
+                row = ls.store.resolve(p.name)
+                types = ls.attack_types[row].nonzero()[0] if row is not None else []
+                attack_types.append({ALL_TYPES[t] for t in types})
+    syn = compute_synergy(selected, attack_types)
+    return syn.model_dump() if hasattr(syn, "model_dump") else syn
+
+# roles de suggest_member como consultas (los de movimientos: aprende alguno de MOVE_ROLES[rol])
+_MEMBER_ROLES = {
+    "special_attacker": "spa >= 100",
+    "physical_attacker": "atk >= 100",
+    "bulky": "bulk >= 360",
+    "support": 'ability:intimidate or ability:prankster or ability:regenerator or ability:"friend guard"',
+    "trick_room": "spe <= 60 and bulk >= 360",
+}
+
+def member_query(arguments: Dict[str, Any]) -> str:
+    """Los argumentos clásicos de suggest_member como consulta."""
+    min_speed = int(arguments.get("min_speed", 0))
+    role = arguments.get("role")
+    parts = []
+    if role == "fast":
+        min_speed = max(100, min_speed)
+    if min_speed:
+        parts.append(f"spe >= {min_speed}")
+    if arguments.get("required_ability"):
+        needles = [n.strip() for n in str(arguments["required_ability"]).split("|") if n.strip()]
+        parts.append("(" + " or ".join(f'ability:"{n}"' for n in needles) + ")")
+    if role in _MEMBER_ROLES:
+        parts.append("(" + _MEMBER_ROLES[role] + ")")
+    elif role in MOVE_ROLES:
+        parts.append("(" + " or ".join(f"move:{m}" for m in MOVE_ROLES[role]) + ")")
+    parts.extend(f'move:"{m}"' for m in _as_list(arguments.get("required_moves")) if str(m).strip())
+    return " and ".join(parts)
+
+@TOOLS.tool("suggest_member", cache=_stateless, resources=(default_store, default_speed_index, default_learnsets))
+def _suggest_member_tool(arguments: Dict[str, Any], deadline: Deadline) -> List[Dict[str, Any]]:
+    # Sugerencias rápidas (3–5) para construir por pasos
+    role = arguments.get("role")
+    store = default_store()
+    session = _session(arguments) if arguments.get("session") else None
+
+    fmt = session.fmt if session is not None else "vgc2022"
+    rows = np.nonzero(format_rules(fmt).legal)[0]
+    mask = _query_mask(member_query(arguments), store)
+
+    hp, att, deff, spa, spd, spe = store.stats[rows].astype(np.int64).T
+    bulk = hp + deff + spd
+    # puntuación simple para ordenar (puedes tunearla)
+    score = spe + np.maximum(att, spa) + bulk / 2
+    # Para TR, invierte la velocidad
+    if role == "trick_room":
+        score = (800 - spe) + bulk + np.maximum(att, spa) / 2
+    if session is not None:
+        # afinidad y pool ya acumulados en la sesión (cláusula de especie y restringidos incluidos)
+        with session.lock:
+            score = score + session.affinity_of(rows)
+            mask = mask & session.pool()
+    else:
+        core = store.ids(_as_list(arguments.get("core")))
+        if core:
+            score = score + default_pairs(fmt).scores(rows, core)
+            mask = mask & ~np.isin(np.arange(len(store)), core)
+    plan = _query(arguments.get("query") or "")
+    return _records(store, _select(plan, rows, score, 5, mask), abilities=True)
+
+@TOOLS.tool("similar_pokemon", resources=(default_store, similarity_index))
+def _similar_pokemon_tool(arguments: Dict[str, Any], deadline: Deadline) -> Dict[str, Any]:
+    fmt = (arguments.get("format") or "vgc2022").strip().lower()
+    if fmt not in FORMATS:
+        raise InvalidParams(f"format must be one of {', '.join(FORMATS)}")
+    store = default_store()
+    rules = format_rules(fmt)
+    mask = rules.legal
+    if str(arguments.get("query") or "").strip():
+        mask = mask & _query_mask(arguments["query"], store)
+    try:
+        found = similar_pokemon(str(arguments.get("pokemon") or ""), k=int(arguments.get("k", 10)), mask=mask,
+                                weights=arguments.get("weights"), same_species=bool(arguments.get("same_species")),
+                                fully_evolved=bool(arguments.get("fully_evolved", True)))
+    except ValueError as e:
+        raise InvalidParams(str(e)) from None
+    hits = found["hits"]
+    similar = _records(store, np.array([h["row"] for h in hits], dtype=np.int64), abilities=True)
+    for rec, h in zip(similar, hits):
+        rec["Distance"] = round(h["distance"], 4)
+        rec["Distances"] = {b: round(v, 4) for b, v in h["blocks"].items()}
+    target = store.resolve(found["target"])
+    return {"target": found["target"], "format": fmt, "target_legal": bool(rules.legal[target]), "similar": similar}
+
+SESSION_FORMATS = ("vgc2020", "vgc2021", "vgc2022")
+
+def _session(arguments: Dict[str, Any]) -> TeamSession:
+    try:
+        return default_sessions().get(arguments.get("session"))
+    except SessionError as e:
+        raise InvalidParams(str(e)) from None
+
+def _session_state(session: TeamSession, rejected: List[Dict[str, str]]) -> Dict[str, Any]:
+    out = session.state()
+    if rejected:
+        out["rejected"] = rejected
+    return out
+
+@TOOLS.tool("create_session", cache=False, resources=(default_store, default_learnsets))
+def _create_session_tool(arguments: Dict[str, Any], deadline: Deadline) -> Dict[str, Any]:
+    fmt = (arguments.get("format") or "vgc2022").strip().lower()
+    if fmt not in SESSION_FORMATS:
+        raise InvalidParams(f"format must be one of {', '.join(SESSION_FORMATS)}")
+    session = default_sessions().create(fmt, default_store(), default_learnsets())
+    with session.lock:
+        rejected = session.update(add=_as_list((arguments.get("team") or {}).get("pokemon")),
+                                  lock=_as_list(arguments.get("lock")))
+        return _session_state(session, rejected)
+
+@TOOLS.tool("update_session", cache=False)
+def _update_session_tool(arguments: Dict[str, Any], deadline: Deadline) -> Dict[str, Any]:
+    if arguments.get("close"):
+        return {"session": arguments.get("session"), "closed": default_sessions().close(arguments.get("session"))}
+    session = _session(arguments)
+    with session.lock:
+        rejected = session.update(add=_as_list(arguments.get("add")), remove=_as_list(arguments.get("remove")),
+                                  lock=_as_list(arguments.get("lock")), unlock=_as_list(arguments.get("unlock")))
+        return _session_state(session, rejected)
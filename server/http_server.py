@@ -0,0 +1,247 @@
+# server/http_server.py
+"""
+Transporte HTTP "streamable" de MCP (asyncio, sólo librería estándar).
+
+Un único proceso atiende a muchos clientes y comparte el dataset y las cachés:
+
+- POST /mcp   cuerpo JSON-RPC (objeto o batch). Respuesta application/json, o
+              text/event-stream (un evento "message" por respuesta) si el
+              cliente sólo acepta SSE.
+- GET  /mcp   405: el servidor no envía mensajes espontáneos.
+- DELETE /mcp cierra la sesión indicada en Mcp-Session-Id.
+- GET  /health
+
+`initialize` crea la sesión y devuelve su id en la cabecera Mcp-Session-Id;
+el resto de peticiones deben enviarla. Cada sesión tiene su propio dict de
+estado (modo de salida negociado, etc.), igual que la sesión stdio.
+
+Concurrencia: como mucho `max_concurrency` peticiones ejecutándose a la vez
+en un pool de hilos; hasta `max_pending` más esperan turno. Por encima de eso
+se responde 503 con Retry-After (backpressure en lugar de cola sin límite).
+Un batch reserva plaza para todos sus mensajes antes de ejecutar ninguno, y
+notifications/cancelled se atiende sin plaza para poder cancelar con el
+servidor lleno.
+"""
+import asyncio
+import json
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .core.encoding import dumps_compact
+
+logger = logging.getLogger(__name__)
+
+MCP_PATH = "/mcp"
+SESSION_HEADER = "mcp-session-id"
+MAX_BODY_BYTES = 8 * 1024 * 1024
+MAX_HEADER_LINES = 100
+# Métodos que se atienden en el acto, sin ocupar plaza del pool
+SLOTLESS = frozenset({"notifications/cancelled"})
+
+_REASONS = {
+    200: "OK", 202: "Accepted", 204: "No Content", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+Handler = Callable[[Dict[str, Any], Dict[str, Any]], Optional[Dict[str, Any]]]
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str = ""):
+        super().__init__(message or _REASONS.get(status, ""))
+        self.status = status
+
+
+class MCPHttpServer:
+    def __init__(self, handler: Handler, host: str = "127.0.0.1", port: int = 8765,
+                 max_concurrency: int = 8, max_pending: int = 64, max_sessions: int = 1024):
+        self.handler = handler
+        self.host = host
+        self.port = port
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending
+        self.max_sessions = max_sessions
+        self.sessions: Dict[str, Dict[str, Any]] = {}
+        self._sessions_lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="mcp-http")
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._waiting = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    # --- sesiones ---
+    def _new_session(self) -> Tuple[str, Dict[str, Any]]:
+        with self._sessions_lock:
+            if len(self.sessions) >= self.max_sessions:
+                # descarta la sesión más antigua (dict conserva el orden de inserción)
+                self.sessions.pop(next(iter(self.sessions)))
+            sid = uuid.uuid4().hex
+            session: Dict[str, Any] = {}
+            self.sessions[sid] = session
+            return sid, session
+
+    # --- ejecución acotada ---
+    def _reserve(self, n: int) -> None:
+        """Reserva sitio para `n` mensajes de golpe: un batch entra entero o se rechaza entero."""
+        capacity = self.max_concurrency + self.max_pending
+        if n > capacity:
+            raise HttpError(413, f"batch of {n} requests exceeds the server capacity ({capacity})")
+        if self._waiting + n > capacity:
+            raise HttpError(503, "server busy")
+        self._waiting += n
+
+    async def _run(self, message: Dict[str, Any], session: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Ejecuta un mensaje ya reservado con _reserve (libera su plaza al terminar)."""
+        try:
+            async with self._slots:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._pool, self.handler, message, session)
+        finally:
+            self._waiting -= 1
+
+    async def _dispatch(self, method: str, path: str, headers: Dict[str, str],
+                        body: bytes) -> Tuple[int, Dict[str, str], bytes]:
+        route = path.split("?", 1)[0]
+        if route == "/health":
+            return 200, {"Content-Type": "application/json"}, dumps_compact(
+                {"status": "ok", "sessions": len(self.sessions), "in_flight": self._waiting}).encode("utf-8")
+        if route != MCP_PATH:
+            raise HttpError(404)
+        if method == "GET":
+            raise HttpError(405, "this server does not push messages")
+        sid = headers.get(SESSION_HEADER)
+        if method == "DELETE":
+            with self._sessions_lock:
+                gone = self.sessions.pop(sid or "", None)
+            if gone is None:
+                raise HttpError(404, "unknown session")
+            return 204, {}, b""
+        if method != "POST":
+            raise HttpError(405)
+
+        try:
+            payload = json.loads(body.decode("utf-8"))
+        except (UnicodeDecodeError, ValueError):
+            return 400, {"Content-Type": "application/json"}, dumps_compact(
+                {"jsonrpc": "2.0", "id": None, "error": {"code": -32700, "message": "Parse error"}}).encode("utf-8")
+        messages: List[Any] = payload if isinstance(payload, list) else [payload]
+        if not messages or not all(isinstance(m, dict) for m in messages):
+            raise HttpError(400, "expected a JSON-RPC object or batch")
+
+        out_headers: Dict[str, str] = {}
+        if any(m.get("method") == "initialize" for m in messages):
+            sid, session = self._new_session()
+            out_headers["Mcp-Session-Id"] = sid
+        else:
+            session = self.sessions.get(sid or "")
+            if session is None:
+                raise HttpError(404 if sid else 400, "unknown session" if sid else "missing Mcp-Session-Id")
+
+        # las cancelaciones no esperan turno (su petición puede estar ocupando un hilo); el resto
+        # del batch reserva plaza antes de ejecutar nada, así un 503 nunca deja medio batch hecho
+        responses = [self.handler(m, session) for m in messages if m.get("method") in SLOTLESS]
+        work = [m for m in messages if m.get("method") not in SLOTLESS]
+        self._reserve(len(work))
+        responses += await asyncio.gather(*(self._run(m, session) for m in work))
+        responses = [r for r in responses if r is not None]
+        if not responses:
+            return 202, out_headers, b""
+
+        accept = headers.get("accept", "")
+        if "text/event-stream" in accept and "application/json" not in accept:
+            out_headers["Content-Type"] = "text/event-stream"
+            out_headers["Cache-Control"] = "no-cache"
+            events = "".join(f"event: message\ndata: {dumps_compact(r)}\n\n" for r in responses)
+            return 200, out_headers, events.encode("utf-8")
+        out_headers["Content-Type"] = "application/json"
+        data = responses if isinstance(payload, list) else responses[0]
+        return 200, out_headers, dumps_compact(data).encode("utf-8")
+
+    # --- HTTP/1.1 mínimo con keep-alive ---
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    method, path, version = line.decode("latin-1").strip().split(" ", 2)
+                except ValueError:
+                    await self._write(writer, 400, {}, b"", keep_alive=False)
+                    break
+                headers: Dict[str, str] = {}
+                for _ in range(MAX_HEADER_LINES):
+                    h = await reader.readline()
+                    if h in (b"\r\n", b"\n", b""):
+                        break
+                    k, _, v = h.decode("latin-1").partition(":")
+                    headers[k.strip().lower()] = v.strip()
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    # sin una longitud válida no se sabe dónde acaba el cuerpo: 400 y se cierra
+                    await self._write(writer, 400, {}, b"", keep_alive=False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self._write(writer, 413, {}, b"", keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                try:
+                    status, out_headers, data = await self._dispatch(method.upper(), path, headers, body)
+                except HttpError as e:
+                    status, data = e.status, dumps_compact({"error": str(e)}).encode("utf-8")
+                    out_headers = {"Content-Type": "application/json"}
+                    if status == 503:
+                        out_headers["Retry-After"] = "1"
+                except Exception as e:  # no tumbar la conexión por un fallo inesperado
+                    logger.exception(f"Error HTTP: {e}")
+                    status, out_headers, data = 500, {}, b""
+                await self._write(writer, status, out_headers, data, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _write(self, writer: asyncio.StreamWriter, status: int, headers: Dict[str, str],
+                     body: bytes, keep_alive: bool = True) -> None:
+        lines = [f"HTTP/1.1 {status} {_REASONS.get(status, 'Error')}"]
+        headers = dict(headers)
+        headers["Content-Length"] = str(len(body))
+        headers["Connection"] = "keep-alive" if keep_alive else "close"
+        lines.extend(f"{k}: {v}" for k, v in headers.items())
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()  # backpressure del socket
+
+    async def start(self) -> None:
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Servidor MCP HTTP en http://{self.host}:{self.port}{MCP_PATH}")
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self._pool.shutdown(wait=False)
+
+
+def serve(handler: Handler, host: str = "127.0.0.1", port: int = 8765, **kwargs: Any) -> None:
+    """Arranca el servidor HTTP y bloquea hasta Ctrl+C."""
+    server = MCPHttpServer(handler, host=host, port=port, **kwargs)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        logger.info("Servidor HTTP detenido por el usuario")
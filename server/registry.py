@@ -0,0 +1,181 @@
+# server/registry.py
+"""
+Registro de herramientas MCP.
+
+Cada herramienta declara:
+- su esquema, en server/schemas/<nombre>.json ({name, description, inputSchema});
+  se lee una sola vez
+- su handler: fn(arguments, deadline) -> resultado (dict/list/str), registrado
+  con @TOOLS.tool(...) en server/handlers.py
+- si su resultado se cachea: siempre, nunca (cache=False) o según los
+  argumentos (cache=fn(arguments) -> bool; p. ej. no con una sesión)
+- los recursos perezosos que necesita (p. ej. default_store): funciones sin
+  argumentos cacheadas que nadie paga hasta la primera llamada que las usa
+
+Antes de llamar al handler se comprueban los argumentos contra inputSchema
+(claves `required`, tipos básicos, `enum` y `minimum`, también dentro de
+objetos, listas y oneOf/anyOf): lo que no encaja es InvalidParams (-32602),
+no un KeyError ni un formato desconocido que se cuele hasta los motores.
+
+tools/list sólo necesita los esquemas, así que se responde sin importar los
+handlers (ni NumPy, ni pydantic); el módulo de handlers se importa en el primer
+tools/call o en el calentamiento en segundo plano. tools/call despacha con un
+dict (O(1)) y tools/list devuelve una lista precalculada y ya serializada.
+"""
+import importlib
+import json
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+from .core.encoding import dumps_compact, raw_json
+
+SCHEMA_DIR = Path(__file__).parent / "schemas"
+
+# Orden de tools/list
+TOOL_NAMES = (
+    "suggest_team", "export_showdown", "import_showdown", "archive_stats", "validate_team",
+    "damage_matrix", "team_threats", "speed_tiers", "optimize_spreads", "simulate_matchup",
+    "pool_filter", "team_synergy",
+    "suggest_member", "similar_pokemon", "create_session", "update_session",
+)
+
+Handler = Callable[[Dict[str, Any], Any], Any]
+CachePolicy = Union[bool, Callable[[Dict[str, Any]], bool]]
+
+
+class InvalidParams(ValueError):
+    """Argumentos inválidos: se responde -32602 en lugar de -32603."""
+
+
+_TYPES: Dict[str, Callable[[Any], bool]] = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    "boolean": lambda v: isinstance(v, bool),
+    "integer": lambda v: not isinstance(v, bool) and (isinstance(v, int) or isinstance(v, float) and v.is_integer()),
+    "number": lambda v: not isinstance(v, bool) and isinstance(v, (int, float)),
+    "null": lambda v: v is None,
+}
+
+
+def _folded(value: Any) -> Any:
+    """Los handlers normalizan las cadenas (strip + lower): el enum se compara igual."""
+    return value.strip().lower() if isinstance(value, str) else value
+
+
+def check_schema(schema: Dict[str, Any], value: Any, path: str = "arguments") -> Optional[str]:
+    """Primer problema de `value` frente a `schema` (required, tipos, enum y minimum), o None si encaja."""
+    options = schema.get("oneOf") or schema.get("anyOf")
+    if options:
+        problems = [check_schema({**schema, "oneOf": None, "anyOf": None, **o}, value, path) for o in options]
+        return None if any(p is None for p in problems) else problems[0]
+    kind = schema.get("type")
+    if kind is not None:
+        kinds = kind if isinstance(kind, list) else [kind]
+        if not any(_TYPES.get(k, lambda v: True)(value) for k in kinds):
+            return f"{path} must be {' or '.join(kinds)}"
+    if "enum" in schema and _folded(value) not in {_folded(e) for e in schema["enum"]}:
+        return f"{path} must be one of {', '.join(map(str, schema['enum']))}"
+    if "minimum" in schema and _TYPES["number"](value) and not value >= schema["minimum"]:
+        return f"{path} must be >= {schema['minimum']}"
+    if isinstance(value, dict):
+        for key in schema.get("required") or ():
+            if key not in value or value[key] is None:
+                return f"{path}.{key} is required"
+        props = schema.get("properties") or {}
+        for key, v in value.items():
+            if key in props and v is not None:
+                problem = check_schema(props[key], v, f"{path}.{key}")
+                if problem:
+                    return problem
+    elif isinstance(value, list) and isinstance(schema.get("items"), dict):
+        for i, v in enumerate(value):
+            problem = check_schema(schema["items"], v, f"{path}[{i}]")
+            if problem:
+                return problem
+    return None
+
+
+class Tool:
+    __slots__ = ("name", "schema", "handler", "cache", "resources")
+
+    def __init__(self, name: str, schema: Dict[str, Any], handler: Optional[Handler] = None, cache: CachePolicy = True,
+                 resources: Sequence[Callable[[], Any]] = ()):
+        self.name = name
+        self.schema = schema
+        self.handler = handler
+        self.cache = cache          # False: el resultado depende de algo externo (p. ej. archivos)
+        self.resources = tuple(resources)
+
+    def validate(self, arguments: Dict[str, Any]) -> None:
+        """Lanza InvalidParams si los argumentos no encajan en inputSchema."""
+        problem = check_schema(self.schema.get("inputSchema") or {}, arguments)
+        if problem:
+            raise InvalidParams(problem)
+
+    def cacheable(self, arguments: Dict[str, Any]) -> bool:
+        return self.cache(arguments) if callable(self.cache) else bool(self.cache)
+
+    def warm(self) -> None:
+        for load in self.resources:
+            load()
+
+
+class Registry:
+    def __init__(self, names: Sequence[str] = (), handlers: Optional[str] = None, schema_dir: Path = SCHEMA_DIR):
+        self.schema_dir = schema_dir
+        self.handlers = handlers    # módulo que registra los handlers (se importa al primer uso)
+        self.tools: Dict[str, Tool] = {n: Tool(n, self.load_schema(n)) for n in names}
+        self._listing: Optional[Any] = None
+        self._lock = threading.Lock()
+
+    def load_schema(self, name: str) -> Dict[str, Any]:
+        with open(self.schema_dir / f"{name}.json", encoding="utf-8") as f:
+            schema = json.load(f)
+        if schema.get("name") != name:
+            raise ValueError(f"{name}.json declares tool {schema.get('name')!r}")
+        return schema
+
+    def tool(self, name: str, cache: CachePolicy = True, resources: Sequence[Callable[[], Any]] = ()):
+        """Decorador: registra fn como handler de `name` con el esquema de schemas/<name>.json."""
+        def register(fn: Handler) -> Handler:
+            entry = self.tools.get(name)
+            if entry is None:
+                entry = self.tools[name] = Tool(name, self.load_schema(name))
+                self._listing = None
+            entry.handler, entry.cache, entry.resources = fn, cache, tuple(resources)
+            return fn
+        return register
+
+    def load_handlers(self) -> None:
+        if self.handlers:
+            importlib.import_module(self.handlers)  # el import lock serializa hilos concurrentes
+
+    def get(self, name: Any) -> Optional[Tool]:
+        entry = self.tools.get(name) if isinstance(name, str) else None
+        if entry is not None and entry.handler is None:
+            self.load_handlers()
+            if entry.handler is None:
+                raise RuntimeError(f"tool {name} has a schema but no handler")
+        return entry
+
+    def schemas(self) -> List[Dict[str, Any]]:
+        return [t.schema for t in self.tools.values()]
+
+    def listing(self) -> Any:
+        """Resultado de tools/list, serializado una vez (orden de declaración)."""
+        if self._listing is None:
+            with self._lock:
+                if self._listing is None:
+                    self._listing = raw_json(dumps_compact({"tools": self.schemas()}))
+        return self._listing
+
+    def warm(self, names: Optional[Sequence[str]] = None) -> None:
+        """Importa los handlers e inicializa los recursos de las herramientas indicadas (todas por defecto)."""
+        self.load_handlers()
+        for name in names or list(self.tools):
+            self.tools[name].warm()
+
+
+TOOLS = Registry(TOOL_NAMES, handlers="server.handlers")
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Reproduce diarios de peticiones (VGC_JOURNAL / --journal) contra servidores stdio.
+
+Cada sesión del diario (un cliente) se asigna a uno de --processes servidores
+`python -m server.main` (round robin en orden de inicio, así que el reparto es
+siempre el mismo). Cada proceso recibe los mensajes de sus sesiones
+intercalados por su hora en el diario (heapq.merge), cada sesión en su orden:
+- --speed 1 (por defecto): al ritmo original, relativo al primer mensaje del diario
+- --speed N: N veces más rápido
+- --speed 0: sin esperas; cada proceso va tan rápido como puede, así que la
+  concurrencia es exactamente --processes
+Un servidor stdio atiende de una en una, así que un mensaje cuya hora llega
+mientras el proceso sigue con otro espera su turno; `lag` mide cuánto se
+retrasó cada envío respecto a su hora prevista.
+
+Las sesiones de construcción (create_session) reciben ids nuevos en cada
+servidor: el diario guarda el id que se asignó en cada create_session
+(líneas "created") y la reproducción reescribe el argumento `session` de las
+peticiones siguientes con el id que devuelve el servidor de la reproducción.
+En diarios sin esas líneas los ids grabados se emparejan por orden de uso.
+
+Informe: peticiones, errores, throughput y percentiles de latencia (envío ->
+respuesta) en total y por método / herramienta. También acepta un JSONL de
+mensajes JSON-RPC sueltos (una sola sesión, sin esperas).
+
+Uso:  python -m server.replay diario.jsonl [--speed 1] [--processes 1] [--warm eager] [--json] [-- args del servidor]
+"""
+import heapq
+import json
+import math
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+READY_ID = "replay-ready"
+_SESSION_FIELD = re.compile(r'"?session"?\s*:\s*"?([\w-]+)')
+
+# (segundos desde el primer mensaje del diario, mensaje)
+Session = Tuple[str, List[Tuple[float, Dict[str, Any]]]]
+
+
+def load_sessions(path: Path) -> List[Session]:
+    """Sesiones del diario ordenadas por su primer mensaje."""
+    sessions: Dict[str, List[Tuple[float, Dict[str, Any]]]] = {}
+    first: Optional[float] = None
+    with open(path, encoding="utf-8") as f:
+        for n, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            if not isinstance(entry, dict):
+                raise ValueError(f"{path}:{n}: expected a JSON object")
+            if "created" in entry:
+                entry = dict(entry, request={"created": entry["created"]})  # no se envía: ver SessionIds
+            elif "request" not in entry:
+                entry = {"ts": None, "session": "-", "request": entry}  # mensaje suelto
+            ts = entry.get("ts")
+            if ts is not None:
+                first = ts if first is None else min(first, ts)
+            sessions.setdefault(str(entry.get("session")), []).append((ts, entry["request"]))
+    out = []
+    for sid, items in sessions.items():
+        out.append((sid, [(0.0 if ts is None or first is None else ts - first, req) for ts, req in items]))
+    out.sort(key=lambda s: s[1][0][0] if s[1] else 0.0)
+    return out
+
+
+class SessionIds:
+    """Ids de sesión grabados -> ids que asigna el servidor de la reproducción (uno por sesión del diario)."""
+
+    def __init__(self):
+        self.by_request: Dict[Any, str] = {}   # id de la petición create_session -> id nuevo
+        self.mapping: Dict[str, str] = {}
+        self.pending: deque = deque()          # ids nuevos aún sin su id grabado
+
+    def assigned(self, message: Dict[str, Any], reply: Optional[Dict[str, Any]]) -> None:
+        params = message.get("params") or {}
+        if message.get("method") != "tools/call" or params.get("name") != "create_session" or not reply:
+            return
+        try:
+            text = reply["result"]["content"][0]["text"]
+        except (KeyError, IndexError, TypeError):
+            return
+        m = _SESSION_FIELD.search(text)
+        if m:
+            self.by_request[message.get("id")] = m.group(1)
+            self.pending.append(m.group(1))
+
+    def recorded(self, created: Dict[str, Any]) -> None:
+        new = self.by_request.pop(created.get("id"), None)
+        if new is not None:
+            self.mapping[str(created.get("session"))] = new
+            if new in self.pending:
+                self.pending.remove(new)
+
+    def rewrite(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        arguments = (message.get("params") or {}).get("arguments")
+        old = arguments.get("session") if isinstance(arguments, dict) else None
+        if not old:
+            return message
+        new = self.mapping.get(str(old))
+        if new is None and self.pending:
+            new = self.mapping[str(old)] = self.pending.popleft()
+        if new is None or new == old:
+            return message
+        params = dict(message["params"], arguments=dict(arguments, session=new))
+        return dict(message, params=params)
+
+
+def expects_reply(message: Dict[str, Any]) -> bool:
+    """Si server.main responde a este mensaje (las notificaciones y los ids nulos no tienen respuesta)."""
+    if message.get("id") is None:
+        return False
+    return message.get("method") not in ("initialized", "notifications/cancelled")
+
+
+def label(message: Dict[str, Any]) -> str:
+    method = str(message.get("method"))
+    if method == "tools/call":
+        return f"tools/call {(message.get('params') or {}).get('name')}"
+    return method
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Percentil q (0-100) con interpolación lineal."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * q / 100.0
+    lo, hi = math.floor(pos), math.ceil(pos)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+class ServerProcess:
+    """Un servidor stdio; send() escribe un mensaje y, si lo hay, lee su respuesta."""
+
+    def __init__(self, server_args: Sequence[str] = (), env: Optional[Dict[str, str]] = None):
+        self.proc = subprocess.Popen([sys.executable, "-m", "server.main", *server_args], cwd=ROOT, env=env,
+                                     stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                     text=True, encoding="utf-8")
+
+    def send(self, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        self.proc.stdin.write(json.dumps(message, ensure_ascii=False) + "\n")
+        self.proc.stdin.flush()
+        if not expects_reply(message):
+            return None
+        line = self.proc.stdout.readline()
+        if not line:
+            raise EOFError(f"server exited with code {self.proc.poll()}")
+        return json.loads(line)
+
+    def wait_ready(self) -> None:
+        """Con --warm eager el servidor no lee stdin hasta terminar de cargar: la primera respuesta marca el arranque."""
+        self.send({"jsonrpc": "2.0", "id": READY_ID, "method": "tools/list", "params": {}})
+
+    def close(self) -> None:
+        try:
+            self.proc.stdin.close()
+            self.proc.wait(timeout=10)
+        except (OSError, subprocess.TimeoutExpired):
+            self.proc.kill()
+
+
+def _run_worker(server: ServerProcess, sessions: Sequence[Session], t0: float, speed: float,
+                samples: List[Tuple[str, float, float, bool]], lock: threading.Lock) -> None:
+    # los mensajes de todas las sesiones del proceso, intercalados por su hora en el diario
+    ids = [SessionIds() for _ in sessions]
+    merged = heapq.merge(*([(offset, k, i, message) for i, (offset, message) in enumerate(messages)]
+                           for k, (_, messages) in enumerate(sessions)), key=lambda m: m[:3])
+    for offset, k, _, message in merged:
+        if "created" in message:
+            ids[k].recorded(message["created"])
+            continue
+        message = ids[k].rewrite(message)
+        due = t0 + offset / speed if speed > 0 else None
+        if due is not None and due > time.perf_counter():
+            time.sleep(due - time.perf_counter())
+        start = time.perf_counter()
+        try:
+            reply = server.send(message)
+        except (EOFError, OSError, ValueError):
+            with lock:
+                samples.append((label(message), 0.0, 0.0, True))
+            return
+        if reply is None:
+            continue
+        latency = time.perf_counter() - start
+        ids[k].assigned(message, reply)
+        failed = "error" in reply or reply.get("id") != message.get("id")
+        with lock:
+            samples.append((label(message), latency, max(0.0, start - due) if due is not None else 0.0, failed))
+
+
+def _stats(rows: Sequence[Tuple[str, float, float, bool]]) -> Dict[str, Any]:
+    ms = [r[1] * 1000 for r in rows]
+    return {"count": len(rows), "errors": sum(r[3] for r in rows),
+            "p50_ms": round(percentile(ms, 50), 3), "p90_ms": round(percentile(ms, 90), 3),
+            "p99_ms": round(percentile(ms, 99), 3), "max_ms": round(max(ms, default=0.0), 3),
+            "lag_p99_ms": round(percentile([r[2] * 1000 for r in rows], 99), 3)}
+
+
+def replay(sessions: Sequence[Session], speed: float = 1.0, processes: int = 1, server_args: Sequence[str] = (),
+           env: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """Reproduce las sesiones y devuelve el informe {requests, seconds, throughput, overall, by_label}."""
+    processes = max(1, min(int(processes), len(sessions) or 1))
+    env = dict(os.environ if env is None else env)
+    env.pop("VGC_JOURNAL", None)  # no volver a registrar lo que se reproduce
+    servers = [ServerProcess(server_args, env) for _ in range(processes)]
+    samples: List[Tuple[str, float, float, bool]] = []
+    lock = threading.Lock()
+    try:
+        for s in servers:
+            s.wait_ready()
+        t0 = time.perf_counter()
+        threads = [threading.Thread(target=_run_worker, args=(s, sessions[k::processes], t0, speed, samples, lock))
+                   for k, s in enumerate(servers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        seconds = time.perf_counter() - t0
+    finally:
+        for s in servers:
+            s.close()
+    by_label: Dict[str, List[Tuple[str, float, float, bool]]] = {}
+    for row in samples:
+        by_label.setdefault(row[0], []).append(row)
+    return {
+        "sessions": len(sessions), "processes": processes, "speed": speed,
+        "requests": len(samples), "seconds": round(seconds, 3),
+        "throughput": round(len(samples) / seconds, 2) if seconds > 0 else 0.0,
+        "overall": _stats(samples),
+        "by_label": {k: _stats(v) for k, v in sorted(by_label.items())},
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [f"{report['requests']} requests from {report['sessions']} sessions on {report['processes']} processes "
+             f"(speed {report['speed']:g}) in {report['seconds']:.2f} s: {report['throughput']:.1f} req/s",
+             f"{'':28s} {'count':>6s} {'err':>4s} {'p50':>9s} {'p90':>9s} {'p99':>9s} {'max':>9s} {'lag p99':>9s}"]
+    for name, st in [("overall", report["overall"])] + list(report["by_label"].items()):
+        lines.append(f"{name[:28]:28s} {st['count']:6d} {st['errors']:4d} {st['p50_ms']:9.2f} {st['p90_ms']:9.2f} "
+                     f"{st['p99_ms']:9.2f} {st['max_ms']:9.2f} {st['lag_p99_ms']:9.2f}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    import argparse
+    argv = list(sys.argv[1:] if argv is None else argv)
+    extra: List[str] = []
+    if "--" in argv:
+        extra = argv[argv.index("--") + 1:]
+        argv = argv[:argv.index("--")]
+    parser = argparse.ArgumentParser(description="Reproduce un diario de peticiones contra servidores stdio")
+    parser.add_argument("journal", type=Path)
+    parser.add_argument("--speed", type=float, default=1.0, help="1 = ritmo original, N = N veces más rápido, 0 = sin esperas")
+    parser.add_argument("--processes", type=int, default=1, help="servidores stdio en paralelo")
+    parser.add_argument("--warm", choices=("background", "eager", "off"), default="eager")
+    parser.add_argument("--json", action="store_true", help="informe en JSON")
+    args = parser.parse_args(argv)
+    report = replay(load_sessions(args.journal), speed=args.speed, processes=args.processes,
+                    server_args=["--warm", args.warm, *extra])
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+
+
+if __name__ == "__main__":
+    main()
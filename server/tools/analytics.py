@@ -0,0 +1,317 @@
+# server/tools/analytics.py
+"""
+Análisis masivo de archivos de equipos (pastes de Showdown).
+
+Pipeline:
+1. ingest(): parsea cada archivo en streaming (sólo las cabeceras de cada set),
+   resuelve especies contra el dataset y produce una matriz compacta de ids
+   (T, 6) int16 + el formato de cada equipo. Los archivos grandes se trocean
+   por rangos de bytes y se reparten en un ProcessPoolExecutor.
+   El resultado por archivo se guarda en disco (.npz) y se reutiliza mientras
+   el archivo y el dataset no cambien.
+2. summarize(): estadísticas vectorizadas con NumPy sobre la matriz de ids
+   (uso, parejas y tríos frecuentes, huecos de tipo, restringidos por formato).
+"""
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from ..core.config import cache_dir
+from ..core.deadline import Deadline, expired
+from ..core.formats import FORMATS, format_from_label, get_restricted_species
+from .dataset import dataset_version, default_name_index
+from .showdown import TEAM_SIZE, iter_teams
+from .store import default_store
+from .synergy import ALL_TYPES, team_holes_matrix
+
+PASTE_SUFFIXES = (".txt", ".paste", ".ps")
+# Por debajo de este tamaño total no compensa arrancar procesos
+PARALLEL_MIN_BYTES = 2 * 1024 * 1024
+CHUNK_BYTES = 8 * 1024 * 1024
+
+_PAIR_COLS = list(combinations(range(TEAM_SIZE), 2))
+_TRIO_COLS = list(combinations(range(TEAM_SIZE), 3))
+
+
+def confine(path: str, root: Path) -> Path:
+    """`path` (relativo a `root` si no es absoluto) resuelto; ValueError si queda fuera de `root`."""
+    root = Path(root).resolve()
+    target = (root / Path(path).expanduser()).resolve()
+    if target != root and root not in target.parents:
+        raise ValueError(f"path must be inside the archive root ({root})")
+    return target
+
+
+def _iter_sources(path: Path, root: Optional[Path] = None) -> List[Path]:
+    """Pastes de `path`; con `root`, sólo pastes (por extensión) cuyo destino real está dentro de root."""
+    if path.is_dir():
+        found = sorted(p for p in path.rglob("*") if p.is_file() and p.suffix.lower() in PASTE_SUFFIXES)
+    elif root is not None and path.suffix.lower() not in PASTE_SUFFIXES:
+        found = []
+    else:
+        found = [path]
+    if root is None:
+        return found
+    root = Path(root).resolve()
+    return [p for p in found if root in p.resolve().parents]  # enlaces que salen de root, fuera
+
+
+def _iter_lines(path: str, start: int, end: int) -> Iterable[str]:
+    # los rangos están acotados a CHUNK_BYTES, así que se decodifican de una vez
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    return data.decode("utf-8", errors="replace").splitlines()
+
+
+def _chunk_ranges(path: Path, chunk_bytes: int = CHUNK_BYTES) -> List[Tuple[int, int]]:
+    """Corta el archivo en rangos que empiezan en un límite de equipo."""
+    size = path.stat().st_size
+    if size <= chunk_bytes:
+        return [(0, size)]
+    with open(path, "rb") as f:
+        first = b""
+        for line in f:
+            if line.strip():
+                first = line.strip()
+                break
+        headers = first.startswith(b"===")
+        cuts = [0]
+        target = chunk_bytes
+        while target < size:
+            f.seek(target)
+            f.readline()  # descarta la línea parcial
+            pos = f.tell()
+            blanks = 0
+            found = None
+            for line in f:
+                stripped = line.strip()
+                if headers and stripped.startswith(b"===") and stripped.endswith(b"==="):
+                    found = pos
+                    break
+                if not headers:
+                    blanks = blanks + 1 if not stripped else 0
+                    if blanks >= 2:
+                        found = pos + len(line)
+                        break
+                pos += len(line)
+            if found is None or found >= size:
+                break
+            if found > cuts[-1]:
+                cuts.append(found)
+            target = found + chunk_bytes
+    cuts.append(size)
+    return [(a, b) for a, b in zip(cuts, cuts[1:]) if b > a]
+
+
+def _ingest_range(path: str, start: int, end: int) -> Tuple[np.ndarray, np.ndarray, int]:
+    """Worker: devuelve (ids (T,6) int16, formato (T,) int8, sets no resueltos)."""
+    index = default_name_index()
+    rows: List[List[int]] = []
+    fmts: List[int] = []
+    unresolved = 0
+    for team in iter_teams(_iter_lines(path, start, end), validate=False, headers_only=True):
+        row = [-1] * TEAM_SIZE
+        k = 0
+        for s in team["pokemon"][:TEAM_SIZE]:
+            i = index.resolve(s["name"])
+            if i is None:
+                unresolved += 1
+                continue
+            row[k] = i
+            k += 1
+        rows.append(row)
+        fmt = format_from_label(team.get("format") or "")
+        fmts.append(FORMATS.index(fmt) if fmt else -1)
+    ids = np.array(rows, dtype=np.int16).reshape(len(rows), TEAM_SIZE)
+    return ids, np.array(fmts, dtype=np.int8), unresolved
+
+
+def _cache_path(path: Path) -> Path:
+    st = path.stat()
+    key = f"{path.resolve()}|{st.st_mtime_ns}|{st.st_size}|{dataset_version()}"
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]
+    return cache_dir() / "archives" / f"{digest}.npz"
+
+
+class TeamArchive:
+    """Equipos ingeridos: ids de fila del dataset por equipo + formato por equipo."""
+
+    def __init__(self, ids: np.ndarray, fmts: np.ndarray, unresolved: int = 0, files: int = 0, cached: int = 0,
+                 truncated: bool = False):
+        self.ids = ids
+        self.fmts = fmts
+        self.unresolved = unresolved
+        self.files = files
+        self.cached = cached
+        self.truncated = truncated
+
+    def __len__(self) -> int:
+        return int(self.ids.shape[0])
+
+
+def ingest(path: str, workers: Optional[int] = None, use_cache: bool = True,
+           deadline: Optional[Deadline] = None, root: Optional[Path] = None) -> TeamArchive:
+    """
+    Ingesta un archivo o directorio de pastes. Si vence el deadline se devuelve lo
+    ingerido hasta ese momento (truncated=True); los archivos a medias no se cachean.
+    """
+    sources = _iter_sources(Path(path), root)
+    if not sources:
+        raise FileNotFoundError(f"No paste files found at {path}")
+
+    parts: Dict[Path, List[Tuple[np.ndarray, np.ndarray, int]]] = {}
+    jobs: List[Tuple[Path, int, int]] = []
+    cached = 0
+    for src in sources:
+        cpath = _cache_path(src) if use_cache else None
+        if cpath is not None and cpath.exists():
+            with np.load(cpath) as z:
+                parts[src] = [(z["ids"], z["fmts"], int(z["unresolved"]))]
+            cached += 1
+            continue
+        for start, end in _chunk_ranges(src, CHUNK_BYTES):
+            jobs.append((src, start, end))
+
+    total = sum(end - start for _, start, end in jobs)
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+    results: List[Tuple[np.ndarray, np.ndarray, int]] = []
+    if jobs:
+        if workers > 1 and len(jobs) > 1 and total >= PARALLEL_MIN_BYTES:
+            default_name_index()  # precarga antes del fork
+            pool = ProcessPoolExecutor(max_workers=min(workers, len(jobs)))
+            try:
+                futures = [pool.submit(_ingest_range, str(src), start, end) for src, start, end in jobs]
+                for fut in futures:  # en orden: el resultado conserva el orden de los archivos
+                    results.append(fut.result())
+                    if expired(deadline):
+                        break
+            finally:
+                # si se cortó, no esperar a los trozos que ya estaban en marcha
+                pool.shutdown(wait=len(results) == len(jobs), cancel_futures=True)
+        else:
+            for src, start, end in jobs:
+                results.append(_ingest_range(str(src), start, end))
+                if expired(deadline):
+                    break
+        for (src, _, _), res in zip(jobs, results):
+            parts.setdefault(src, []).append(res)
+        # un archivo a medias cuenta en el resultado pero no se cachea
+        partial = {src for src, _, _ in jobs[len(results):]}
+        if use_cache:
+            for src in {src for src, _, _ in jobs[:len(results)]} - partial:
+                ids = np.concatenate([p[0] for p in parts[src]])
+                fmts = np.concatenate([p[1] for p in parts[src]])
+                unresolved = sum(p[2] for p in parts[src])
+                cpath = _cache_path(src)
+                cpath.parent.mkdir(parents=True, exist_ok=True)
+                np.savez_compressed(cpath, ids=ids, fmts=fmts, unresolved=unresolved)
+
+    chunks = [p for src in sources for p in parts.get(src, [])]
+    ids = np.concatenate([c[0] for c in chunks]) if chunks else np.zeros((0, TEAM_SIZE), np.int16)
+    fmts = np.concatenate([c[1] for c in chunks]) if chunks else np.zeros(0, np.int8)
+    return TeamArchive(ids, fmts, sum(c[2] for c in chunks), files=len(sources), cached=cached,
+                       truncated=len(results) < len(jobs))
+
+
+def _count_combos(ids: np.ndarray, cols: List[Tuple[int, ...]], n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Cuenta combinaciones (parejas/tríos) de miembros; las filas deben venir ordenadas."""
+    codes = []
+    for combo in cols:
+        sub = ids[:, combo].astype(np.int64)
+        ok = (sub >= 0).all(axis=1)
+        code = np.zeros(int(ok.sum()), dtype=np.int64)
+        for c in range(len(combo)):
+            code = code * n + sub[ok, c]
+        codes.append(code)
+    allc = np.concatenate(codes) if codes else np.zeros(0, np.int64)
+    return np.unique(allc, return_counts=True)
+
+
+def _top_combos(codes: np.ndarray, counts: np.ndarray, size: int, n: int, names: List[str],
+                teams: int, top: int) -> List[Dict[str, Any]]:
+    order = np.argsort(-counts, kind="stable")[:top]
+    out = []
+    for j in order:
+        code = int(codes[j])
+        members = []
+        for _ in range(size):
+            members.append(names[code % n])
+            code //= n
+        out.append({"members": members[::-1], "count": int(counts[j]), "pct": round(100.0 * counts[j] / teams, 2)})
+    return out
+
+
+def summarize(archive: TeamArchive, top: int = 20, fmt: Optional[str] = None,
+              deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+    """Estadísticas agregadas (todo vectorizado sobre la matriz de ids)."""
+    store = default_store()
+    n = len(store)
+    ids, fmts = archive.ids, archive.fmts
+    if fmt is not None:
+        code = FORMATS.index(fmt)
+        # equipos sin cabecera de formato cuentan como del formato pedido
+        keep = (fmts == code) | (fmts < 0)
+        ids, fmts = ids[keep], np.where(fmts[keep] < 0, code, fmts[keep])
+    teams = int(ids.shape[0])
+    result: Dict[str, Any] = {"teams": teams, "files": archive.files, "cached_files": archive.cached,
+                              "unresolved_sets": archive.unresolved}
+    if archive.truncated:
+        result["truncated"] = True
+    if teams == 0:
+        return result
+
+    # las filas ordenadas (-1 al principio) dan parejas/tríos canónicos
+    ids = np.sort(ids.astype(np.int32), axis=1)
+
+    usage = np.bincount(ids[ids >= 0], minlength=n)
+    order = np.argsort(-usage, kind="stable")[:top]
+    result["usage"] = [{"name": store.names[i], "count": int(usage[i]), "pct": round(100.0 * usage[i] / teams, 2)}
+                       for i in order if usage[i] > 0]
+
+    codes, counts = _count_combos(ids, _PAIR_COLS, n)
+    result["pairs"] = _top_combos(codes, counts, 2, n, store.names, teams, top)
+    # los tríos son la parte más cara: es lo primero que se sacrifica
+    if expired(deadline):
+        result["truncated"] = True
+        return result
+    codes, counts = _count_combos(ids, _TRIO_COLS, n)
+    result["trios"] = _top_combos(codes, counts, 3, n, store.names, teams, top)
+
+    holes = team_holes_matrix(store.against, ids).sum(axis=0)
+    result["type_holes"] = {t: {"teams": int(holes[k]), "pct": round(100.0 * holes[k] / teams, 2)}
+                            for k, t in enumerate(ALL_TYPES) if holes[k] > 0}
+
+    restricted: Dict[str, Any] = {}
+    for code, f in enumerate(FORMATS):
+        sel = fmts == code
+        if not sel.any():
+            continue
+        mask = store.species_mask(get_restricted_species(f))
+        sub = ids[sel]
+        rids = np.where((sub >= 0) & mask[np.maximum(sub, 0)], sub, -1)
+        rids = np.sort(rids, axis=1)
+        fteams = int(sub.shape[0])
+        r_usage = np.bincount(rids[rids >= 0], minlength=n)
+        r_order = np.argsort(-r_usage, kind="stable")[:top]
+        codes, counts = _count_combos(rids, _PAIR_COLS, n)
+        restricted[f] = {
+            "teams": fteams,
+            "usage": [{"name": store.names[i], "count": int(r_usage[i])} for i in r_order if r_usage[i] > 0],
+            "pairs": _top_combos(codes, counts, 2, n, store.names, fteams, top),
+        }
+    if restricted:
+        result["restricted"] = restricted
+    return result
+
+
+def archive_stats(path: str, top: int = 20, fmt: Optional[str] = None,
+                  workers: Optional[int] = None, use_cache: bool = True,
+                  deadline: Optional[Deadline] = None, root: Optional[Path] = None) -> Dict[str, Any]:
+    archive = ingest(path, workers=workers, use_cache=use_cache, deadline=deadline, root=root)
+    return summarize(archive, top=top, fmt=fmt, deadline=deadline)
@@ -0,0 +1,336 @@
+# server/tools/damage.py
+"""
+Calculadora de daño determinista y vectorizada (fórmula de Gen 8).
+
+Todo se calcula en bloque: E ataques (atacante + movimiento) contra D
+defensores con las 16 tiradas (85..100) a la vez -> tensor (E, D, 16).
+Se sigue el orden y el redondeo de Showdown (modificadores en 4096avos):
+
+    base -> spread (0.75) -> clima -> tirada -> STAB -> efectividad
+         -> Life Orb / Expert Belt -> golpes múltiples
+
+Fuera de alcance (deliberadamente): críticos, quemadura, pantallas,
+habilidades y terrenos. La efectividad sale de la matriz `against` del
+dataset (sólo tipos).
+"""
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..core.deadline import Deadline, expired
+from .learnsets import PHYSICAL, SPECIAL, Learnsets, default_learnsets
+from .showdown import MAX_EV, MAX_IV, STAT_LABELS, stat_label
+from .store import DexStore, TYPE_INDEX, default_store
+from .synergy import TYPES
+
+LEVEL = 50
+ROLLS = np.arange(85, 101, dtype=np.int64)  # 16 tiradas
+
+# Naturaleza -> (stat que sube, stat que baja) como índice de STAT_LABELS
+NATURE_EFFECTS: Dict[str, Tuple[int, int]] = {
+    "Lonely": (1, 2), "Brave": (1, 5), "Adamant": (1, 3), "Naughty": (1, 4),
+    "Bold": (2, 1), "Relaxed": (2, 5), "Impish": (2, 3), "Lax": (2, 4),
+    "Timid": (5, 1), "Hasty": (5, 2), "Jolly": (5, 3), "Naive": (5, 4),
+    "Modest": (3, 1), "Mild": (3, 2), "Quiet": (3, 5), "Rash": (3, 4),
+    "Calm": (4, 1), "Gentle": (4, 2), "Sassy": (4, 5), "Careful": (4, 3),
+}
+
+# Objetos soportados: (atk, spa, def, spd, final) en 4096avos
+ITEM_MODS: Dict[str, Tuple[int, int, int, int, int]] = {
+    "choice band": (6144, 4096, 4096, 4096, 4096),
+    "choice specs": (4096, 6144, 4096, 4096, 4096),
+    "life orb": (4096, 4096, 4096, 4096, 5324),
+    "assault vest": (4096, 4096, 4096, 6144, 4096),
+    "eviolite": (4096, 4096, 6144, 6144, 4096),
+}
+EXPERT_BELT = 4915
+
+# Movimientos con cálculo especial
+KIND_NORMAL, KIND_PSYSHOCK, KIND_BODYPRESS, KIND_FOULPLAY = 0, 1, 2, 3
+MOVE_KINDS = {"psyshock": KIND_PSYSHOCK, "psystrike": KIND_PSYSHOCK, "secretsword": KIND_PSYSHOCK,
+              "bodypress": KIND_BODYPRESS, "foulplay": KIND_FOULPLAY}
+
+# Movimiento genérico cuando no hay movimientos ni learnset
+GENERIC_STAB_POWER = 80
+
+WEATHER_MODS = {
+    "sun": {"Fire": 6144, "Water": 2048},
+    "rain": {"Water": 6144, "Fire": 2048},
+}
+
+
+def modify(value: np.ndarray, mod) -> np.ndarray:
+    """Redondeo de Showdown: tr((tr(value * mod) + 2047) / 4096)."""
+    return (value * mod + 2047) // 4096
+
+
+def calc_stats(base: np.ndarray, evs: np.ndarray, ivs: np.ndarray, nature: np.ndarray,
+               level: np.ndarray) -> np.ndarray:
+    """Stats reales (K, 6). `nature` en centésimas (90/100/110)."""
+    lv = level.astype(np.int64)[:, None]
+    core = (2 * base.astype(np.int64) + ivs + evs // 4) * lv // 100
+    stats = (core + 5) * nature // 100
+    stats[:, 0] = core[:, 0] + lv[:, 0] + 10
+    return stats
+
+
+def _spread_array(spread: Optional[Dict[str, Any]], default: int) -> np.ndarray:
+    out = np.full(len(STAT_LABELS), default, dtype=np.int64)
+    for k, v in (spread or {}).items():
+        label = stat_label(k)
+        if label is not None:
+            out[STAT_LABELS.index(label)] = int(v)
+    return out
+
+
+def default_evs(base: Sequence[int]) -> np.ndarray:
+    """252 HP / 252 en el stat ofensivo mayor / 4 Spe, naturaleza neutra."""
+    evs = np.zeros(len(STAT_LABELS), dtype=np.int64)
+    evs[0] = MAX_EV
+    evs[1 if base[1] >= base[3] else 3] = MAX_EV
+    evs[5] = 4
+    return evs
+
+
+class Side:
+    """Bloque de combatientes (sets) ya resueltos contra el dataset."""
+
+    def __init__(self, store: DexStore, sets: Sequence[Dict[str, Any]]):
+        self.sets = list(sets)
+        self.rows = np.array([store.resolve(s["name"]) for s in self.sets], dtype=np.int64)
+        self.names = [store.names[r] for r in self.rows]
+        k = len(self.sets)
+        base = store.stats[self.rows].astype(np.int64).reshape(k, len(STAT_LABELS))
+        evs = np.zeros((k, 6), dtype=np.int64)
+        ivs = np.full((k, 6), MAX_IV, dtype=np.int64)
+        nature = np.full((k, 6), 100, dtype=np.int64)
+        level = np.full(k, LEVEL, dtype=np.int64)
+        mods = np.full((k, 5), 4096, dtype=np.int64)
+        self.expert_belt = np.zeros(k, dtype=bool)
+        for i, s in enumerate(self.sets):
+            evs[i] = _spread_array(s["evs"], 0) if s.get("evs") else default_evs(base[i])
+            ivs[i] = _spread_array(s.get("ivs"), MAX_IV)
+            plus_minus = NATURE_EFFECTS.get(str(s.get("nature") or "").strip().title())
+            if plus_minus:
+                nature[i, plus_minus[0]] = 110
+                nature[i, plus_minus[1]] = 90
+            level[i] = int(s.get("level") or LEVEL)
+            item = str(s.get("item") or "").strip().lower()
+            if item in ITEM_MODS:
+                mods[i] = ITEM_MODS[item]
+            self.expert_belt[i] = item == "expert belt"
+        self._set_stats(calc_stats(base, evs, ivs, nature, level), level, mods)
+
+    def _set_stats(self, stats: np.ndarray, level: np.ndarray, mods: np.ndarray) -> None:
+        self.stats = stats
+        self.level = level
+        self.atk_mod, self.spa_mod, self.def_mod, self.spd_mod, self.final_mod = mods.T
+
+    @classmethod
+    def variants(cls, store: DexStore, name: str, stats: np.ndarray, item: Optional[str] = None) -> "Side":
+        """K copias del mismo Pokémon con stats ya calculados (K, 6): un damage_rolls para muchos spreads."""
+        k = len(stats)
+        side = cls(store, [])
+        side.sets = [{"name": name, "item": item}] * k
+        side.rows = np.full(k, store.resolve(name), dtype=np.int64)
+        side.names = [store.names[side.rows[0]]] * k if k else []
+        mods = np.tile(ITEM_MODS.get(str(item or "").strip().lower(), (4096,) * 5), (k, 1)).astype(np.int64)
+        side.expert_belt = np.full(k, str(item or "").strip().lower() == "expert belt")
+        side._set_stats(np.asarray(stats, dtype=np.int64).reshape(k, len(STAT_LABELS)),
+                        np.full(k, LEVEL, dtype=np.int64), mods.reshape(k, 5))
+        return side
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+
+class MoveBatch:
+    """Lista plana de ataques: owner[e] es el índice del atacante en su Side."""
+
+    def __init__(self):
+        self.owner: List[int] = []
+        self.names: List[str] = []
+        self.type: List[int] = []
+        self.category: List[int] = []
+        self.power: List[int] = []
+        self.accuracy: List[float] = []
+        self.hits: List[int] = []
+        self.spread: List[bool] = []
+        self.kind: List[int] = []
+
+    def add_learned(self, owner: int, ls: Learnsets, j: int) -> None:
+        self.owner.append(owner)
+        self.names.append(ls.move_names[j])
+        self.type.append(int(ls.move_type[j]))
+        self.category.append(int(ls.category[j]))
+        self.power.append(int(ls.power[j]))
+        self.accuracy.append(float(ls.accuracy[j]))
+        self.hits.append(int(ls.hits[j]))
+        self.spread.append(bool(ls.spread[j]))
+        self.kind.append(MOVE_KINDS.get(ls.move_ids[j], KIND_NORMAL))
+
+    def add_generic(self, owner: int, type_id: int, physical: bool) -> None:
+        self.owner.append(owner)
+        self.names.append(f"{TYPES[type_id]} STAB")
+        self.type.append(type_id)
+        self.category.append(PHYSICAL if physical else SPECIAL)
+        self.power.append(GENERIC_STAB_POWER)
+        self.accuracy.append(1.0)
+        self.hits.append(1)
+        self.spread.append(False)
+        self.kind.append(KIND_NORMAL)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {
+            "owner": np.array(self.owner, dtype=np.int64),
+            "type": np.array(self.type, dtype=np.int64),
+            "category": np.array(self.category, dtype=np.int64),
+            "power": np.array(self.power, dtype=np.int64),
+            "accuracy": np.array(self.accuracy, dtype=np.float64),
+            "hits": np.array(self.hits, dtype=np.int64),
+            "spread": np.array(self.spread, dtype=bool),
+            "kind": np.array(self.kind, dtype=np.int64),
+        }
+
+    def __len__(self) -> int:
+        return len(self.owner)
+
+
+def build_moves(side: Side, store: DexStore, ls: Learnsets) -> MoveBatch:
+    """Movimientos de daño de cada atacante: los del set, si no su learnset, si no un STAB genérico."""
+    batch = MoveBatch()
+    for i, s in enumerate(side.sets):
+        row = side.rows[i]
+        ids = [j for j in ls.move_ids_for(s.get("moves") or []) if ls.damaging[j]]
+        if not ids and not s.get("moves") and ls.known[row]:
+            ids = [j for j in np.nonzero(np.unpackbits(ls.by_pokemon[row], count=ls.n_moves))[0]
+                   if ls.damaging[j]]
+        if ids:
+            for j in ids:
+                batch.add_learned(i, ls, int(j))
+            continue
+        physical = side.stats[i, 1] >= side.stats[i, 3]
+        for t in store.type_ids[row]:
+            if t >= 0:
+                batch.add_generic(i, int(t), physical)
+    return batch
+
+
+def damage_rolls(att: Side, moves: Dict[str, np.ndarray], dfn: Side, store: DexStore,
+                 weather: Optional[str] = None, doubles: bool = True) -> np.ndarray:
+    """Tensor (E, D, 16) de daño por tirada."""
+    o = moves["owner"]
+    phys = moves["category"] == PHYSICAL
+    kind = moves["kind"]
+
+    # stat de ataque (E, D): Body Press usa Defensa propia, Foul Play el Ataque del rival
+    a_own = np.where(phys, modify(att.stats[o, 1], att.atk_mod[o]), modify(att.stats[o, 3], att.spa_mod[o]))
+    a_own = np.where(kind == KIND_BODYPRESS, att.stats[o, 2], a_own)
+    a = np.where((kind == KIND_FOULPLAY)[:, None], dfn.stats[None, :, 1], a_own[:, None])
+
+    # stat de defensa (E, D): Psyshock y compañía golpean a la Defensa física
+    d_phys = modify(dfn.stats[:, 2], dfn.def_mod)
+    d_spec = modify(dfn.stats[:, 4], dfn.spd_mod)
+    hits_def = phys | (kind == KIND_PSYSHOCK)
+    d = np.where(hits_def[:, None], d_phys[None, :], d_spec[None, :])
+
+    level_factor = (2 * att.level[o] // 5 + 2)[:, None]
+    base = (level_factor * moves["power"][:, None] * a // d) // 50 + 2
+
+    if doubles:
+        base = np.where(moves["spread"][:, None], modify(base, 3072), base)
+    wmods = WEATHER_MODS.get(weather or "")
+    if wmods:
+        wmod = np.full(len(o), 4096, dtype=np.int64)
+        for tname, m in wmods.items():
+            wmod[moves["type"] == TYPE_INDEX[tname]] = m
+        base = modify(base, wmod[:, None])
+
+    dmg = base[:, :, None] * ROLLS // 100
+    stab = store.stab[att.rows[o], moves["type"]]
+    dmg = np.where(stab[:, None, None], modify(dmg, 6144), dmg)
+
+    eff = store.against[dfn.rows][:, moves["type"]].T.astype(np.float64)  # (E, D)
+    dmg = np.floor(dmg * eff[:, :, None]).astype(np.int64)
+
+    final = att.final_mod[o][:, None] * np.ones_like(eff, dtype=np.int64)
+    final = np.where(att.expert_belt[o][:, None] & (eff > 1), modify(final, EXPERT_BELT), final)
+    dmg = modify(dmg, final[:, :, None])
+    dmg = np.where(eff[:, :, None] > 0, np.maximum(dmg, 1), 0)
+    return dmg * moves["hits"][:, None, None]
+
+
+def matchup(att: Side, dfn: Side, store: DexStore, ls: Learnsets,
+            weather: Optional[str] = None, doubles: bool = True) -> Dict[str, Any]:
+    """Mejor movimiento de cada atacante contra cada defensor y su probabilidad de OHKO."""
+    batch = build_moves(att, store, ls)
+    k, d = len(att), len(dfn)
+    ko = np.zeros((k, d))
+    lo = np.zeros((k, d))
+    hi = np.zeros((k, d))
+    best = np.full((k, d), -1, dtype=np.int64)
+    if len(batch) and d:
+        mv = batch.arrays()
+        rolls = damage_rolls(att, mv, dfn, store, weather=weather, doubles=doubles)
+        hp = dfn.stats[:, 0][None, :, None]
+        ko_e = (rolls >= hp).mean(axis=2) * mv["accuracy"][:, None]
+        pct_e = rolls.mean(axis=2) * 100.0 / hp[:, :, 0]
+        # desempate por daño medio; owner es contiguo, así que basta un corte por atacante
+        key = ko_e * 1e5 + np.minimum(pct_e, 9999.0)
+        starts = np.searchsorted(mv["owner"], np.arange(k))
+        ends = np.searchsorted(mv["owner"], np.arange(k), side="right")
+        for i in range(k):
+            if ends[i] == starts[i]:
+                continue
+            j = starts[i] + key[starts[i]:ends[i]].argmax(axis=0)
+            cols = np.arange(d)
+            best[i] = j
+            ko[i] = ko_e[j, cols]
+            lo[i] = rolls[j, cols, 0] * 100.0 / dfn.stats[:, 0]
+            hi[i] = rolls[j, cols, -1] * 100.0 / dfn.stats[:, 0]
+    names = batch.names + [None]  # best == -1 -> None
+    return {
+        "attackers": att.names,
+        "defenders": dfn.names,
+        "ko": np.round(ko, 3).tolist(),
+        "move": [[names[j] for j in row] for row in best.tolist()],
+        "damage_pct": np.round(np.stack([lo, hi], axis=-1), 1).tolist(),
+    }
+
+
+def _as_sets(items: Iterable[Any]) -> List[Dict[str, Any]]:
+    return [{"name": x} if isinstance(x, str) else dict(x) for x in items]
+
+
+def damage_matrix(team: Sequence[Any], threats: Sequence[Any], direction: str = "both",
+                  weather: Optional[str] = None, doubles: bool = True,
+                  store: Optional[DexStore] = None, ls: Optional[Learnsets] = None,
+                  deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+    """
+    Matriz de probabilidades de KO equipo <-> amenazas. Los nombres desconocidos se listan aparte.
+    Con deadline vencido tras el primer sentido se omite el segundo ("truncated": true).
+    """
+    store = store or default_store()
+    ls = ls or default_learnsets()
+    unknown: List[str] = []
+
+    def side(items):
+        sets = []
+        for s in _as_sets(items):
+            if store.resolve(s.get("name") or "") is None:
+                unknown.append(s.get("name") or "")
+            else:
+                sets.append(s)
+        return Side(store, sets)
+
+    mine, theirs = side(team), side(threats)
+    out: Dict[str, Any] = {}
+    if direction in ("both", "team"):
+        out["team_vs_threats"] = matchup(mine, theirs, store, ls, weather=weather, doubles=doubles)
+    if direction == "both" and expired(deadline):
+        out["truncated"] = True
+    elif direction in ("both", "threats"):
+        out["threats_vs_team"] = matchup(theirs, mine, store, ls, weather=weather, doubles=doubles)
+    if unknown:
+        out["unknown"] = unknown
+    return out
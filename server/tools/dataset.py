@@ -1,19 +1,37 @@
-import pandas as pd
-from typing import List, Dict
-from ..core.models import Pokemon, TypeName
+import csv
+import hashlib
+import math
+import re
+import sys
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from ..core.records import EXTRA_FIELDS, FIELDS, SLOT_FIELDS, DexTable, PokemonRecord
 
 AGAINST_PREFIX = "Against "
 
+DATASET_PATH = Path(__file__).resolve().parents[2] / "data" / "pokemon.csv"
+# Nombres resueltos que guarda cada NameIndex (los menos usados salen primero)
+NAME_CACHE_SIZE = 4096
+
 # Asegura el set de tipos que esperamos encontrar
-ALL_TYPES: List[TypeName] = [
+ALL_TYPES: List[str] = [
     "Normal","Fire","Water","Electric","Grass","Ice","Fighting","Poison","Ground","Flying",
     "Psychic","Bug","Rock","Ghost","Dragon","Dark","Steel","Fairy"
 ]
 
+def _isna(val) -> bool:
+    return val is None or val == "" or (isinstance(val, float) and math.isnan(val))
+
 def _parse_abilities(val) -> List[str]:
     if isinstance(val, list):
         return [str(x).strip() for x in val]
-    if pd.isna(val):
+    if _isna(val):
         return []
     s = str(val).strip()
     # separadores comunes
@@ -25,57 +43,228 @@ def _parse_abilities(val) -> List[str]:
             return [x.strip() for x in s.split(sep) if x.strip()]
     return [s] if s else []
 
-def load_pokemon_df(path: str) -> pd.DataFrame:
+def load_pokemon_df(path: str):
+    import pandas as pd  # sólo para quien quiera el DataFrame; el servidor no lo necesita
     df = pd.read_csv(path)
     # normaliza NaN en "Type 2"
     if "Type 2" in df.columns:
-        df["Type 2"] = df["Type 2"].where(pd.notna(df["Type 2"]), None)
+        df["Type 2"] = df["Type 2"].astype(object).where(pd.notna(df["Type 2"]), None)
     # parse abilities
     if "Abilities" in df.columns:
         df["Abilities"] = df["Abilities"].apply(_parse_abilities)
     return df
 
-def _row_against_map(row: pd.Series) -> Dict[TypeName, float]:
-    m: Dict[TypeName, float] = {}
+def _cell(val: str) -> Any:
+    """Celda del CSV como la tipa read_csv: vacío -> None, número -> int/float, resto str."""
+    if val == "":
+        return None
+    try:
+        return int(val)
+    except ValueError:
+        pass
+    try:
+        return float(val)
+    except ValueError:
+        return val
+
+def _row_against(row: Dict[str, Any]) -> List[float]:
+    out: List[float] = []
     for t in ALL_TYPES:
-        col = f"{AGAINST_PREFIX}{t}"
-        if col in row and pd.notna(row[col]):
-            try:
-                m[t] = float(row[col])
-            except Exception:
-                m[t] = 1.0
-        else:
-            m[t] = 1.0
-    return m
-
-def load_pokemon(path: str) -> List[Pokemon]:
-    df = load_pokemon_df(path)
-    pokes: List[Pokemon] = []
-    for _, r in df.iterrows():
-        data = r.to_dict()
-
-        # Mapa against
-        against = _row_against_map(r)
-        data["against"] = against
-
-        # Ajustar nombres que chocan con Pydantic
+        val = row.get(f"{AGAINST_PREFIX}{t}")
+        try:
+            out.append(1.0 if _isna(val) else float(val))
+        except (TypeError, ValueError):
+            out.append(1.0)
+    return out
+
+def _int(v: Any) -> int:
+    if isinstance(v, float) and not v.is_integer():
+        raise ValueError(f"expected an integer, got {v}")
+    return int(v)
+
+def _bool(v: Any) -> bool:
+    if v not in (0, 1):
+        raise ValueError(f"expected 0/1, got {v}")
+    return bool(v)
+
+def _type(v: Any) -> str:
+    if v not in ALL_TYPES:
+        raise ValueError(f"unknown type {v!r}")
+    return sys.intern(v)
+
+def _str(v: Any) -> str:
+    return sys.intern(str(v))
+
+# Conversión por columna (la misma coerción que hacía pydantic); las opcionales admiten vacío
+_REQUIRED = {"number", "name", "type1", "hp", "att", "deff", "spa", "spd", "spe"}
+_CONVERT: Dict[str, Callable[[Any], Any]] = {
+    "number": _int, "name": str, "type1": _type, "type2": _type,
+    "hp": _int, "att": _int, "deff": _int, "spa": _int, "spd": _int, "spe": _int,
+    "bst": _int, "mean": float, "std": float, "generation": _int, "experience_type": _str,
+    "exp_to_100": _int, "final_evolution": _bool, "catch_rate": _int, "legendary": _bool,
+    "mega_evolution": _bool, "alolan_form": _bool, "galarian_form": _bool,
+    "height_m": float, "weight_kg": float, "bmi": float,
+}
+
+def _record_values(data: Dict[str, Any]) -> List[Any]:
+    """Valores en el orden de FIELDS; una columna opcional inválida queda en None."""
+    values: List[Any] = []
+    for name, col in FIELDS:
+        if name == "abilities":
+            # las habilidades se repiten mucho entre filas: una sola copia de cada string
+            values.append([sys.intern(a) for a in _parse_abilities(data.get(col))])
+            continue
+        v = data.get(col)
+        if v is None:
+            if name in _REQUIRED:
+                raise ValueError(f"{data.get('Name')!r}: missing {col}")
+            values.append(None)
+            continue
         try:
-            p = Pokemon(**data)
-        except Exception:
-            minimal = {
-                "Number": int(r["Number"]),
-                "Name": str(r["Name"]),
-                "Type 1": str(r["Type 1"]),
-                "Type 2": (str(r["Type 2"]) if r.get("Type 2") is not None and pd.notna(r["Type 2"]) else None),
-                "Abilities": r.get("Abilities", []),
-                "HP": int(r["HP"]),
-                "Att": int(r["Att"]),
-                "Def": int(r["Def"]),
-                "Spa": int(r["Spa"]),
-                "Spd": int(r["Spd"]),
-                "Spe": int(r["Spe"]),
-                "against": against
-            }
-            p = Pokemon(**minimal)
-        pokes.append(p)
-    return pokes
+            values.append(_CONVERT[name](v))
+        except (TypeError, ValueError):
+            if name in _REQUIRED:
+                raise
+            values.append(None)
+    return values
+
+def load_pokemon(path: str) -> List[PokemonRecord]:
+    """
+    Lee el CSV con el módulo csv (sin pandas: importar pandas cuesta más que leer el archivo)
+    y devuelve registros con __slots__ que comparten una sola matriz against (N, 18).
+    """
+    rows: List[List[Any]] = []
+    extra: List[List[float]] = []
+    against: List[List[float]] = []
+    slot_pos = [FIELDS.index(next(f for f in FIELDS if f[0] == name)) for name in SLOT_FIELDS]
+    extra_pos = [FIELDS.index(next(f for f in FIELDS if f[0] == name)) for name, _ in EXTRA_FIELDS]
+    with open(path, newline="", encoding="utf-8") as f:
+        for raw in csv.DictReader(f):
+            data = {k: _cell(v) for k, v in raw.items()}
+            data["Abilities"] = raw.get("Abilities")
+            values = _record_values(data)
+            rows.append([values[i] for i in slot_pos])
+            extra.append([math.nan if values[i] is None else float(values[i]) for i in extra_pos])
+            against.append(_row_against(data))
+    n = len(rows)
+    table = DexTable(np.array(against, dtype=np.float32).reshape(n, len(ALL_TYPES)),
+                     np.array(extra, dtype=np.float64).reshape(n, len(EXTRA_FIELDS)))
+    # compartidas por todos los registros y el DexStore: sólo lectura
+    table.against.flags.writeable = False
+    table.extra.flags.writeable = False
+    return [PokemonRecord(values, i, table) for i, values in enumerate(rows)]
+
+
+@lru_cache(maxsize=None)
+def dataset_version() -> str:
+    """Huella corta del CSV por defecto (invalida cachés en disco si cambia el dataset)."""
+    return hashlib.sha1(DATASET_PATH.read_bytes()).hexdigest()[:12]
+
+
+@lru_cache(maxsize=None)
+def default_pokemon() -> Tuple[PokemonRecord, ...]:
+    """Dataset por defecto (data/pokemon.csv), cargado una sola vez por proceso."""
+    return tuple(load_pokemon(str(DATASET_PATH)))
+
+
+# --- Resolución de nombres (Showdown <-> dataset) ---
+# Palabras de relleno que el CSV añade a las formas ("Calyrex Shadow Rider", "Aegislash Shield Form")
+_FILLER_TOKENS = {"form", "forme", "style", "size", "cloak", "mode", "rider", "sword", "shield", "face"}
+_TOKEN_ALIASES = {"alola": "alolan", "galar": "galarian"}
+# Formas por defecto cuando Showdown usa el nombre base y el CSV sólo tiene formas
+_DEFAULT_FORMS = {
+    "urshifu": "Urshifu Single Strike Style",
+    "aegislash": "Aegislash Shield Form",
+    "deoxys": "Deoxys Normal Form",
+    "pumpkaboo": "Average Size Pumpkaboo",
+    "gourgeist": "Average Size Gourgeist",
+    "wormadam": "Wormadam Plant Cloak",
+    "oricorio": "Oricorio Baile Style",
+    "minior": "Minior Meteor Form",
+}
+_TOKEN_RE = re.compile(r"[a-z0-9%]+")
+
+
+def name_key(name: str) -> str:
+    """Clave exacta: minúsculas sin espacios ni signos ("Ho-Oh" -> "hooh")."""
+    return "".join(_TOKEN_RE.findall(str(name or "").lower()))
+
+
+def name_tokens(name: str) -> FrozenSet[str]:
+    toks = (_TOKEN_ALIASES.get(t, t) for t in _TOKEN_RE.findall(str(name or "").lower()))
+    return frozenset(t for t in toks if t not in _FILLER_TOKENS)
+
+
+class NameIndex:
+    """
+    Resuelve nombres libres (estilo Showdown: "Ninetales-Alola", "Calyrex-Shadow",
+    "Indeedee-F") a la posición del Pokémon en el dataset.
+    """
+
+    def __init__(self, names: Iterable[str]):
+        self.names: List[str] = [str(n) for n in names]
+        self._exact: Dict[str, int] = {}
+        self._tokens: List[FrozenSet[str]] = []
+        self._by_tokens: Dict[FrozenSet[str], int] = {}
+        self._token_freq: Dict[str, int] = {}
+        for i, n in enumerate(self.names):
+            self._exact.setdefault(name_key(n), i)
+            toks = name_tokens(n)
+            self._tokens.append(toks)
+            self._by_tokens.setdefault(toks, i)
+            for t in toks:
+                self._token_freq[t] = self._token_freq.get(t, 0) + 1
+        # LRU acotado: los nombres llegan de los clientes y no deben hacer crecer la memoria sin límite
+        self._cache: "OrderedDict[str, Optional[int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def resolve(self, name: str) -> Optional[int]:
+        key = name_key(name)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        idx = self._resolve_uncached(name, key)
+        with self._lock:
+            self._cache[key] = idx
+            while len(self._cache) > NAME_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return idx
+
+    def resolve_name(self, name: str) -> Optional[str]:
+        idx = self.resolve(name)
+        return None if idx is None else self.names[idx]
+
+    def _resolve_uncached(self, name: str, key: str) -> Optional[int]:
+        if not key:
+            return None
+        if key in self._exact:
+            return self._exact[key]
+        if key in _DEFAULT_FORMS:
+            return self._exact.get(name_key(_DEFAULT_FORMS[key]))
+        toks = name_tokens(name)
+        if toks in self._by_tokens:
+            return self._by_tokens[toks]
+        # sin un token propio de la especie ("Mega", "Alolan") no adivinamos
+        if not any(self._token_freq.get(t, 0) <= 4 for t in toks):
+            return None
+        # el nombre pedido es más corto que el del CSV ("Eiscue-Noice" -> "Eiscue Noice Face")
+        best, best_extra = None, None
+        for i, t in enumerate(self._tokens):
+            if toks <= t:
+                extra = len(t) - len(toks)
+                if best_extra is None or extra < best_extra:
+                    best, best_extra = i, extra
+        if best is not None:
+            return best
+        # el nombre pedido trae sufijos que el CSV no distingue ("Indeedee-F", "Charizard-Gmax")
+        best, best_len = None, 0
+        for i, t in enumerate(self._tokens):
+            if t and t <= toks and len(t) > best_len:
+                best, best_len = i, len(t)
+        return best
+
+
+@lru_cache(maxsize=None)
+def default_name_index() -> NameIndex:
+    return NameIndex(p.name for p in default_pokemon())
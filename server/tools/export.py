@@ -1,13 +1,15 @@
 # server/tools/export.py
+from typing import List
+
 from ..core.models import Team
+from . import showdown
+
+
 def team_to_showdown(team: Team) -> str:
-    lines = []
-    for m in team.members:
-        lines += [
-            f"{m.name} @ Sitrus Berry",
-            "Ability: ---",
-            "Level: 50",
-            "EVs: 4 HP / 252 Atk / 252 Spe",
-            "- Move1","- Move2","- Move3","- Move4",""
-        ]
-    return "\n".join(lines)
+    """Convierte un equipo al formato de Pokémon Showdown"""
+    return showdown.team_to_showdown(team.pokemon)
+
+
+def teams_to_showdown(teams: List[Team]) -> str:
+    """Batch: varios equipos con cabeceras === [formato] nombre ==="""
+    return showdown.teams_to_showdown(teams)
@@ -1,11 +1,14 @@
-from typing import List
+from typing import List, Union
 from ..core.models import Pokemon, Constraints
+from ..core.records import PokemonRecord
 
-def bulk_score(p: Pokemon) -> int:
+Row = Union[PokemonRecord, Pokemon]
+
+def bulk_score(p: Row) -> int:
     return p.hp + p.deff + p.spd
 
-def apply_filters(pokes: List[Pokemon], c: Constraints) -> List[Pokemon]:
-    res: List[Pokemon] = []
+def apply_filters(pokes: List[Row], c: Constraints) -> List[Row]:
+    res: List[Row] = []
     for p in pokes:
         if c.include_types and not (p.type1 in c.include_types or (p.type2 and p.type2 in c.include_types)):
             continue
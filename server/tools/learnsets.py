@@ -0,0 +1,180 @@
+# server/tools/learnsets.py
+"""
+Movimientos y learnsets con índices de bits.
+
+- data/moves.csv: tabla de movimientos (tipo, categoría, potencia, prioridad, objetivo).
+- data/learnsets.txt: "Nombre: id id id ..." (una línea por Pokémon).
+
+Índices (NumPy, empaquetados con packbits):
+- by_pokemon: (N, ceil(M/8)) uint8 -> bitset de movimientos de cada Pokémon
+- by_move:    (M, ceil(N/8)) uint8 -> bitset de Pokémon que aprenden cada movimiento
+
+Los datos incluidos son un subconjunto curado; `known` marca qué filas del
+dataset tienen learnset, para no tratar "sin datos" como "no lo aprende":
+las máscaras de filtro (learners, require_moves_mask, role_masks) dejan
+pasar las filas sin datos salvo con `unknown=False`.
+"""
+import csv
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set
+
+import numpy as np
+
+from .dataset import name_key
+from .store import DexStore, TYPE_INDEX, default_store
+from .synergy import TYPES
+
+DATA = Path(__file__).resolve().parents[2] / "data"
+MOVES_PATH = DATA / "moves.csv"
+LEARNSETS_PATH = DATA / "learnsets.txt"
+
+CATEGORIES = ("Physical", "Special", "Status")
+PHYSICAL, SPECIAL, STATUS = 0, 1, 2
+SPREAD_TARGETS = {"allAdjacentFoes", "allAdjacent"}
+
+# Roles que se deducen de los movimientos (need_roles / suggest_member)
+MOVE_ROLES: Dict[str, Sequence[str]] = {
+    "fake_out": ("fakeout",),
+    "redirection": ("followme", "ragepowder"),
+    "tailwind": ("tailwind",),
+    "trick_room_setter": ("trickroom",),
+    "speed_control": ("tailwind", "trickroom", "icywind", "electroweb", "thunderwave", "scaryface"),
+    "helping_hand": ("helpinghand",),
+    "wide_guard": ("wideguard",),
+    "screens": ("reflect", "lightscreen", "auroraveil"),
+}
+
+
+class Learnsets:
+    def __init__(self, store: DexStore, moves_path: Path = MOVES_PATH, learnsets_path: Path = LEARNSETS_PATH):
+        self.store = store
+        with moves_path.open("r", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        m = len(rows)
+        self.move_ids: List[str] = [r["id"] for r in rows]
+        self.move_names: List[str] = [r["name"] for r in rows]
+        self._move_index: Dict[str, int] = {}
+        for j, r in enumerate(rows):
+            self._move_index[r["id"]] = j
+            self._move_index[name_key(r["name"])] = j
+        self.move_type = np.array([TYPE_INDEX.get(r["type"], -1) for r in rows], dtype=np.int8)
+        self.category = np.array([CATEGORIES.index(r["category"]) for r in rows], dtype=np.int8)
+        self.power = np.array([int(r["power"] or 0) for r in rows], dtype=np.int16)
+        self.accuracy = np.array([float(r["accuracy"] or 100) / 100.0 for r in rows], dtype=np.float32)
+        self.priority = np.array([int(r["priority"] or 0) for r in rows], dtype=np.int8)
+        self.hits = np.array([int(r.get("hits") or 1) for r in rows], dtype=np.int8)
+        self.spread = np.array([r["target"] in SPREAD_TARGETS for r in rows], dtype=bool)
+        self.damaging = self.category != STATUS
+
+        n = len(store)
+        learn = np.zeros((n, m), dtype=bool)
+        self.known = np.zeros(n, dtype=bool)
+        self.unresolved: List[str] = []
+        with learnsets_path.open("r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            name, _, moves = line.rpartition(":")
+            i = store.resolve(name)
+            if i is None:
+                self.unresolved.append(name.strip())
+                continue
+            self.known[i] = True
+            for mid in moves.split():
+                j = self._move_index.get(mid)
+                if j is not None:
+                    learn[i, j] = True
+        self.by_pokemon = np.packbits(learn, axis=1)
+        self.by_move = np.packbits(learn.T, axis=1)
+        self.n_moves = m
+
+        # tipos de ataque (movimientos de daño) que puede usar cada Pokémon: (N, 18)
+        type_onehot = np.zeros((m, len(TYPE_INDEX)), dtype=bool)
+        ok = self.damaging & (self.move_type >= 0)
+        type_onehot[np.nonzero(ok)[0], self.move_type[ok]] = True
+        self.attack_types = (learn.astype(np.uint8) @ type_onehot.astype(np.uint8)) > 0
+
+        self.role_masks: Dict[str, np.ndarray] = {
+            role: self.learners(moves) for role, moves in MOVE_ROLES.items()
+        }
+        # roles_of sólo afirma lo que consta en los datos
+        self._row_roles: List[frozenset] = [frozenset()] * n
+        for i in np.nonzero(self.known)[0]:
+            self._row_roles[i] = frozenset(r for r, mask in self.role_masks.items() if mask[i])
+
+    # --- movimientos ---
+    def move_id(self, move: str) -> Optional[int]:
+        j = self._move_index.get(move)
+        if j is None:
+            j = self._move_index.get(name_key(move))
+        return j
+
+    def move_ids_for(self, moves: Iterable[str]) -> List[int]:
+        out = []
+        for mv in moves:
+            j = self.move_id(mv)
+            if j is not None:
+                out.append(j)
+        return out
+
+    def move_types(self, moves: Iterable[str], damaging_only: bool = True) -> Set[str]:
+        out = set()
+        for j in self.move_ids_for(moves):
+            if (not damaging_only or self.damaging[j]) and self.move_type[j] >= 0:
+                out.add(TYPES[self.move_type[j]])
+        return out
+
+    # --- consultas vectorizadas ---
+    def learners(self, moves: Iterable[str], require_all: bool = False, unknown: bool = True) -> np.ndarray:
+        """
+        Máscara (N,) de Pokémon que aprenden alguno (o todos) de los movimientos. Las filas sin
+        learnset pasan salvo con unknown=False; un movimiento que no existe no lo aprende nadie.
+        """
+        ids = self.move_ids_for(moves)
+        n = len(self.store)
+        if not ids:
+            return np.zeros(n, dtype=bool)
+        bits = self.by_move[ids]
+        packed = np.bitwise_and.reduce(bits, axis=0) if require_all else np.bitwise_or.reduce(bits, axis=0)
+        mask = np.unpackbits(packed, count=n).astype(bool)
+        return mask | ~self.known if unknown else mask
+
+    def require_moves_mask(self, moves: Iterable[str], unknown: bool = True) -> np.ndarray:
+        """Máscara para filtros "debe aprender todos"; con un movimiento desconocido nadie pasa."""
+        moves = list(moves)
+        if len(self.move_ids_for(moves)) < len(moves):
+            return np.zeros(len(self.store), dtype=bool)
+        return self.learners(moves, require_all=True, unknown=unknown)
+
+    def role_mask(self, role: str) -> Optional[np.ndarray]:
+        return self.role_masks.get(role)
+
+    def learns(self, row: int, move: str) -> bool:
+        j = self.move_id(move)
+        if j is None:
+            return False
+        return bool((self.by_pokemon[row, j >> 3] >> (7 - (j & 7))) & 1)
+
+    def moves_of(self, row: int) -> List[str]:
+        bits = np.unpackbits(self.by_pokemon[row], count=self.n_moves).astype(bool)
+        return [self.move_names[j] for j in np.nonzero(bits)[0]]
+
+    def roles_of(self, row: int) -> Set[str]:
+        return set(self._row_roles[row])
+
+
+@lru_cache(maxsize=None)
+def default_learnsets() -> Learnsets:
+    return Learnsets(default_store())
+
+
+def no_learnset(store: DexStore, role: str) -> np.ndarray:
+    """Filas sin learnset si `role` sale de movimientos (MOVE_ROLES): en filtros no se descartan."""
+    if role in MOVE_ROLES:
+        ls = default_learnsets()
+        if ls.store is store:
+            return ~ls.known
+    return np.zeros(len(store), dtype=bool)
@@ -0,0 +1,101 @@
+# server/tools/pairs.py
+"""
+Matriz de compatibilidad por parejas sobre los Pokémon legales de un formato.
+
+Para cada par (a, b), a partir de la matriz `against` del DexStore:
+- cover[a, b]:  tipos en los que uno es débil (x2 o más) y el otro resiste (< x1),
+                contando los dos sentidos (0..36)
+- shared[a, b]: tipos a los que ambos son débiles (0..18)
+
+Son enteros pequeños, así que se guardan exactos en uint8 (2, N, N) en
+<cache_dir>/pairs/ y se abren con memmap: ~950 legales son ~1.8 MB por formato.
+La afinidad de un candidato con un núcleo es la suma de sus filas.
+"""
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+
+from ..core.config import cache_dir
+from ..core.formats import rules_version
+from ..core.legality import format_rules
+from .dataset import dataset_version
+from .store import DexStore, default_store
+
+COVER_WEIGHT = 6     # puntos de suggest_team por debilidad cubierta
+SHARED_WEIGHT = 12   # puntos que resta cada debilidad compartida
+
+
+def build_pair_matrix(against: np.ndarray) -> np.ndarray:
+    """(2, N, N) uint8: [0] = cover, [1] = shared."""
+    weak = (against >= 2).astype(np.float32)
+    resist = (against < 1).astype(np.float32)
+    one_way = weak @ resist.T  # a débil donde b resiste
+    cover = one_way + one_way.T
+    shared = weak @ weak.T
+    return np.stack([cover, shared]).astype(np.uint8)
+
+
+def _cache_path(fmt: str, n: int) -> Path:
+    # las reglas entran en la clave: otra denylist con el mismo número de legales son otras filas
+    return cache_dir() / "pairs" / f"{fmt}-{dataset_version()}-{rules_version()}-{n}.npy"
+
+
+class PairMatrix:
+    """Compatibilidad entre legales de `fmt`; se indexa por fila del DexStore."""
+
+    def __init__(self, fmt: str, store: DexStore, use_cache: bool = True):
+        self.fmt = fmt
+        self.store = store
+        self.rows = np.nonzero(format_rules(fmt).legal)[0]
+        # posición en la matriz de cada fila del store (-1 = no legal)
+        self.pos = np.full(len(store), -1, dtype=np.int64)
+        self.pos[self.rows] = np.arange(len(self.rows))
+        self.matrix = self._load(use_cache)
+
+    def _load(self, use_cache: bool) -> np.ndarray:
+        n = len(self.rows)
+        path = _cache_path(self.fmt, n) if use_cache else None
+        if path is not None and path.exists():
+            try:
+                m = np.load(path, mmap_mode="r")
+                if m.shape == (2, n, n) and m.dtype == np.uint8:
+                    return m
+            except (OSError, ValueError):
+                pass  # caché corrupta: se reconstruye
+        m = build_pair_matrix(self.store.against[self.rows])
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp, "wb") as f:
+                np.save(f, m)
+            os.replace(tmp, path)  # escritura atómica: otro proceso nunca ve un archivo a medias
+            return np.load(path, mmap_mode="r")
+        return m
+
+    def scores(self, cand_rows: Iterable[int], core_rows: Iterable[int]) -> np.ndarray:
+        """Afinidad (C,) de cada candidato con el núcleo: suma de COVER - SHARED sobre sus miembros."""
+        cand = self.pos[np.asarray(list(cand_rows), dtype=np.int64)]
+        core = self.pos[np.asarray(list(core_rows), dtype=np.int64)]
+        core = core[core >= 0]
+        out = np.zeros(len(cand), dtype=np.int64)
+        if not len(core):
+            return out
+        ok = cand >= 0
+        block = self.matrix[:, core][:, :, cand[ok]].astype(np.int64)  # (2, K, C)
+        out[ok] = COVER_WEIGHT * block[0].sum(axis=0) - SHARED_WEIGHT * block[1].sum(axis=0)
+        return out
+
+    def pair(self, a: int, b: int) -> Optional[tuple]:
+        """(cover, shared) de dos filas del store, o None si alguna no es legal."""
+        i, j = self.pos[a], self.pos[b]
+        if i < 0 or j < 0:
+            return None
+        return int(self.matrix[0, i, j]), int(self.matrix[1, i, j])
+
+
+@lru_cache(maxsize=None)
+def default_pairs(fmt: str) -> PairMatrix:
+    return PairMatrix(fmt, default_store())
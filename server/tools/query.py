@@ -0,0 +1,427 @@
+# server/tools/query.py
+"""
+Lenguaje de consultas sobre el pool (pool_filter, suggest_member, suggest_team).
+
+    spe >= 100 and (type:fire or ability:drought) and bulk > 300 order by spa desc limit 20
+
+- comparaciones: <, <=, >, >=, = (==), != entre expresiones con + - * / sobre
+  columnas (hp, atk, def, spa, spd, spe, bulk = hp+def+spd, bst, offense =
+  max(atk, spa), number) y números
+- predicados campo:valor (sin distinguir mayúsculas; el valor puede ir entre
+  comillas): type:, ability: (subcadena), move: (lo aprende), role:
+  (infer_roles), weak:/resists:/immune: (tipo de ataque)
+- and, or, not y paréntesis; `order by <expr> [asc|desc], ...` y `limit N`
+
+Una consulta se parsea una vez y se compila a un Plan: un árbol de funciones
+NumPy que calculan la máscara de todas las filas del DexStore a la vez, más
+las claves de orden. Las comparaciones de `spe` con un número (min_speed,
+max_speed...) van por SpeedIndex.base_range: dos búsquedas binarias sobre
+las Spe base ordenadas, O(log n + k), en vez de comparar todas las filas. Los planes se cachean por el texto normalizado (tokens en
+minúsculas separados por un espacio) y cada plan guarda su máscara por store,
+así que repetir una consulta no vuelve a evaluar nada.
+"""
+import re
+import weakref
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .learnsets import default_learnsets, no_learnset
+from .roles import role_table
+from .speed import default_speed_index
+from .store import TYPE_INDEX, DexStore
+
+MAX_PLANS = 512
+
+KEYWORDS = frozenset({"and", "or", "not", "order", "by", "asc", "desc", "limit"})
+COMPARE = {"<": np.less, "<=": np.less_equal, ">": np.greater, ">=": np.greater_equal,
+           "=": np.equal, "==": np.equal, "!=": np.not_equal}
+ARITH = {"+": np.add, "-": np.subtract, "*": np.multiply, "/": np.true_divide}
+# columna -> función sobre la matriz de stats (N, 6) int64
+COLUMNS: Dict[str, Callable[[np.ndarray], np.ndarray]] = {
+    "hp": lambda s: s[:, 0], "atk": lambda s: s[:, 1], "def": lambda s: s[:, 2],
+    "spa": lambda s: s[:, 3], "spd": lambda s: s[:, 4], "spe": lambda s: s[:, 5],
+    "bulk": lambda s: s[:, 0] + s[:, 2] + s[:, 4], "bst": lambda s: s.sum(axis=1),
+    "offense": lambda s: np.maximum(s[:, 1], s[:, 3]),
+}
+ALIASES = {"att": "atk", "attack": "atk", "deff": "def", "defense": "def", "spatk": "spa", "spdef": "spd",
+           "speed": "spe"}
+PREDICATES = ("type", "ability", "move", "role", "weak", "resists", "immune")
+
+_TYPE_BY_LOWER = {t.lower(): t for t in TYPE_INDEX}
+_TOKEN = re.compile(r"\s*(?:(?P<num>\d+(?:\.\d+)?)|(?P<op>>=|<=|==|!=|[<>=()+\-*/:,])|(?P<word>[A-Za-z_][A-Za-z0-9_]*))")
+# tras "campo:" el valor llega hasta el siguiente espacio o paréntesis (admite guiones: Urshifu-Rapid-Strike)
+_VALUE = re.compile(r"\s*(?:\"(?P<dq>[^\"]*)\"|'(?P<sq>[^']*)'|(?P<bare>[^\s(),]+))")
+
+
+class QueryError(ValueError):
+    """Consulta mal formada o con campos desconocidos."""
+
+
+Token = Tuple[str, str]  # (clase, texto): num, op, word, value
+
+
+def tokenize(text: str) -> List[Token]:
+    out: List[Token] = []
+    pos, end = 0, len(text)
+    while pos < end:
+        if text[pos:].strip() == "":
+            break
+        if out and out[-1] == ("op", ":"):
+            m = _VALUE.match(text, pos)
+            if m is None:
+                raise QueryError(f"missing value at {pos}")
+            out.append(("value", next(v for v in m.group("dq", "sq", "bare") if v is not None).strip().lower()))
+        else:
+            m = _TOKEN.match(text, pos)
+            if m is None or m.end() == pos:
+                raise QueryError(f"unexpected character {text[pos:].strip()[:1]!r} at {pos}")
+            kind = m.lastgroup
+            value = m.group(kind)
+            out.append((kind, value.lower() if kind == "word" else value))
+        pos = m.end()
+    return out
+
+
+def normalize(tokens: Sequence[Token]) -> str:
+    """Texto canónico (clave de la caché de planes)."""
+    parts = []
+    for kind, text in tokens:
+        if kind == "value":
+            parts.append('"' + text + '"' if re.search(r"[\s()\",]", text) else text)
+        else:
+            parts.append(text)
+    text = " ".join(parts)
+    return text.replace(" : ", ":").replace("( ", "(").replace(" )", ")")
+
+
+class _Columns:
+    """Columnas de un DexStore para evaluar planes (los índices caros se crean al primer uso)."""
+
+    def __init__(self, store: DexStore):
+        self.store = store
+        self.stats = store.stats.astype(np.int64)
+        self._abilities: Optional[List[str]] = None
+
+    def column(self, name: str) -> np.ndarray:
+        if name == "number":
+            return self.store.numbers.astype(np.int64)
+        return COLUMNS[name](self.stats)
+
+    def abilities(self) -> List[str]:
+        if self._abilities is None:
+            self._abilities = [a.lower() for a in self.store.abilities]
+        return self._abilities
+
+    def speed_range(self, lo: Optional[int], hi: Optional[int]) -> np.ndarray:
+        """Máscara de Spe base en [lo, hi]; con el store por defecto, por el índice ordenado."""
+        index = default_speed_index()
+        if index.store is not self.store:
+            spe = self.stats[:, 5]
+            return (spe >= (lo if lo is not None else spe.min())) & (spe <= (hi if hi is not None else spe.max()))
+        m = np.zeros(len(self.store), dtype=bool)
+        if lo is None or hi is None or lo <= hi:
+            m[index.base_range(lo, hi)] = True
+        return m
+
+    def learnsets(self):
+        ls = default_learnsets()
+        if ls.store is not self.store:
+            raise QueryError("move: needs the default dataset")
+        return ls
+
+
+@lru_cache(maxsize=8)
+def _columns(store: DexStore) -> _Columns:
+    return _Columns(store)
+
+
+Expr = Callable[[_Columns], np.ndarray]
+
+
+class _Parser:
+    def __init__(self, tokens: Sequence[Token]):
+        self.tokens = list(tokens)
+        self.i = 0
+
+    def peek(self, offset: int = 0) -> Token:
+        j = self.i + offset
+        return self.tokens[j] if j < len(self.tokens) else ("end", "")
+
+    def take(self) -> Token:
+        tok = self.peek()
+        self.i += 1
+        return tok
+
+    def accept(self, text: str) -> bool:
+        if self.peek()[1] == text and self.peek()[0] in ("word", "op"):
+            self.i += 1
+            return True
+        return False
+
+    def expect(self, text: str) -> None:
+        if not self.accept(text):
+            raise QueryError(f"expected {text!r}, got {self.peek()[1] or 'end of query'!r}")
+
+    # query := [expr] [order by key {, key}] [limit N]
+    def query(self) -> "Plan":
+        where = None
+        if self.peek()[1] not in ("order", "limit", ""):
+            where = self.expr()
+        order: List[Tuple[Expr, bool]] = []
+        if self.accept("order"):
+            self.expect("by")
+            while True:
+                key = self.arith()
+                desc = self.accept("desc")
+                if not desc:
+                    self.accept("asc")
+                order.append((key, desc))
+                if not self.accept(","):
+                    break
+        limit = None
+        if self.accept("limit"):
+            kind, text = self.take()
+            if kind != "num" or "." in text:
+                raise QueryError("limit needs an integer")
+            limit = int(text)
+        if self.peek()[0] != "end":
+            raise QueryError(f"unexpected {self.peek()[1]!r} (values with spaces go in quotes: move:\"fake out\")")
+        return Plan(where, order, limit)
+
+    def expr(self) -> Expr:
+        left = self.conj()
+        while self.accept("or"):
+            a, b = left, self.conj()
+            left = lambda c, a=a, b=b: a(c) | b(c)
+        return left
+
+    def conj(self) -> Expr:
+        left = self.neg()
+        while self.accept("and"):
+            a, b = left, self.neg()
+            left = lambda c, a=a, b=b: a(c) & b(c)
+        return left
+
+    def neg(self) -> Expr:
+        if self.accept("not"):
+            inner = self.neg()
+            return lambda c: ~inner(c)
+        if self.accept("("):
+            inner = self.expr()
+            self.expect(")")
+            return inner
+        kind, text = self.peek()
+        if kind == "word" and self.peek(1) == ("op", ":"):
+            self.i += 2
+            value = self.take()
+            if value[0] != "value":
+                raise QueryError(f"missing value for {text}:")
+            return _predicate(text, value[1])
+        fast = self.speed_compare()
+        if fast is not None:
+            return fast
+        left = self.arith()
+        kind, op = self.take()
+        if op not in COMPARE or kind != "op":
+            raise QueryError(f"expected a comparison, got {op or 'end of query'!r}")
+        right = self.arith()
+        fn = COMPARE[op]
+        return lambda c: fn(left(c), right(c))
+
+    def speed_compare(self) -> Optional[Expr]:
+        """`spe <op> N` o `N <op> spe` sin más aritmética: rango de Spe base por el índice de velocidades."""
+        toks = [self.peek(k) for k in range(4)]
+        if toks[0][0] == "num" and toks[2][0] == "word":
+            toks = [toks[2], toks[1], toks[0], toks[3]]
+            flip = {"<": ">", "<=": ">=", ">": "<", ">=": "<="}
+            op = flip.get(toks[1][1], toks[1][1])
+        else:
+            op = toks[1][1]
+        (k0, word), (k1, _), (k2, num), nxt = toks
+        if k0 != "word" or ALIASES.get(word, word) != "spe" or k1 != "op" or k2 != "num":
+            return None
+        if op not in ("<", "<=", ">", ">=", "=", "==") or nxt[1] in ARITH:
+            return None
+        v = float(num)
+        lo = hi = None
+        if op in (">=", ">"):
+            lo = int(np.floor(v)) + 1 if op == ">" else int(np.ceil(v))
+        elif op in ("<=", "<"):
+            hi = int(np.ceil(v)) - 1 if op == "<" else int(np.floor(v))
+        else:
+            lo, hi = (int(v), int(v)) if v.is_integer() else (1, 0)
+        self.i += 3
+        return lambda c: c.speed_range(lo, hi)
+
+    # arith := term {(+|-) term};  term := atom {(*|/) atom}
+    def arith(self) -> Expr:
+        left = self.term()
+        while self.peek() in (("op", "+"), ("op", "-")):
+            fn = ARITH[self.take()[1]]
+            a, b = left, self.term()
+            left = lambda c, a=a, b=b, fn=fn: fn(a(c), b(c))
+        return left
+
+    def term(self) -> Expr:
+        left = self.atom()
+        while self.peek() in (("op", "*"), ("op", "/")):
+            fn = ARITH[self.take()[1]]
+            a, b = left, self.atom()
+            left = lambda c, a=a, b=b, fn=fn: fn(a(c), b(c))
+        return left
+
+    def atom(self) -> Expr:
+        kind, text = self.take()
+        if kind == "num":
+            value = float(text) if "." in text else int(text)
+            return lambda c: value
+        if kind == "op" and text == "-":
+            inner = self.atom()
+            return lambda c: -inner(c)
+        if kind == "word" and text not in KEYWORDS:
+            name = ALIASES.get(text, text)
+            if name not in COLUMNS and name != "number":
+                raise QueryError(f"unknown field {text!r} (columns: {', '.join(sorted(COLUMNS) + ['number'])})")
+            return lambda c: c.column(name)
+        raise QueryError(f"unexpected {text or 'end of query'!r}")
+
+
+def _type_of(value: str) -> str:
+    t = _TYPE_BY_LOWER.get(value)
+    if t is None:
+        raise QueryError(f"unknown type {value!r}")
+    return t
+
+
+def _predicate(field: str, value: str) -> Expr:
+    if field == "type":
+        col = TYPE_INDEX[_type_of(value)]
+        return lambda c: c.store.stab[:, col]
+    if field in ("weak", "resists", "immune"):
+        col = TYPE_INDEX[_type_of(value)]
+        test = {"weak": lambda m: m > 1.0, "resists": lambda m: m < 1.0, "immune": lambda m: m == 0.0}[field]
+        return lambda c: test(c.store.against[:, col])
+    if field == "ability":
+        return lambda c: np.array([value in a for a in c.abilities()], dtype=bool)
+    if field == "move":
+        return lambda c: c.learnsets().require_moves_mask([value])
+    if field == "role":
+        def role(c: _Columns) -> np.ndarray:
+            pos, table = role_table(c.store)
+            if value not in pos:
+                raise QueryError(f"unknown role {value!r} (roles: {', '.join(sorted(pos))})")
+            return table[:, pos[value]] | no_learnset(c.store, value)
+        return role
+    raise QueryError(f"unknown predicate {field!r}: (predicates: {', '.join(PREDICATES)})")
+
+
+class Plan:
+    """Consulta compilada: máscara (cacheada por store), claves de orden y límite."""
+
+    def __init__(self, where: Optional[Expr], order: Sequence[Tuple[Expr, bool]], limit: Optional[int]):
+        self.where = where
+        self.order = list(order)
+        self.limit = limit
+        self._masks: "weakref.WeakKeyDictionary[DexStore, np.ndarray]" = weakref.WeakKeyDictionary()
+
+    def mask(self, store: DexStore) -> np.ndarray:
+        """Máscara booleana sobre todas las filas de `store` (sólo lectura)."""
+        m = self._masks.get(store)
+        if m is None:
+            m = np.ones(len(store), dtype=bool)
+            if self.where is not None:
+                m = m & np.broadcast_to(np.asarray(self.where(_columns(store)), dtype=bool), (len(store),))
+            m.setflags(write=False)
+            self._masks[store] = m
+        return m
+
+    def sort(self, store: DexStore, rows: np.ndarray) -> Optional[np.ndarray]:
+        """rows en el orden de `order by` (empates: el orden de entrada); None si la consulta no ordena."""
+        if not self.order:
+            return None
+        cols = _columns(store)
+        keys = []
+        for key, desc in reversed(self.order):
+            v = np.broadcast_to(np.asarray(key(cols), dtype=np.float64), (len(store),))[rows]
+            keys.append(-v if desc else v)
+        return rows[np.lexsort(keys)] if keys else rows
+
+
+@lru_cache(maxsize=MAX_PLANS)
+def _compile(normalized: str) -> Plan:
+    return _Parser(tokenize(normalized)).query()
+
+
+@lru_cache(maxsize=MAX_PLANS)
+def compile_query(text: str) -> Plan:
+    """Plan de una consulta (cacheado por texto y por texto normalizado)."""
+    return _compile(normalize(tokenize(text)))
+
+
+def select(plan: Plan, store: DexStore, rows: np.ndarray, score: Optional[np.ndarray] = None,
+           limit: Optional[int] = None) -> np.ndarray:
+    """
+    Filas de `rows` que cumplen el plan, ordenadas por `order by` (o por `score` descendente si la consulta no
+    ordena) y cortadas por `limit` de la consulta o, si no trae, el del llamador.
+    """
+    keep = plan.mask(store)[rows]
+    rows = rows[keep]
+    ordered = plan.sort(store, rows)
+    if ordered is None:
+        ordered = rows if score is None else rows[np.argsort(-score[keep], kind="stable")]
+    n = plan.limit if plan.limit is not None else limit
+    return ordered if n is None else ordered[:max(0, n)]
+
+
+def _as_list(x: Any) -> List[Any]:
+    if x is None:
+        return []
+    return x if isinstance(x, list) else [x]
+
+
+def _quote(value: Any) -> str:
+    return '"' + str(value).replace('"', "").strip() + '"'
+
+
+def _bound(key: str, value: Any) -> int:
+    """Cota entera de un filtro clásico (min_speed...); lanza QueryError con el nombre del campo."""
+    if isinstance(value, bool):
+        raise QueryError(f"{key} must be an integer, got {value!r}")
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise QueryError(f"{key} must be an integer, got {value!r}") from None
+    if not number.is_integer():
+        raise QueryError(f"{key} must be an integer, got {value!r}")
+    return int(number)
+
+
+def from_constraints(c: Dict[str, Any]) -> str:
+    """Los filtros clásicos de constraints (pool_filter/suggest_team) como consulta."""
+    parts: List[str] = []
+
+    def types(key: str) -> List[str]:
+        return [t for t in (str(x).strip() for x in _as_list(c.get(key))) if t]
+
+    if types("include_types"):
+        parts.append("(" + " or ".join(f"type:{_quote(t)}" for t in types("include_types")) + ")")
+    if types("exclude_types"):
+        parts.append("not (" + " or ".join(f"type:{_quote(t)}" for t in types("exclude_types")) + ")")
+    for key, expr, op in (("min_speed", "spe", ">="), ("max_speed", "spe", "<="), ("min_att", "atk", ">="),
+                          ("min_spa", "spa", ">="), ("min_spdef", "spd", ">="), ("min_bulk", "bulk", ">=")):
+        if c.get(key) is not None:
+            parts.append(f"{expr} {op} {_bound(key, c[key])}")
+    for key, field in (("require_abilities", "ability"), ("require_moves", "move")):
+        parts.extend(f"{field}:{_quote(v)}" for v in _as_list(c.get(key)) if str(v).strip())
+    return " and ".join(parts)
+
+
+def combined_mask(store: DexStore, queries: Iterable[str]) -> np.ndarray:
+    """AND de las máscaras de varias consultas (las vacías no filtran)."""
+    m = np.ones(len(store), dtype=bool)
+    for q in queries:
+        if q and q.strip():
+            m = m & compile_query(q).mask(store)
+    return m
@@ -1,4 +1,7 @@
-from typing import Set
+from functools import lru_cache
+from typing import Dict, Set, Tuple
+
+import numpy as np
 
 def _abilities_text(p) -> str:
     """
@@ -59,4 +62,27 @@ def infer_roles(p, fast_threshold: int = 90) -> Set[str]:
     if spe <= 60 and bulk >= 360:
         roles.add("trick_room")
 
+    # Roles por movimientos (fake_out, redirection, tailwind...) si hay learnset
+    roles |= move_roles(p)
+
     return roles
+
+def move_roles(p) -> Set[str]:
+    from .learnsets import default_learnsets
+
+    ls = default_learnsets()
+    row = ls.store.resolve(getattr(p, "name", "") or "")
+    if row is None:
+        return set()
+    return ls.roles_of(row)
+
+@lru_cache(maxsize=None)
+def role_table(store) -> Tuple[Dict[str, int], np.ndarray]:
+    """({rol: columna}, matriz (N, R) bool) con infer_roles de todas las filas de un DexStore."""
+    per_row = [infer_roles(p) for p in store.pokemon]
+    names = sorted(set().union(*per_row))
+    pos = {r: j for j, r in enumerate(names)}
+    table = np.zeros((len(store), len(names)), dtype=bool)
+    for i, roles in enumerate(per_row):
+        table[i, [pos[r] for r in roles]] = True
+    return pos, table
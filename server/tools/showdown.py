@@ -0,0 +1,361 @@
+# server/tools/showdown.py
+"""
+Importación / exportación de equipos en formato Pokémon Showdown.
+
+Un "set" es un dict plano con las claves del modelo Pokemon de la API
+(name, item, ability, moves, nature, evs, ivs, level) más los campos de
+Gen 8 que Showdown exporta: nickname, gender, shiny, happiness,
+dynamax_level y gigantamax. `species` conserva el nombre tal como venía
+escrito en el paste; `name` es el nombre resuelto contra el dataset.
+"""
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, TextIO
+
+from .dataset import NameIndex, default_name_index
+
+STAT_LABELS = ("HP", "Atk", "Def", "SpA", "SpD", "Spe")
+
+_STAT_ALIASES = {
+    "hp": "HP",
+    "atk": "Atk", "att": "Atk", "attack": "Atk",
+    "def": "Def", "deff": "Def", "defense": "Def",
+    "spa": "SpA", "spatk": "SpA", "spattack": "SpA", "specialattack": "SpA",
+    "spd": "SpD", "spdef": "SpD", "spdefense": "SpD", "specialdefense": "SpD",
+    "spe": "Spe", "speed": "Spe",
+}
+_STAT_ALIASES.update({lab: lab for lab in STAT_LABELS})
+
+NATURES = {
+    "Hardy", "Lonely", "Brave", "Adamant", "Naughty",
+    "Bold", "Docile", "Relaxed", "Impish", "Lax",
+    "Timid", "Hasty", "Serious", "Jolly", "Naive",
+    "Modest", "Mild", "Quiet", "Bashful", "Rash",
+    "Calm", "Gentle", "Sassy", "Careful", "Quirky",
+}
+
+MAX_EV_TOTAL = 510
+MAX_EV = 252
+MAX_IV = 31
+TEAM_SIZE = 6
+
+
+def stat_label(key: str) -> Optional[str]:
+    """Normaliza una clave de stat ("spa", "Sp. Atk", "Att") a la etiqueta de Showdown."""
+    hit = _STAT_ALIASES.get(key)
+    if hit is not None:
+        return hit
+    k = "".join(ch for ch in str(key).lower() if ch.isalnum())
+    return _STAT_ALIASES.get(k)
+
+
+def _parse_spread(text: str) -> Dict[str, int]:
+    out: Dict[str, int] = {}
+    for part in text.split("/"):
+        part = part.strip()
+        if not part:
+            continue
+        val, _, stat = part.partition(" ")
+        label = stat_label(stat)
+        if label is None:
+            continue
+        try:
+            out[label] = int(val)
+        except ValueError:
+            continue
+    return out
+
+
+def _parse_header(line: str, s: Dict[str, Any]) -> None:
+    left, sep, item = line.rpartition(" @ ")
+    if not sep:
+        left, item = line, ""
+    left = left.strip()
+    if item.strip():
+        s["item"] = item.strip()
+    if left.endswith((" (M)", " (F)")):
+        s["gender"] = left[-2]
+        left = left[:-4].rstrip()
+    if left.endswith(")") and " (" in left:
+        nick, _, species = left[:-1].rpartition(" (")
+        s["nickname"] = nick.strip()
+        s["species"] = species.strip()
+    else:
+        s["species"] = left
+
+
+def parse_set(lines: Iterable[str]) -> Dict[str, Any]:
+    """Parsea las líneas de un set (sin líneas vacías) a un dict."""
+    s: Dict[str, Any] = {}
+    moves: List[str] = []
+    header_done = False
+    for raw in lines:
+        line = raw.strip()
+        if not line:
+            continue
+        if not header_done:
+            _parse_header(line, s)
+            header_done = True
+        elif line.startswith("-"):
+            moves.append(line[1:].strip())
+        elif line.startswith("Ability:"):
+            s["ability"] = line[8:].strip()
+        elif line.startswith("EVs:"):
+            s["evs"] = _parse_spread(line[4:])
+        elif line.startswith("IVs:"):
+            s["ivs"] = _parse_spread(line[4:])
+        elif line.endswith(" Nature"):
+            s["nature"] = line[:-7].strip()
+        elif line.startswith("Level:"):
+            s["level"] = _int_or_none(line[6:])
+        elif line.startswith("Shiny:"):
+            s["shiny"] = line[6:].strip().lower() == "yes"
+        elif line.startswith("Happiness:"):
+            s["happiness"] = _int_or_none(line[10:])
+        elif line.startswith("Dynamax Level:"):
+            s["dynamax_level"] = _int_or_none(line[14:])
+        elif line.startswith("Gigantamax:"):
+            s["gigantamax"] = line[11:].strip().lower() == "yes"
+        # Tera Type y otras líneas de generaciones posteriores se ignoran (dataset Gen 1–8)
+    if moves:
+        s["moves"] = moves
+    s["name"] = s.get("species", "")
+    return s
+
+
+def _int_or_none(text: str) -> Optional[int]:
+    try:
+        return int(text.strip())
+    except ValueError:
+        return None
+
+
+def validate_set(s: Dict[str, Any], index: Optional[NameIndex] = None) -> List[str]:
+    """Valida un set contra el dataset; resuelve `name` al nombre del CSV. Devuelve errores."""
+    index = index or default_name_index()
+    errors: List[str] = []
+    species = s.get("species") or s.get("name") or ""
+    resolved = index.resolve_name(species)
+    if resolved is None:
+        errors.append(f"{species or '?'}: unknown Pokémon")
+    else:
+        s["name"] = resolved
+    label = s.get("nickname") or species
+    evs = s.get("evs") or {}
+    if any(v < 0 or v > MAX_EV for v in evs.values()):
+        errors.append(f"{label}: EVs must be between 0 and {MAX_EV}")
+    if sum(evs.values()) > MAX_EV_TOTAL:
+        errors.append(f"{label}: EV total {sum(evs.values())} exceeds {MAX_EV_TOTAL}")
+    ivs = s.get("ivs") or {}
+    if any(v < 0 or v > MAX_IV for v in ivs.values()):
+        errors.append(f"{label}: IVs must be between 0 and {MAX_IV}")
+    nature = s.get("nature")
+    if nature and nature not in NATURES:
+        errors.append(f"{label}: unknown nature '{nature}'")
+    level = s.get("level")
+    if level is not None and not (1 <= int(level) <= 100):
+        errors.append(f"{label}: level must be between 1 and 100")
+    if len(s.get("moves") or []) > 4:
+        errors.append(f"{label}: more than 4 moves")
+    return errors
+
+
+def _new_team(name: Optional[str] = None, fmt: Optional[str] = None) -> Dict[str, Any]:
+    return {"name": name, "format": fmt, "pokemon": []}
+
+
+def _parse_team_header(line: str) -> Dict[str, Any]:
+    # "=== [gen8vgc2022] Mi equipo ===" -> format / name
+    body = line.strip().strip("=").strip()
+    fmt = None
+    if body.startswith("[") and "]" in body:
+        fmt, _, body = body[1:].partition("]")
+        fmt = fmt.strip() or None
+    return _new_team(body.strip() or None, fmt)
+
+
+def iter_teams(lines: Iterable[str], validate: bool = True,
+               index: Optional[NameIndex] = None, headers_only: bool = False) -> Iterator[Dict[str, Any]]:
+    """
+    Parser en streaming: consume líneas una a una y emite cada equipo en cuanto se cierra.
+    Un equipo termina en una cabecera "=== ... ===", tras 6 sets sin cabecera,
+    o tras dos o más líneas vacías seguidas.
+    Con headers_only=True sólo se parsea la primera línea de cada set (especie, item...),
+    que es lo que necesitan los análisis masivos.
+    """
+    if validate:
+        index = index or default_name_index()
+    team: Optional[Dict[str, Any]] = None
+    has_header = False
+    block: List[str] = []
+    blanks = 0
+
+    def flush_block() -> None:
+        nonlocal team
+        if not block:
+            return
+        if headers_only:
+            s = {}
+            _parse_header(block[0].strip(), s)
+            s["name"] = s.get("species", "")
+        else:
+            s = parse_set(block)
+        block.clear()
+        if team is None:
+            team = _new_team()
+        if validate:
+            errs = validate_set(s, index)
+            if errs:
+                team.setdefault("errors", []).extend(errs)
+        team["pokemon"].append(s)
+
+    for raw in lines:
+        line = raw.rstrip("\r\n")
+        stripped = line.strip()
+        if stripped.startswith("===") and stripped.endswith("==="):
+            flush_block()
+            if team is not None and team["pokemon"]:
+                yield team
+            team = _parse_team_header(stripped)
+            has_header = True
+            blanks = 0
+            continue
+        if not stripped:
+            blanks += 1
+            flush_block()
+            if blanks >= 2 and not has_header and team is not None and team["pokemon"]:
+                yield team
+                team = None
+            continue
+        if blanks and not block and not has_header and team is not None and len(team["pokemon"]) >= TEAM_SIZE:
+            yield team
+            team = None
+        blanks = 0
+        block.append(line)
+    flush_block()
+    if team is not None and team["pokemon"]:
+        yield team
+
+
+def iter_teams_file(path: str, validate: bool = True, headers_only: bool = False) -> Iterator[Dict[str, Any]]:
+    """Streaming sobre un archivo de pastes (no lo carga entero en memoria)."""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        yield from iter_teams(f, validate=validate, headers_only=headers_only)
+
+
+def parse_team(text: str, validate: bool = True) -> Dict[str, Any]:
+    """Parsea un paste de un solo equipo (si trae varios, se fusionan)."""
+    teams = list(iter_teams(text.splitlines(), validate=validate))
+    if not teams:
+        return _new_team()
+    team = teams[0]
+    for extra in teams[1:]:
+        team["pokemon"].extend(extra["pokemon"])
+        if extra.get("errors"):
+            team.setdefault("errors", []).extend(extra["errors"])
+    return team
+
+
+def parse_pastes(pastes: Iterable[str], validate: bool = True, deadline=None) -> List[Dict[str, Any]]:
+    """Batch: un equipo por paste. Con deadline vencido se devuelven los ya parseados."""
+    out = []
+    for p in pastes:
+        if deadline is not None and deadline.expired():
+            break
+        out.append(parse_team(p, validate=validate))
+    return out
+
+
+def _as_dict(s: Any) -> Dict[str, Any]:
+    if isinstance(s, dict):
+        return s
+    if hasattr(s, "model_dump"):
+        return s.model_dump()
+    return dict(s) if isinstance(s, Mapping) else vars(s)
+
+
+def _spread_text(spread: Mapping[str, int], skip: int) -> str:
+    vals: Dict[str, int] = {}
+    for k, v in spread.items():
+        label = stat_label(k) or str(k)
+        vals[label] = int(v)
+    ordered = [lab for lab in STAT_LABELS if lab in vals] + [k for k in vals if k not in STAT_LABELS]
+    return " / ".join(f"{vals[k]} {k}" for k in ordered if vals[k] != skip)
+
+
+def set_lines(s: Any, out: List[str]) -> None:
+    """Añade a `out` las líneas Showdown de un set (dict o modelo)."""
+    s = _as_dict(s)
+    species = s.get("species") or s.get("name") or ""
+    nickname = s.get("nickname")
+    head = f"{nickname} ({species})" if nickname and nickname != species else species
+    gender = s.get("gender")
+    if gender in ("M", "F"):
+        head += f" ({gender})"
+    item = s.get("item")
+    if item:
+        head += f" @ {item}"
+    out.append(head)
+    ability = s.get("ability")
+    if ability:
+        out.append(f"Ability: {ability}")
+    level = s.get("level")
+    if level and level != 50:
+        out.append(f"Level: {level}")
+    if s.get("shiny"):
+        out.append("Shiny: Yes")
+    happiness = s.get("happiness")
+    if happiness is not None and happiness != 255:
+        out.append(f"Happiness: {happiness}")
+    dmax = s.get("dynamax_level")
+    if dmax is not None and dmax != 10:
+        out.append(f"Dynamax Level: {dmax}")
+    if s.get("gigantamax"):
+        out.append("Gigantamax: Yes")
+    evs = s.get("evs")
+    if evs:
+        text = _spread_text(evs, skip=0)
+        if text:
+            out.append("EVs: " + text)
+    nature = s.get("nature")
+    if nature:
+        out.append(f"{nature} Nature")
+    ivs = s.get("ivs")
+    if ivs:
+        text = _spread_text(ivs, skip=MAX_IV)
+        if text:
+            out.append("IVs: " + text)
+    for move in s.get("moves") or []:
+        out.append(f"- {move}")
+
+
+def team_to_showdown(team: Any, header: bool = False) -> str:
+    """Serializa un equipo ({"pokemon": [...]} o lista de sets)."""
+    if not isinstance(team, list):
+        team = _as_dict(team)
+    members = team if isinstance(team, list) else (team.get("pokemon") or [])
+    out: List[str] = []
+    if header and not isinstance(team, list):
+        fmt = team.get("format")
+        name = team.get("name") or "Untitled"
+        out.append(f"=== [{fmt}] {name} ===" if fmt else f"=== {name} ===")
+        out.append("")
+    for s in members:
+        set_lines(s, out)
+        out.append("")
+    return "\n".join(out).strip()
+
+
+def teams_to_showdown(teams: Iterable[Any]) -> str:
+    """Batch: varios equipos en un solo texto, separados por cabeceras === ... ===."""
+    return "\n\n".join(team_to_showdown(t, header=True) for t in teams)
+
+
+def write_teams(teams: Iterable[Any], fp: TextIO) -> int:
+    """Escribe equipos a un archivo en streaming; devuelve cuántos se escribieron."""
+    n = 0
+    for t in teams:
+        if n:
+            fp.write("\n\n")
+        fp.write(team_to_showdown(t, header=True))
+        n += 1
+    fp.write("\n")
+    return n
@@ -0,0 +1,117 @@
+# server/tools/similar.py
+"""
+Pokémon parecidos (similar_pokemon): k vecinos más cercanos en un embedding fijo.
+
+Cada fila del DexStore es un vector con cuatro bloques:
+- stats: los 6 stats base estandarizados (media 0, desviación 1 por columna)
+- types: one-hot de sus tipos (DexStore.stab)
+- against: log2 del multiplicador recibido por tipo atacante (inmune = -3)
+- roles: bits de infer_roles (tools.roles.role_table)
+Cada bloque se escala para que su norma cuadrática media sea 1, así que
+pesan lo mismo salvo que la llamada pida otros `weights`. La distancia es
+euclídea ponderada por bloque. Por defecto sólo se devuelven últimas
+evoluciones de otras especies (`same_species` / `fully_evolved`).
+
+Con ~1000 filas y ~60 dimensiones un KD-tree no aporta nada (en esa
+dimensión degenera a recorrerlo todo): la consulta es una resta y un
+producto por la matriz de bloques sobre la matriz float32 ya construida y
+un argpartition, en menos de un milisegundo. El índice se construye una vez
+por DexStore (en el calentamiento, como recurso de la herramienta); si el
+dataset se recarga hay un DexStore nuevo y con él un índice nuevo.
+"""
+import math
+import weakref
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .roles import role_table
+from .store import DexStore, default_store
+
+BLOCKS = ("stats", "types", "against", "roles")
+DEFAULT_WEIGHTS = {"stats": 1.0, "types": 1.0, "against": 1.0, "roles": 1.0}
+MAX_K = 50
+IMMUNE_LOG2 = -3.0
+
+
+class SimilarityIndex:
+    """Embedding (N, D) float32 de un DexStore, con la columna -> bloque de cada dimensión."""
+
+    def __init__(self, store: DexStore):
+        self.store = store
+        stats = store.stats.astype(np.float64)
+        std = stats.std(axis=0)
+        stats = (stats - stats.mean(axis=0)) / np.where(std > 0, std, 1.0)
+        against = np.log2(np.maximum(store.against.astype(np.float64), 2.0 ** IMMUNE_LOG2))
+        _, roles = role_table(store)
+        parts = {"stats": stats, "types": store.stab.astype(np.float64), "against": against,
+                 "roles": roles.astype(np.float64)}
+        cols, blocks = [], []
+        for b, name in enumerate(BLOCKS):
+            m = parts[name]
+            scale = np.sqrt((m ** 2).sum(axis=1).mean())
+            cols.append(m / scale if scale > 0 else m)
+            blocks.extend([b] * m.shape[1])
+        self.vectors = np.ascontiguousarray(np.hstack(cols), dtype=np.float32)
+        self.block_of = np.array(blocks, dtype=np.int64)
+        # (D, B): suma por bloque de las diferencias al cuadrado
+        self.block_onehot = np.eye(len(BLOCKS), dtype=np.float32)[self.block_of]
+        # última evolución (o sin dato): los reemplazos no suelen ser formas intermedias
+        self.final = np.array([p.final_evolution is not False for p in store.pokemon], dtype=bool)
+
+    def distances(self, row: int, weights: Optional[Dict[str, float]] = None) -> np.ndarray:
+        """(N, B) distancias cuadráticas por bloque de cada fila a `row`, ya ponderadas."""
+        w = np.array([float((weights or DEFAULT_WEIGHTS).get(b, DEFAULT_WEIGHTS[b])) for b in BLOCKS], dtype=np.float32)
+        diff = self.vectors - self.vectors[row]
+        return ((diff * diff) @ self.block_onehot) * w
+
+    def nearest(self, row: int, k: int, mask: Optional[np.ndarray] = None,
+                weights: Optional[Dict[str, float]] = None) -> List[Dict[str, Any]]:
+        """Las k filas más cercanas a `row` entre las de `mask` (sin `row`): [{row, distance, blocks}]."""
+        parts = self.distances(row, weights)
+        total = parts.sum(axis=1)
+        allowed = np.ones(len(total), dtype=bool) if mask is None else mask.copy()
+        allowed[row] = False
+        cand = np.nonzero(allowed)[0]
+        if not len(cand) or k <= 0:
+            return []
+        k = min(k, len(cand))
+        top = cand[np.argpartition(total[cand], k - 1)[:k]]
+        top = top[np.lexsort((top, total[top]))]  # empates: orden del dataset
+        return [{"row": int(r), "distance": float(np.sqrt(total[r])),
+                 "blocks": {b: float(np.sqrt(parts[r, j])) for j, b in enumerate(BLOCKS)}} for r in top]
+
+
+_INDEXES: "weakref.WeakKeyDictionary[DexStore, SimilarityIndex]" = weakref.WeakKeyDictionary()
+
+
+def similarity_index(store: Optional[DexStore] = None) -> SimilarityIndex:
+    """Índice del DexStore (el por defecto si no se indica), construido al primer uso."""
+    store = store or default_store()
+    index = _INDEXES.get(store)
+    if index is None:
+        index = _INDEXES[store] = SimilarityIndex(store)
+    return index
+
+
+def similar_pokemon(name: str, k: int = 10, mask: Optional[np.ndarray] = None,
+                    weights: Optional[Dict[str, float]] = None, same_species: bool = False,
+                    fully_evolved: bool = True, store: Optional[DexStore] = None) -> Dict[str, Any]:
+    """Los k más parecidos a `name` entre las filas de `mask`; sin `same_species` se excluyen sus formas."""
+    store = store or default_store()
+    row = store.resolve(name or "")
+    if row is None:
+        raise ValueError(f"unknown Pokémon: {name}")
+    for b, v in (weights or {}).items():
+        if b not in DEFAULT_WEIGHTS:
+            raise ValueError(f"unknown weight {b!r}; use {', '.join(BLOCKS)}")
+        if not math.isfinite(float(v)) or float(v) < 0:
+            raise ValueError("weights must be finite and >= 0")
+    allowed = np.ones(len(store), dtype=bool) if mask is None else mask.copy()
+    index = similarity_index(store)
+    if not same_species:
+        allowed &= store.numbers != store.numbers[row]
+    if fully_evolved:
+        allowed &= index.final
+    hits = index.nearest(row, max(1, min(int(k), MAX_K)), allowed, weights)
+    return {"target": store.names[row], "hits": hits}
@@ -0,0 +1,232 @@
+# server/tools/simulate.py
+"""
+Simulador equipo contra equipo (simulate_matchup): Monte Carlo de dobles simplificados.
+
+Modelo determinista por partida, con el azar sólo en las decisiones:
+- cada lado trae `bring` (4) de sus 6 en orden aleatorio; los 2 primeros salen
+- cada turno actúan los 4 activos por velocidad real a nivel 50 (Trick Room
+  invierte el orden; empates al azar) y cada uno golpea a un rival activo,
+  elegido al azar con peso proporcional al daño que le hace
+- el daño es fijo: fracción media de PS del mejor movimiento (calculadora de
+  daño, tabla de tipos y stats base) y se aplica al instante
+- los debilitados se reemplazan al final del turno; gana quien conserve
+  Pokémon; tras MAX_TURNS decide el % de PS restante (igualdad = empate)
+
+Las partidas se simulan en bloque con NumPy (un paso vectorizado por actor y
+turno sobre todas las partidas a la vez). Los bloques de CHUNK_GAMES partidas
+se reparten en un pool de procesos (VGC_SIM_WORKERS); cada bloque tiene su
+propia semilla derivada de `seed` con SeedSequence, así que el resultado no
+depende del número de procesos.
+"""
+import math
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..core.config import env_int
+from ..core.deadline import Deadline, expired
+from .damage import Side, matchup
+from .learnsets import Learnsets, default_learnsets
+from .speed import apply_modifier
+from .store import DexStore, default_store
+
+BRING = 4
+MIN_BRING = 2  # dobles: salen 2 por lado
+MAX_TURNS = 30
+CHUNK_GAMES = 4096
+MAX_GAMES = 1_000_000
+Z95 = 1.959964
+
+# Tabla de un enfrentamiento: daño (N+1, N+1) como fracción de PS, velocidad (N+1,), tamaño del lado A.
+# La última fila/columna es el hueco vacío (PS 0, nunca actúa).
+Tables = Tuple[np.ndarray, np.ndarray, int]
+
+
+class UnknownTeam(ValueError):
+    """Un lado sin ningún Pokémon conocido."""
+
+
+def build_tables(mine: Side, theirs: Side, store: DexStore, ls: Learnsets,
+                 weather: Optional[str] = None, doubles: bool = True) -> Tables:
+    a, b = len(mine), len(theirs)
+    n = a + b
+    dmg = np.zeros((n + 1, n + 1))
+    for att, dfn, rows, cols in ((mine, theirs, slice(0, a), slice(a, n)), (theirs, mine, slice(a, n), slice(0, a))):
+        m = matchup(att, dfn, store, ls, weather=weather, doubles=doubles)
+        pct = np.asarray(m["damage_pct"], dtype=np.float64).reshape(len(att), len(dfn), 2)
+        dmg[rows, cols] = pct.mean(axis=2) / 100.0
+    speed = np.full(n + 1, -1.0)
+    for side, rows in ((mine, slice(0, a)), (theirs, slice(a, n))):
+        spe = side.stats[:, 5].copy()
+        scarf = np.array([str(s.get("item") or "").strip().lower() == "choice scarf" for s in side.sets], dtype=bool)
+        spe[scarf] = apply_modifier(spe[scarf], "scarf")
+        speed[rows] = spe
+    return dmg, speed, a
+
+
+def simulate_games(tables: Tables, games: int, seed: Any, bring: int = BRING,
+                   trick_room: bool = False, max_turns: int = MAX_TURNS) -> np.ndarray:
+    """Resultado de cada partida desde el lado A: 1 gana, 0 pierde, 0.5 empate."""
+    dmg, speed, a = tables
+    empty = len(speed) - 1
+    sizes = (a, empty - a)
+    rng = np.random.default_rng(seed)
+    g = np.arange(games)
+
+    # orden de salida (G, 2, bring): permutación aleatoria de cada equipo, rellenada con el hueco
+    order = np.full((games, 2, bring), empty, dtype=np.int64)
+    for s, (n, offset) in enumerate(((sizes[0], 0), (sizes[1], a))):
+        k = min(bring, n)
+        order[:, s, :k] = rng.permuted(np.tile(np.arange(n) + offset, (games, 1)), axis=1)[:, :k]
+    hp = np.zeros((games, empty + 1))
+    np.put_along_axis(hp, order.reshape(games, -1), 1.0, axis=1)
+    hp[:, empty] = 0.0
+    active = order[:, :, :2].copy()                      # (G, 2, 2)
+    nxt = np.full((games, 2), 2, dtype=np.int64)
+    sign = 1.0 if trick_room else -1.0                   # argsort ascendente: -velocidad = el más rápido primero
+
+    live = np.ones(games, dtype=bool)
+    for _ in range(max_turns):
+        actors = active.reshape(games, 4)
+        key = sign * speed[actors] + rng.random((games, 4)) * 0.5  # velocidades enteras: el ruido sólo desempata
+        key[actors == empty] = np.inf
+        turn = np.take_along_axis(actors, np.argsort(key, axis=1), axis=1)
+        for k in range(4):
+            att = turn[:, k]
+            can = live & (att != empty) & (hp[g, att] > 0)
+            side = (att >= a).astype(np.int64)
+            foes = active[g, 1 - side]                     # (G, 2)
+            up = hp[g[:, None], foes] > 0
+            w = dmg[att[:, None], foes] * up
+            total = w.sum(axis=1)
+            # sin daño posible se elige al azar entre los vivos
+            w = np.where((total > 0)[:, None], w, up.astype(np.float64))
+            total = w.sum(axis=1)
+            can &= total > 0
+            pick = (rng.random(games) * total >= w[:, 0]).astype(np.int64)
+            target = foes[g, pick]
+            hp[g, target] -= np.where(can, dmg[att, target], 0.0)
+        # reemplazos al final del turno
+        for s in range(2):
+            for c in range(2):
+                mon = active[:, s, c]
+                down = live & (mon != empty) & (hp[g, mon] <= 0)
+                if down.any():
+                    idx = np.minimum(nxt[:, s], bring - 1)
+                    repl = np.where(nxt[:, s] < bring, order[g, s, idx], empty)
+                    active[:, s, c] = np.where(down, repl, mon)
+                    nxt[:, s] += down
+        left = np.stack([(np.take_along_axis(hp, order[:, s], axis=1) > 0).sum(axis=1) for s in range(2)], axis=1)
+        live &= (left > 0).all(axis=1)
+        if not live.any():
+            break
+
+    remaining = np.stack([np.clip(np.take_along_axis(hp, order[:, s], axis=1), 0, 1).sum(axis=1) / np.maximum(
+        1, (order[:, s] != empty).sum(axis=1)) for s in range(2)], axis=1)
+    return np.where(remaining[:, 0] > remaining[:, 1], 1.0, np.where(remaining[:, 0] < remaining[:, 1], 0.0, 0.5))
+
+
+def _run_chunk(args) -> Tuple[int, int, int, int]:
+    """(índice de rival, partidas, victorias, empates); se ejecuta en el pool."""
+    j, tables, games, seed, bring, trick_room = args
+    res = simulate_games(tables, games, seed, bring=bring, trick_room=trick_room)
+    return j, len(res), int((res == 1.0).sum()), int((res == 0.5).sum())
+
+
+_POOL: Optional[Executor] = None
+
+
+def _pool() -> Optional[Executor]:
+    """Pool de procesos compartido (None con un solo worker)."""
+    global _POOL
+    workers = env_int("VGC_SIM_WORKERS", os.cpu_count() or 1)
+    if workers <= 1:
+        return None
+    if _POOL is None:
+        # forkserver: los hijos no heredan hilos ni locks del servidor HTTP
+        _POOL = ProcessPoolExecutor(max_workers=workers, mp_context=get_context("forkserver"))
+    return _POOL
+
+
+def wilson(score: float, n: int, z: float = Z95) -> Tuple[float, float]:
+    """Intervalo de Wilson para una proporción (los empates cuentan medio)."""
+    if n <= 0:
+        return 0.0, 1.0
+    p = score / n
+    den = 1 + z * z / n
+    mid = (p + z * z / (2 * n)) / den
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / den
+    return max(0.0, mid - half), min(1.0, mid + half)
+
+
+def run_matchups(tables: Sequence[Tables], games: int, seed: int = 0, bring: int = BRING,
+                 trick_room: bool = False, deadline: Optional[Deadline] = None) -> List[Dict[str, Any]]:
+    """`games` partidas contra cada tabla, por bloques; con deadline vencido se reporta lo completado."""
+    tasks = []
+    for j, t in enumerate(tables):
+        chunks = [CHUNK_GAMES] * (games // CHUNK_GAMES) + ([games % CHUNK_GAMES] if games % CHUNK_GAMES else [])
+        seeds = np.random.SeedSequence([seed, j]).spawn(len(chunks))
+        tasks.extend((j, t, n, s, bring, trick_room) for n, s in zip(chunks, seeds))
+    counts = np.zeros((len(tables), 3), dtype=np.int64)  # partidas, victorias, empates
+    pool = _pool() if len(tasks) > 1 else None
+    results = pool.map(_run_chunk, tasks) if pool is not None else map(_run_chunk, tasks)
+    for j, n, wins, draws in results:
+        counts[j] += (n, wins, draws)
+        if expired(deadline):
+            break
+    return [_summary(*map(int, c)) for c in counts]
+
+
+def _summary(games: int, wins: int, draws: int) -> Dict[str, Any]:
+    score = wins + draws / 2
+    lo, hi = wilson(score, games)
+    return {"games": games, "wins": wins, "draws": draws, "losses": games - wins - draws,
+            "win_rate": round(score / games, 4) if games else 0.0, "ci95": [round(lo, 4), round(hi, 4)]}
+
+
+def simulate_matchup(team: Sequence[Any], opponents: Sequence[Sequence[Any]], games: int = 2000, seed: int = 0,
+                     bring: int = BRING, weather: Optional[str] = None, trick_room: bool = False,
+                     doubles: bool = True, names: Optional[Sequence[Optional[str]]] = None,
+                     store: Optional[DexStore] = None, ls: Optional[Learnsets] = None,
+                     deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+    """Tasa de victoria de `team` contra cada equipo de `opponents` (un gauntlet es una lista de varios)."""
+    store = store or default_store()
+    ls = ls or default_learnsets()
+    games = max(1, min(int(games), MAX_GAMES))
+    bring = max(MIN_BRING, min(int(bring), 6))
+    unknown: List[str] = []
+
+    def side(items) -> Side:
+        sets = []
+        for x in items:
+            s = {"name": x} if isinstance(x, str) else dict(x)
+            if store.resolve(s.get("name") or "") is None:
+                unknown.append(s.get("name") or "")
+            else:
+                sets.append(s)
+        if not sets:
+            raise UnknownTeam("every team needs at least one known Pokémon")
+        return Side(store, sets)
+
+    mine = side(team)
+    theirs = [side(o) for o in opponents]
+    tables = [build_tables(mine, t, store, ls, weather=weather, doubles=doubles) for t in theirs]
+    results = run_matchups(tables, games, seed=seed, bring=bring, trick_room=trick_room, deadline=deadline)
+    labels = list(names or [])
+    for j, (t, r) in enumerate(zip(theirs, results)):
+        r["opponent"] = (labels[j] if j < len(labels) and labels[j] else None) or " / ".join(t.names)
+    out: Dict[str, Any] = {
+        "team": mine.names,
+        "model": {"bring": bring, "max_turns": MAX_TURNS, "weather": weather, "trick_room": trick_room, "seed": seed},
+        "results": results,
+    }
+    if len(results) > 1:
+        out["overall"] = _summary(*(sum(r[k] for r in results) for k in ("games", "wins", "draws")))
+    if any(r["games"] < games for r in results):
+        out["truncated"] = True
+    if unknown:
+        out["unknown"] = unknown
+    return out
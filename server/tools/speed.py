@@ -0,0 +1,98 @@
+# server/tools/speed.py
+"""
+Índice de velocidades (speed tiers) a nivel 50.
+
+Para cada spread y modificador se guarda un array ordenado de velocidades
+reales junto con las filas del DexStore, de modo que "quién es más rápido
+que X" o "Spe base entre a y b" son dos búsquedas binarias + el corte.
+
+Spreads (IV 31 salvo min):
+- min:      0 EV, IV 0, naturaleza negativa (Trick Room)
+- zero:     0 EV, neutra
+- neutral:  252 EV, neutra
+- positive: 252 EV, naturaleza positiva
+
+Modificadores: none, scarf (x1.5), tailwind (x2), scarf_tailwind.
+Con Trick Room se mueve antes el más lento, así que "superar" significa
+tener menos velocidad.
+"""
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from .damage import LEVEL, modify
+from .store import DexStore, default_store
+
+SPREADS: Dict[str, Tuple[int, int, int]] = {  # (EV, IV, naturaleza en centésimas)
+    "min": (0, 0, 90),
+    "zero": (0, 31, 100),
+    "neutral": (252, 31, 100),
+    "positive": (252, 31, 110),
+}
+MODIFIERS: Dict[str, int] = {  # en 4096avos, encadenados como en Showdown
+    "none": 4096,
+    "scarf": 6144,
+    "tailwind": 8192,
+    "scarf_tailwind": 12288,
+}
+SPE = 5  # columna de Spe en DexStore.stats
+
+
+def actual_speed(base: np.ndarray, spread: str = "positive", modifier: str = "none",
+                 level: int = LEVEL) -> np.ndarray:
+    ev, iv, nature = SPREADS[spread]
+    base = np.asarray(base, dtype=np.int64)
+    stat = ((2 * base + iv + ev // 4) * level // 100 + 5) * nature // 100
+    return apply_modifier(stat, modifier)
+
+
+def apply_modifier(stat: np.ndarray, modifier: str = "none") -> np.ndarray:
+    """Velocidad en combate a partir del stat (Scarf y Tailwind se encadenan)."""
+    if modifier == "scarf_tailwind":
+        return modify(modify(stat, MODIFIERS["scarf"]), MODIFIERS["tailwind"])
+    return modify(stat, MODIFIERS[modifier])
+
+
+class SpeedIndex:
+    def __init__(self, store: DexStore):
+        self.store = store
+        base = store.stats[:, SPE].astype(np.int64)
+        self.base_order = np.argsort(base, kind="stable")
+        self.base_sorted = base[self.base_order]
+        self.tiers: Dict[Tuple[str, str], Tuple[np.ndarray, np.ndarray]] = {}
+        for spread in SPREADS:
+            for mod in MODIFIERS:
+                speeds = actual_speed(base, spread, mod)
+                order = np.argsort(speeds, kind="stable")
+                self.tiers[(spread, mod)] = (speeds[order], order)
+
+    def speed_of(self, row: int, spread: str = "positive", modifier: str = "none") -> int:
+        return int(actual_speed(self.store.stats[row, SPE], spread, modifier))
+
+    def base_range(self, lo: Optional[int] = None, hi: Optional[int] = None) -> np.ndarray:
+        """Filas con Spe base en [lo, hi] (O(log n + k))."""
+        a = 0 if lo is None else np.searchsorted(self.base_sorted, lo, side="left")
+        b = len(self.base_sorted) if hi is None else np.searchsorted(self.base_sorted, hi, side="right")
+        return self.base_order[a:b]
+
+    def compare(self, speed: int, spread: str = "positive", modifier: str = "none",
+                trick_room: bool = False) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """
+        Reparte el índice respecto a `speed`: "first" (actúan antes, el primero
+        en actuar delante), "ties" y "after". Cada entrada es (filas, velocidades).
+        """
+        speeds, order = self.tiers[(spread, modifier)]
+        a = int(np.searchsorted(speeds, speed, side="left"))
+        b = int(np.searchsorted(speeds, speed, side="right"))
+        slower = (order[:a], speeds[:a])          # ascendente: el más lento primero
+        faster = (order[b:][::-1], speeds[b:][::-1])  # descendente: el más rápido primero
+        ties = (order[a:b], speeds[a:b])
+        if trick_room:
+            return {"first": slower, "ties": ties, "after": faster}
+        return {"first": faster, "ties": ties, "after": slower}
+
+
+@lru_cache(maxsize=None)
+def default_speed_index() -> SpeedIndex:
+    return SpeedIndex(default_store())
@@ -0,0 +1,353 @@
+# server/tools/spreads.py
+"""
+Optimizador de EVs y naturaleza a nivel 50 (optimize_spreads).
+
+Para cada miembro se recorren TODOS los spreads con stats distintos:
+- EVs útiles con IV 31: 0, 4, 12, ..., 252 (33 valores; los intermedios dan
+  el mismo stat) en HP, Def y SpD
+- las 21 naturalezas distintas (20 + una neutra)
+- Spe: el mínimo de EVs que supera el benchmark de velocidad (o 0 EV / IV 0
+  para ir por debajo en Trick Room); el stat ofensivo se queda con lo que sobra
+
+El daño es separable: los golpes físicos sólo ven HP y Def, los especiales HP y
+SpD. Un solo damage_rolls por amenaza contra 99 variantes (33 EVs x 3
+naturalezas, en Def y SpD a la vez) y la comparación con los 33 valores de HP
+dan la probabilidad de OHKO de cada movimiento; la rejilla HP x Def x SpD de
+cada naturaleza (33^3) se combina con broadcasting, sin bucles por spread.
+
+Preferencia (lexicográfica): cumple el benchmark de velocidad > menos OHKOs
+esperados de las amenazas (mejor movimiento de cada una) > [mode="bulk": menos
+daño medio recibido] > más stat ofensivo > más bulk HP*Def*SpD/(Def+SpD) >
+velocidad (menos con Trick Room) > menos EVs usados.
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..core.deadline import Deadline, expired
+from .damage import LEVEL, NATURE_EFFECTS, Side, build_moves, damage_rolls
+from .learnsets import PHYSICAL, Learnsets, default_learnsets
+from .showdown import MAX_EV, MAX_IV, STAT_LABELS, stat_label, team_to_showdown
+from .speed import MODIFIERS, SPREADS, SpeedIndex, apply_modifier, default_speed_index
+from .store import DexStore, default_store
+
+HP, ATK, DEF, SPA, SPD, SPE = range(6)
+EV_STEPS = np.array([0] + list(range(4, MAX_EV + 1, 8)), dtype=np.int64)  # 33 valores útiles
+EV_BUDGET = 508  # 510 - 2: los 2 últimos EVs nunca suben un stat
+NEUTRAL = "Serious"
+NATURES: Dict[str, Tuple[Optional[int], Optional[int]]] = {NEUTRAL: (None, None), **NATURE_EFFECTS}
+NATURE_MULTS = (90, 100, 110)
+MODES = ("survive", "bulk")
+
+
+def stat_values(base: int, evs: np.ndarray, iv: int = MAX_IV, mult: int = 100, hp: bool = False) -> np.ndarray:
+    core = (2 * int(base) + iv + np.asarray(evs, dtype=np.int64) // 4) * LEVEL // 100
+    if hp:
+        return core + LEVEL + 10
+    return (core + 5) * mult // 100
+
+
+def nature_mults(nature: str) -> np.ndarray:
+    """Multiplicadores (6,) en centésimas."""
+    m = np.full(len(STAT_LABELS), 100, dtype=np.int64)
+    plus, minus = NATURES[nature]
+    if plus is not None:
+        m[plus], m[minus] = 110, 90
+    return m
+
+
+def speed_target(spec: Any, index: SpeedIndex) -> Optional[int]:
+    """Benchmark: velocidad real (int), nombre (spread positive) o {target|speed, spread, modifier}."""
+    if spec is None or spec == "":
+        return None
+    if isinstance(spec, (int, float)) and not isinstance(spec, bool):
+        return int(spec)
+    o = {"target": spec} if isinstance(spec, str) else dict(spec)
+    if o.get("speed") is not None:
+        return int(o["speed"])
+    spread = o.get("spread") or "positive"
+    modifier = o.get("modifier") or "none"
+    if spread not in SPREADS or modifier not in MODIFIERS:
+        raise ValueError(f"unknown speed condition: {spread}/{modifier}")
+    row = index.store.resolve(o.get("target") or "")
+    if row is None:
+        raise ValueError(f"unknown Pokémon: {o.get('target')}")
+    return index.speed_of(row, spread, modifier)
+
+
+def _own_modifier(s: Dict[str, Any]) -> str:
+    mod = s.get("speed_modifier")
+    if mod is None:
+        mod = "scarf" if str(s.get("item") or "").strip().lower() == "choice scarf" else "none"
+    if mod not in MODIFIERS:
+        raise ValueError(f"unknown speed modifier: {mod}")
+    return mod
+
+
+def _attack_stat(s: Dict[str, Any], base: np.ndarray, ls: Learnsets) -> int:
+    label = stat_label(s["attack_stat"]) if s.get("attack_stat") else None
+    if label in ("Atk", "SpA"):
+        return STAT_LABELS.index(label)
+    ids = [j for j in ls.move_ids_for(s.get("moves") or []) if ls.damaging[j]]
+    if ids:
+        physical = sum(int(ls.category[j]) == PHYSICAL for j in ids)
+        return ATK if 2 * physical >= len(ids) else SPA
+    return ATK if base[ATK] >= base[SPA] else SPA
+
+
+class _Threats:
+    """Movimientos de las amenazas, resueltos una vez para todo el equipo."""
+
+    def __init__(self, store: DexStore, ls: Learnsets, sets: List[Dict[str, Any]]):
+        self.side = Side(store, sets)
+        self.batch = build_moves(self.side, store, ls)
+        self.moves = self.batch.arrays()
+        self.hits_def = (self.moves["category"] == PHYSICAL) | (self.moves["kind"] == 1)  # Psyshock -> Def
+
+
+class _Member:
+    """Rejilla de spreads de un miembro y sus resultados contra las amenazas."""
+
+    def __init__(self, store: DexStore, s: Dict[str, Any], threats: _Threats, ls: Learnsets,
+                 weather: Optional[str], doubles: bool):
+        self.set = s
+        self.row = store.resolve(s["name"])
+        self.name = store.names[self.row]
+        self.base = store.stats[self.row].astype(np.int64)
+        self.attack = _attack_stat(s, self.base, ls)
+        self.hp = stat_values(self.base[HP], EV_STEPS, hp=True)  # (H,)
+
+        # variantes g = mult * 33 + ev: Def y SpD con los mismos EVs y multiplicador
+        k = len(NATURE_MULTS) * len(EV_STEPS)
+        stats = np.zeros((k, 6), dtype=np.int64)
+        for mi, m in enumerate(NATURE_MULTS):
+            g = slice(mi * len(EV_STEPS), (mi + 1) * len(EV_STEPS))
+            for c in range(6):
+                stats[g, c] = stat_values(self.base[c], EV_STEPS if c in (DEF, SPD) else 0,
+                                          mult=m if c in (DEF, SPD) else 100, hp=c == HP)
+        self.grid = Side.variants(store, self.name, stats, s.get("item"))
+
+        t = len(threats.side)
+        mv = threats.moves
+        e = len(threats.batch)
+        self.rolls = np.zeros((e, k, 16), dtype=np.int64)
+        if e:
+            self.rolls = damage_rolls(threats.side, mv, self.grid, store, weather=weather, doubles=doubles)
+        # ko[e, g, h]: probabilidad de OHKO del movimiento e contra la variante g con el HP h
+        self.ko = (self.rolls[:, :, None, :] >= self.hp[None, None, :, None]).mean(axis=3) \
+            * mv["accuracy"][:, None, None]
+        self.pct = self.rolls.mean(axis=2)[:, :, None] * 100.0 / self.hp[None, None, :]
+        # mejor movimiento de cada amenaza por defensa golpeada: (T, K, H)
+        self.k_def = np.zeros((t, k, len(EV_STEPS)))
+        self.k_spd = np.zeros_like(self.k_def)
+        self.p_def = np.zeros_like(self.k_def)
+        self.p_spd = np.zeros_like(self.k_def)
+        for i in range(t):
+            mine = mv["owner"] == i
+            for hits, ko, pct in ((mine & threats.hits_def, self.k_def, self.p_def),
+                                  (mine & ~threats.hits_def, self.k_spd, self.p_spd)):
+                if hits.any():
+                    ko[i] = self.ko[hits].max(axis=0)
+                    pct[i] = self.pct[hits].max(axis=0)
+
+
+def _speed_plan(m: _Member, nature: np.ndarray, outspeed: Optional[int], underspeed: Optional[int],
+                modifier: str) -> Tuple[int, int, int, int]:
+    """(EV Spe, IV Spe, velocidad en combate, cuánto falta para el benchmark; 0 = cumple)."""
+    mult = int(nature[SPE])
+    if underspeed is not None:
+        speed = int(apply_modifier(stat_values(m.base[SPE], 0, iv=0, mult=mult), modifier))
+        return 0, 0, speed, max(0, speed - underspeed + 1)
+    speeds = apply_modifier(stat_values(m.base[SPE], EV_STEPS, mult=mult), modifier)
+    if outspeed is None:
+        return 0, MAX_IV, int(speeds[0]), 0
+    ok = speeds > outspeed
+    j = int(np.argmax(ok)) if ok.any() else len(EV_STEPS) - 1
+    return int(EV_STEPS[j]), MAX_IV, int(speeds[j]), max(0, outspeed - int(speeds[j]) + 1)
+
+
+def _argbest(valid: np.ndarray, keys: Sequence[np.ndarray]) -> int:
+    """Índice plano del mínimo lexicográfico de `keys` entre las celdas válidas."""
+    cand = np.flatnonzero(valid)
+    for key in keys:
+        v = key.ravel()[cand]
+        cand = cand[v <= v.min() + 1e-9]
+        if len(cand) == 1:
+            break
+    return int(cand[0])
+
+
+class _Grids:
+    """Rejillas (H, I=Def, J=SpD) de un miembro, compartidas entre naturalezas."""
+
+    def __init__(self, m: _Member, mode: str):
+        self.m = m
+        self.mode = mode
+        self._defense: Dict[Tuple[int, int], Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        self._budget: Dict[int, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+
+    def defense(self, md: int, ms: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(OHKOs esperados, daño recibido, bulk) para los multiplicadores de Def y SpD."""
+        if (md, ms) not in self._defense:
+            m, n = self.m, len(EV_STEPS)
+            gd = slice(NATURE_MULTS.index(md) * n, (NATURE_MULTS.index(md) + 1) * n)
+            gs = slice(NATURE_MULTS.index(ms) * n, (NATURE_MULTS.index(ms) + 1) * n)
+            shape = (n, n, n)
+            # amenaza t contra (h, i, j): su mejor golpe entre el físico (Def i) y el especial (SpD j)
+            ko = np.zeros(shape)
+            dmg = np.zeros(shape)
+            if len(m.k_def):
+                kd = m.k_def[:, gd, :].transpose(0, 2, 1)[:, :, :, None]  # (T, H, I, 1)
+                ks = m.k_spd[:, gs, :].transpose(0, 2, 1)[:, :, None, :]  # (T, H, 1, J)
+                ko = np.maximum(kd, ks).sum(axis=0)
+                if self.mode == "bulk":
+                    pd_ = m.p_def[:, gd, :].transpose(0, 2, 1)[:, :, :, None]
+                    ps_ = m.p_spd[:, gs, :].transpose(0, 2, 1)[:, :, None, :]
+                    dmg = np.maximum(pd_, ps_).sum(axis=0)
+            dfs = stat_values(m.base[DEF], EV_STEPS, mult=md)[None, :, None]
+            sps = stat_values(m.base[SPD], EV_STEPS, mult=ms)[None, None, :]
+            bulk = m.hp[:, None, None] * dfs * sps / (dfs + sps)
+            self._defense[(md, ms)] = (ko, dmg, bulk)
+        return self._defense[(md, ms)]
+
+    def budget(self, spe_ev: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(celdas dentro del presupuesto, EVs al ataque, EVs totales) con `spe_ev` en Spe."""
+        if spe_ev not in self._budget:
+            used = EV_STEPS[:, None, None] + EV_STEPS[None, :, None] + EV_STEPS[None, None, :] + spe_ev
+            left = np.clip(EV_BUDGET - used, 0, MAX_EV)
+            atk_ev = EV_STEPS[np.searchsorted(EV_STEPS, left, side="right") - 1]
+            self._budget[spe_ev] = (used <= EV_BUDGET, atk_ev, used + atk_ev)
+        return self._budget[spe_ev]
+
+
+def _best_for_nature(grids: _Grids, name: str, outspeed: Optional[int], underspeed: Optional[int],
+                     modifier: str) -> Optional[Dict[str, Any]]:
+    m = grids.m
+    mults = nature_mults(name)
+    spe_ev, spe_iv, speed, short = _speed_plan(m, mults, outspeed, underspeed, modifier)
+    valid, atk_ev, total = grids.budget(spe_ev)
+    if not valid.any():
+        return None
+    md, ms = int(mults[DEF]), int(mults[SPD])
+    ko, dmg, bulk = grids.defense(md, ms)
+    atk = stat_values(m.base[m.attack], atk_ev, mult=int(mults[m.attack]))
+    best = _argbest(valid, (ko, dmg, -atk, -bulk, total))
+    h, i, j = np.unravel_index(best, valid.shape)
+
+    evs = np.zeros(6, dtype=np.int64)
+    evs[HP], evs[DEF], evs[SPD], evs[SPE] = EV_STEPS[h], EV_STEPS[i], EV_STEPS[j], spe_ev
+    evs[m.attack] = atk_ev[h, i, j]
+    ivs = np.full(6, MAX_IV, dtype=np.int64)
+    ivs[SPE] = spe_iv
+    stats = np.array([stat_values(m.base[c], evs[c], iv=int(ivs[c]), mult=int(mults[c]), hp=c == HP)
+                      for c in range(6)], dtype=np.int64)
+    n = len(EV_STEPS)
+    return {
+        "nature": name, "evs": evs, "ivs": ivs, "stats": stats, "speed": speed, "speed_ok": short == 0,
+        "ko_sum": float(ko[h, i, j]),
+        "cell": (int(h), NATURE_MULTS.index(md) * n + int(i), NATURE_MULTS.index(ms) * n + int(j)),
+        # el mismo orden que en la rejilla, precedido por el benchmark de velocidad
+        "key": (short, round(float(ko[h, i, j]), 6), round(float(dmg[h, i, j]), 6), -int(atk[h, i, j]),
+                -float(bulk[h, i, j]), speed if underspeed is not None else -speed, int(total[h, i, j])),
+    }
+
+
+def _spread_dict(values: np.ndarray, skip: int) -> Dict[str, int]:
+    return {lab: int(v) for lab, v in zip(STAT_LABELS, values.tolist()) if v != skip}
+
+
+def _threat_report(m: _Member, threats: _Threats, cell: Tuple[int, int, int]) -> List[Dict[str, Any]]:
+    """Mejor movimiento de cada amenaza contra el spread elegido."""
+    h, g_def, g_spd = cell
+    mv = threats.moves
+    out = []
+    for i, name in enumerate(threats.side.names):
+        idx = np.flatnonzero(mv["owner"] == i)
+        if not len(idx):
+            continue
+        g = np.where(threats.hits_def[idx], g_def, g_spd)
+        ko = m.ko[idx, g, h]
+        pct = m.pct[idx, g, h]
+        j = int(np.argmax(ko * 1e5 + np.minimum(pct, 9999.0)))
+        e, gj = int(idx[j]), int(g[j])
+        hp = int(m.hp[h])
+        out.append({
+            "name": name,
+            "move": threats.batch.names[e],
+            "ko": round(float(ko[j]), 3),
+            "damage_pct": [round(m.rolls[e, gj, 0] * 100.0 / hp, 1), round(m.rolls[e, gj, -1] * 100.0 / hp, 1)],
+        })
+    return out
+
+
+def optimize_spreads(team: Sequence[Any], threats: Sequence[Any] = (), mode: str = "survive",
+                     weather: Optional[str] = None, doubles: bool = True, alternatives: int = 3,
+                     store: Optional[DexStore] = None, ls: Optional[Learnsets] = None,
+                     index: Optional[SpeedIndex] = None, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+    """
+    Mejor spread (EVs, IVs de Spe y naturaleza) de cada miembro contra `threats`.
+    Cada miembro puede pedir `outspeed` / `underspeed` (benchmark de velocidad),
+    `speed_modifier` (scarf, tailwind...) y `attack_stat` ("Atk"/"SpA").
+    """
+    if mode not in MODES:
+        raise ValueError(f"unknown mode: {mode}")
+    store = store or default_store()
+    ls = ls or default_learnsets()
+    index = index or default_speed_index()
+    unknown: List[str] = []
+
+    def resolved(items):
+        sets = []
+        for x in items:
+            s = {"name": x} if isinstance(x, str) else dict(x)
+            if store.resolve(s.get("name") or "") is None:
+                unknown.append(s.get("name") or "")
+            else:
+                sets.append(s)
+        return sets
+
+    threat_side = _Threats(store, ls, resolved(threats))
+    members = resolved(team)
+    out: Dict[str, Any] = {"pokemon": [], "threats": threat_side.side.names}
+    sets = []
+    for s in members:
+        if s.get("outspeed") is not None and s.get("underspeed") is not None:
+            raise ValueError(f"{s['name']}: outspeed and underspeed are exclusive")
+        outspeed = speed_target(s.get("outspeed"), index)
+        underspeed = speed_target(s.get("underspeed"), index)
+        modifier = _own_modifier(s)
+        m = _Member(store, s, threat_side, ls, weather, doubles)
+        grids = _Grids(m, mode)
+        ranked = sorted((r for r in (_best_for_nature(grids, nat, outspeed, underspeed, modifier)
+                                     for nat in NATURES) if r is not None), key=lambda r: r["key"])
+        best = ranked[0]
+        report = {
+            "name": m.name,
+            "nature": best["nature"],
+            "evs": _spread_dict(best["evs"], 0),
+            "ivs": _spread_dict(best["ivs"], MAX_IV),
+            "stats": dict(zip(STAT_LABELS, best["stats"].tolist())),
+            "speed": {"value": best["speed"], "modifier": modifier, "ok": best["speed_ok"],
+                      "outspeed": outspeed, "underspeed": underspeed},
+            "expected_ohkos": round(best["ko_sum"], 3),
+            "threats": _threat_report(m, threat_side, best["cell"]),
+            "alternatives": [{"nature": r["nature"], "evs": _spread_dict(r["evs"], 0),
+                              "expected_ohkos": round(r["ko_sum"], 3), "speed_ok": r["speed_ok"]}
+                             for r in ranked[1:1 + max(0, int(alternatives))]],
+        }
+        out["pokemon"].append(report)
+        clean = {k: v for k, v in s.items()
+                 if k not in ("outspeed", "underspeed", "speed_modifier", "attack_stat")}
+        clean.update(name=m.name, nature=report["nature"], evs=report["evs"])
+        clean.pop("ivs", None)
+        if report["ivs"]:
+            clean["ivs"] = report["ivs"]
+        sets.append(clean)
+        if expired(deadline) and len(sets) < len(members):
+            out["truncated"] = True
+            break
+    out["showdown"] = team_to_showdown(sets)
+    out["sets"] = sets
+    if unknown:
+        out["unknown"] = unknown
+    return out
@@ -0,0 +1,79 @@
+# server/tools/store.py
+"""
+Vista columnar (NumPy) del dataset para los motores vectorizados.
+
+Las filas siguen el mismo orden que default_pokemon(), así que un id entero
+sirve tanto para indexar las matrices como la lista de registros (PokemonRecord).
+"""
+from functools import lru_cache
+from typing import Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from ..core.formats import species_key
+from ..core.records import shared_against
+from .dataset import NameIndex, default_name_index, default_pokemon
+from .synergy import TYPES
+
+TYPE_INDEX = {t: i for i, t in enumerate(TYPES)}
+
+# Orden de columnas de `stats`
+STAT_COLUMNS = ("hp", "att", "deff", "spa", "spd", "spe")
+
+
+class DexStore:
+    def __init__(self, pokes: Sequence, index: Optional[NameIndex] = None):
+        self.pokemon = list(pokes)
+        self.names: List[str] = [p.name for p in self.pokemon]
+        self.index = index or NameIndex(self.names)
+        n = len(self.pokemon)
+
+        self.stats = np.array(
+            [[int(getattr(p, c, 0) or 0) for c in STAT_COLUMNS] for p in self.pokemon], dtype=np.int16
+        ).reshape(n, len(STAT_COLUMNS))
+        # against[i, t]: multiplicador recibido por el Pokémon i ante un ataque de tipo t;
+        # con los registros del dataset es la misma matriz que comparten (sin copia)
+        self.against = shared_against(self.pokemon)
+        if self.against is None:
+            self.against = np.array(
+                [[float((p.against or {}).get(t, 1.0)) for t in TYPES] for p in self.pokemon], dtype=np.float32
+            ).reshape(n, len(TYPES))
+        self.type_ids = np.full((n, 2), -1, dtype=np.int8)
+        for i, p in enumerate(self.pokemon):
+            self.type_ids[i, 0] = TYPE_INDEX.get(p.type1, -1)
+            if p.type2:
+                self.type_ids[i, 1] = TYPE_INDEX.get(p.type2, -1)
+        # stab[i, t]: el Pokémon i tiene el tipo t
+        self.stab = np.zeros((n, len(TYPES)), dtype=bool)
+        for col in range(2):
+            ok = self.type_ids[:, col] >= 0
+            self.stab[np.nonzero(ok)[0], self.type_ids[ok, col]] = True
+        # columna Abilities tal cual viene en el CSV ("['Chlorophyll', 'Overgrow']")
+        self.abilities: List[str] = ["[" + ", ".join(map(str, p.abilities or [])) + "]" for p in self.pokemon]
+        self.species: List[str] = [species_key(nm) for nm in self.names]
+        # número de Pokédex: las formas comparten número (cláusula de especie)
+        self.numbers = np.array([int(getattr(p, "number", 0) or 0) for p in self.pokemon], dtype=np.int32)
+
+    def __len__(self) -> int:
+        return len(self.pokemon)
+
+    def resolve(self, name: str) -> Optional[int]:
+        return self.index.resolve(name)
+
+    def ids(self, names: Iterable[str]) -> List[int]:
+        """Ids de los nombres que se pueden resolver (los desconocidos se omiten)."""
+        out = []
+        for n in names:
+            i = self.index.resolve(n)
+            if i is not None:
+                out.append(i)
+        return out
+
+    def species_mask(self, species: Iterable[str]) -> np.ndarray:
+        wanted = set(species)
+        return np.array([s in wanted for s in self.species], dtype=bool)
+
+
+@lru_cache(maxsize=None)
+def default_store() -> DexStore:
+    return DexStore(default_pokemon(), default_name_index())
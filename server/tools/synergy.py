@@ -1,5 +1,6 @@
-from typing import List, Dict
+from typing import Dict, Iterable, List, Optional
 from ..core.models import Pokemon, SynergyReport, TypeName
+from ..core.records import against_rows
 
 # Tabla de tipos
 TYPES: List[TypeName] = [
@@ -39,18 +40,22 @@ for atk, eff in _EFFECT.items():
 
 ALL_TYPES: List[TypeName] = TYPES[:]
 
-def offensive_coverage_count(team: List[Pokemon]) -> Dict[TypeName, int]:
+def offensive_coverage_count(team: List[Pokemon],
+                             attack_types: Optional[List[Iterable[TypeName]]] = None) -> Dict[TypeName, int]:
     """
     Para cada tipo DEFENSIVO, cuenta cuántos miembros del equipo pueden golpearlo a 2x
-    usando STAB (type1/type2) del Pokémon.
+    usando STAB (type1/type2) del Pokémon. Si se pasa attack_types (uno por miembro,
+    p. ej. tipos de sus movimientos), se suman a los STAB.
     """
     coverage: Dict[TypeName, int] = {t: 0 for t in ALL_TYPES}
-    for p in team:
+    for i, p in enumerate(team):
         stabs = []
         if getattr(p, "type1", None):
             stabs.append(p.type1)
         if getattr(p, "type2", None):
             stabs.append(p.type2)
+        if attack_types is not None and i < len(attack_types):
+            stabs.extend(t for t in attack_types[i] if t not in stabs)
 
         for def_t in ALL_TYPES:
             ok = False
@@ -68,6 +73,9 @@ def defensive_resistances(team: List[Pokemon]) -> Dict[TypeName, int]:
     Usa los multiplicadores 'against' de cada Pokémon (mapa p.against {Tipo: mult}).
     Cuenta cuántos miembros reciben <= 0.5x de cada tipo atacante (incluye inmunidades 0x).
     """
+    rows = against_rows(team)
+    if rows is not None:  # registros del dataset: una operación sobre la matriz compartida
+        return dict(zip(ALL_TYPES, (rows <= 0.5).sum(axis=0).tolist()))
     resist: Dict[TypeName, int] = {t: 0 for t in ALL_TYPES}
     for p in team:
         against = getattr(p, "against", {}) or {}
@@ -82,11 +90,14 @@ def find_holes(team: List[Pokemon]) -> List[str]:
     Tipos atacantes problemáticos: promedio del multiplicador > 1.5x (umbral inicial).
     """
     holes: List[str] = []
+    matrix = against_rows(team)
+    if matrix is not None:
+        # suma > 1.5 * n equivale a promedio > 1.5 (los multiplicadores son exactos en float32)
+        over = matrix.sum(axis=0) > 1.5 * len(team)
+        return [t for t, bad in zip(ALL_TYPES, over.tolist()) if bad]
+    rows = [getattr(p, "against", {}) or {} for p in team]
     for atk_t in ALL_TYPES:
-        vals = []
-        for p in team:
-            mult = (getattr(p, "against", {}) or {}).get(atk_t, 1.0)
-            vals.append(mult)
+        vals = [against.get(atk_t, 1.0) for against in rows]
         if not vals:
             continue
         avg = sum(vals) / len(vals)
@@ -94,8 +105,9 @@ def find_holes(team: List[Pokemon]) -> List[str]:
             holes.append(atk_t)
     return holes
 
-def compute_synergy(team: List[Pokemon]) -> SynergyReport:
-    cov = offensive_coverage_count(team)
+def compute_synergy(team: List[Pokemon],
+                    attack_types: Optional[List[Iterable[TypeName]]] = None) -> SynergyReport:
+    cov = offensive_coverage_count(team, attack_types)
     res = defensive_resistances(team)
     holes = find_holes(team)
     return SynergyReport(
@@ -103,3 +115,20 @@ def compute_synergy(team: List[Pokemon]) -> SynergyReport:
         resistances_defensive=res,
         holes=holes
     )
+
+def team_holes_matrix(against, members):
+    """
+    Versión vectorizada de find_holes para muchos equipos a la vez.
+    against: matriz (N, 18) de multiplicadores (orden ALL_TYPES);
+    members: matriz (T, K) de ids de fila, -1 = hueco.
+    Devuelve una matriz booleana (T, 18): tipo atacante con promedio > 1.5x.
+    """
+    import numpy as np
+
+    members = np.asarray(members)
+    valid = members >= 0
+    rows = np.asarray(against, dtype=np.float32)[np.where(valid, members, 0)]  # (T, K, 18)
+    rows = rows * valid[:, :, None]
+    count = valid.sum(axis=1)[:, None]
+    avg = rows.sum(axis=1) / np.maximum(count, 1)
+    return (avg > 1.5) & (count > 0)
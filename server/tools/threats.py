@@ -0,0 +1,74 @@
+# server/tools/threats.py
+"""
+Amenazas concretas para un equipo: qué Pokémon del pool responden menos miembros.
+
+Un único cálculo vectorizado (equipo T × pool P × 18 tipos):
+- threat_off[p, m]: mejor multiplicador de los tipos de ataque de p contra el miembro m
+- member_off[p, m]: mejor multiplicador de los tipos de ataque de m contra p
+
+Un miembro "responde" a una amenaza si la resiste (threat_off < 1), o si la
+golpea súper eficaz (member_off >= 2) sin recibir un súper eficaz de vuelta.
+"""
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .store import DexStore
+
+
+def attack_matrix(store: DexStore, rows: np.ndarray, extra: Optional[np.ndarray] = None) -> np.ndarray:
+    """Tipos de ataque (K, 18): STAB más los tipos extra (movimientos o learnset) si se dan."""
+    att = store.stab[rows].copy()
+    if extra is not None:
+        att |= extra
+    return att
+
+
+def threat_scores(against: np.ndarray, team_rows: np.ndarray, team_attack: np.ndarray,
+                  pool_rows: np.ndarray, pool_attack: np.ndarray) -> Dict[str, np.ndarray]:
+    """Matrices (P, T) del enfrentamiento pool vs equipo y el recuento de respuestas por amenaza."""
+    team_def = against[team_rows]  # (T, 18)
+    pool_def = against[pool_rows]  # (P, 18)
+    # (P, T, 18) -> máximo sobre los tipos que el atacante usa (0 si no lo usa)
+    threat_off = (pool_attack[:, None, :] * team_def[None, :, :]).max(axis=2)
+    member_off = (team_attack[None, :, :] * pool_def[:, None, :]).max(axis=2)
+    resists = threat_off < 1
+    answers = resists | ((member_off >= 2) & (threat_off < 2))
+    return {
+        "threat_off": threat_off,
+        "member_off": member_off,
+        "answers": answers,
+        "answered_by": answers.sum(axis=1),
+        "hits_se": (threat_off >= 2).sum(axis=1),
+    }
+
+
+def rank_threats(scores: Dict[str, np.ndarray], bst: np.ndarray, top: int) -> np.ndarray:
+    """Índices del pool ordenados: menos respuestas, más miembros golpeados SE, mayor BST."""
+    order = np.lexsort((-bst, -scores["hits_se"], scores["answered_by"]))
+    return order[:top]
+
+
+def team_threats(store: DexStore, team_rows: Sequence[int], pool_rows: Sequence[int],
+                 team_extra: Optional[np.ndarray] = None, pool_extra: Optional[np.ndarray] = None,
+                 top: int = 10) -> Dict[str, Any]:
+    team_rows = np.asarray(team_rows, dtype=np.int64)
+    pool_rows = np.asarray(pool_rows, dtype=np.int64)
+    team_attack = attack_matrix(store, team_rows, team_extra).astype(np.float32)
+    pool_attack = attack_matrix(store, pool_rows, pool_extra).astype(np.float32)
+    scores = threat_scores(store.against, team_rows, team_attack, pool_rows, pool_attack)
+    bst = store.stats[pool_rows].sum(axis=1)
+    order = rank_threats(scores, bst, top)
+
+    team_names = [store.names[r] for r in team_rows]
+    threats: List[Dict[str, Any]] = []
+    for p in order.tolist():
+        answers = scores["answers"][p]
+        threats.append({
+            "name": store.names[pool_rows[p]],
+            "answered_by": int(scores["answered_by"][p]),
+            "hits_super_effective": int(scores["hits_se"][p]),
+            "checks": [team_names[m] for m in np.nonzero(answers)[0]],
+            "threatened": [team_names[m] for m in np.nonzero(scores["threat_off"][p] >= 2)[0]],
+        })
+    return {"team": team_names, "pool_size": int(len(pool_rows)), "threats": threats}
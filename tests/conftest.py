@@ -0,0 +1,21 @@
+"""Utilidades compartidas por los tests."""
+import json
+from typing import Any, Dict, Optional
+
+from server.main import handle_request
+
+
+def call_tool(name: str, arguments: Dict[str, Any], session: Optional[Dict[str, Any]] = None,
+              request_id: Any = 1, raw: bool = False) -> Any:
+    """
+    tools/call en modo compacto con una sesión nueva (o `session`). Devuelve el resultado ya decodificado,
+    o el objeto `error`; con raw=True, la respuesta JSON-RPC tal cual.
+    """
+    req = {"jsonrpc": "2.0", "id": request_id, "method": "tools/call",
+           "params": {"name": name, "arguments": dict(arguments, _encoding="compact")}}
+    reply = handle_request(req, {} if session is None else session)
+    if raw:
+        return reply
+    if "error" in reply:
+        return reply["error"]
+    return json.loads(reply["result"]["content"][0]["text"])
@@ -0,0 +1,61 @@
+from collections import Counter
+from itertools import combinations
+
+from server.tools.analytics import archive_stats, ingest, summarize
+from server.tools.showdown import parse_team, teams_to_showdown
+from tests.conftest import call_tool
+
+SAMPLE = parse_team(open("examples/sample_team_showdown.txt", encoding="utf-8").read())
+
+def _write_archive(tmp_path):
+    other = {"name": "Other", "format": "gen8vgc2021", "pokemon": [
+        {"name": "Incineroar"}, {"name": "Rillaboom"}, {"name": "Kyogre"},
+        {"name": "Grimmsnarl"}, {"name": "Thundurus"}, {"name": "Amoonguss"}]}
+    (tmp_path / "a.txt").write_text(teams_to_showdown([SAMPLE] * 3), encoding="utf-8")
+    (tmp_path / "b.txt").write_text(teams_to_showdown([other] * 2), encoding="utf-8")
+    return [SAMPLE] * 3 + [other] * 2
+
+def test_usage_pairs_and_restricted(tmp_path, monkeypatch):
+    monkeypatch.setenv("VGC_CACHE_DIR", str(tmp_path / "cache"))
+    teams = _write_archive(tmp_path)
+    out = archive_stats(str(tmp_path), top=50, workers=1)
+    assert out["teams"] == 5 and out["unresolved_sets"] == 0
+    usage = {u["name"]: u["count"] for u in out["usage"]}
+    assert usage["Incineroar"] == 5 and usage["Amoonguss"] == 5 and usage["Kyogre"] == 2
+
+    pairs = Counter()
+    for t in teams:
+        names = sorted(parse_team(teams_to_showdown([t]))["pokemon"], key=lambda s: s["name"])
+        pairs.update(frozenset(c) for c in combinations([s["name"] for s in names], 2))
+    got = {frozenset(p["members"]): p["count"] for p in out["pairs"]}
+    assert got[frozenset({"Incineroar", "Amoonguss"})] == pairs[frozenset({"Incineroar", "Amoonguss"})] == 5
+
+    assert out["restricted"]["vgc2021"]["usage"] == [{"name": "Kyogre", "count": 2}]
+    assert out["restricted"]["vgc2022"]["teams"] == 3
+
+def test_cache_reused(tmp_path, monkeypatch):
+    monkeypatch.setenv("VGC_CACHE_DIR", str(tmp_path / "cache"))
+    _write_archive(tmp_path)
+    first = ingest(str(tmp_path), workers=1)
+    second = ingest(str(tmp_path), workers=1)
+    assert first.cached == 0 and second.cached == 2
+    assert summarize(first) == {**summarize(second), "cached_files": 0}
+
+def test_tool_paths_stay_inside_archive_root(tmp_path, monkeypatch):
+    def call(path, **extra):
+        return call_tool("archive_stats", dict(extra, path=path, workers=1))
+
+    root = tmp_path / "root"
+    root.mkdir()
+    monkeypatch.setenv("VGC_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setenv("VGC_ARCHIVE_ROOT", str(root))
+    _write_archive(root)
+    (tmp_path / "secret.txt").write_text(teams_to_showdown([SAMPLE]), encoding="utf-8")
+    (root / "link.txt").symlink_to(tmp_path / "secret.txt")
+    (root / "notes.cfg").write_text("token=abc", encoding="utf-8")
+
+    assert call(".")["teams"] == 5  # el enlace que sale de root no se lee
+    assert call(str(root / "a.txt"))["teams"] == 3
+    for bad in ("..", "../secret.txt", str(tmp_path / "secret.txt"), "/etc", "link.txt", "notes.cfg"):
+        assert call(bad)["code"] == -32602, bad
+    assert call(".", top=0)["code"] == -32602
@@ -0,0 +1,37 @@
+import json
+
+import numpy as np
+
+from server.tools.damage import calc_stats, damage_matrix
+from server.tools.store import default_store
+from server.main import handle_request
+
+GARCHOMP = {"name": "Garchomp", "moves": ["Earthquake"], "nature": "Adamant", "evs": {"Atk": 252, "Spe": 252, "HP": 4}}
+
+def test_level_50_stats():
+    stats = calc_stats(np.array([[108, 130, 95, 80, 85, 102]]), np.array([[252, 252, 0, 0, 0, 4]]),
+                       np.full((1, 6), 31), np.array([[100, 110, 100, 90, 100, 100]]), np.array([50]))
+    assert stats[0].tolist() == [215, 200, 115, 90, 105, 123]
+
+def test_rolls_match_reference_calc():
+    # 252+ Atk Garchomp Earthquake (spread) vs. 252 HP / 0 Def Incineroar: 152-182
+    out = damage_matrix([GARCHOMP], [{"name": "Incineroar", "evs": {"HP": 252}}], direction="team")
+    m = out["team_vs_threats"]
+    assert m["move"][0][0] == "Earthquake"
+    assert m["damage_pct"][0][0] == [75.2, 90.1]
+    single = damage_matrix([GARCHOMP], [{"name": "Incineroar", "evs": {"HP": 252}}], direction="team", doubles=False)
+    assert single["team_vs_threats"]["damage_pct"][0][0][1] > 100 and single["team_vs_threats"]["ko"][0][0] > 0
+
+def test_immunity_and_unknown_names():
+    out = damage_matrix([GARCHOMP], ["Zapdos", "Missingno"], direction="team")
+    assert out["unknown"] == ["Missingno"]
+    assert out["team_vs_threats"]["damage_pct"][0][0] == [0.0, 0.0]
+
+def test_damage_matrix_tool_shape():
+    team = {"pokemon": [{"name": n} for n in ("Incineroar", "Amoonguss", "Kyogre")]}
+    req = {"jsonrpc": "2.0", "id": 1, "method": "tools/call",
+           "params": {"name": "damage_matrix", "arguments": {"team": team, "threats": default_store().names[:40],
+                                                             "_encoding": "compact"}}}
+    out = json.loads(handle_request(req, {})["result"]["content"][0]["text"])
+    assert np.array(out["team_vs_threats"]["ko"]).shape == (3, 40)
+    assert np.array(out["threats_vs_team"]["ko"]).shape == (40, 3)
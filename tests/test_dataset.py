@@ -7,3 +7,12 @@ def test_dataset_shape_and_against_keys():
     against_cols = [c for c in df.columns if c.lower().startswith("against_")]
     if against_cols:
         assert len(against_cols) >= 18
+
+def test_name_index_cache_is_bounded(monkeypatch):
+    from server.tools import dataset
+    monkeypatch.setattr(dataset, "NAME_CACHE_SIZE", 8)
+    index = dataset.NameIndex(["Garchomp", "Ninetales Alola", "Indeedee Male"])
+    for i in range(50):
+        assert index.resolve(f"nope{i}") is None
+    assert index.resolve("Ninetales-Alola") == 1 and index.resolve("garchomp") == 0
+    assert len(index._cache) == 8 and list(index._cache)[-2:] == ["ninetalesalola", "garchomp"]
@@ -0,0 +1,46 @@
+import weakref
+
+from server.core.deadline import Deadline
+from server.main import handle_request
+from server.tools.analytics import archive_stats
+from server.tools.damage import damage_matrix
+from server.tools.showdown import parse_team, teams_to_showdown
+from tests.conftest import call_tool
+
+SAMPLE = parse_team(open("examples/sample_team_showdown.txt", encoding="utf-8").read())
+
+def test_deadline_basics(monkeypatch):
+    assert not Deadline().expired()
+    d = Deadline(0)
+    assert d.expired() and d.truncated
+    monkeypatch.setenv("VGC_DEADLINE_MS", "250")
+    assert 0 < Deadline.from_argument(None).remaining_ms() <= 250
+    # 0 significa lo mismo en la variable y en _deadline_ms: presupuesto agotado
+    monkeypatch.setenv("VGC_DEADLINE_MS", "0")
+    assert Deadline.from_argument(None).expired() and Deadline.from_argument(0).expired()
+    monkeypatch.setenv("VGC_DEADLINE_MS", "")
+    assert Deadline.from_argument(None).remaining_ms() is None
+
+def test_suggest_team_truncates_and_is_not_cached():
+    args = {"format": "vgc2022", "constraints": {"min_speed": 75}}
+    fast = call_tool("suggest_team", dict(args, _deadline_ms=0))
+    assert fast["truncated"] is True and len(fast["team"]["pokemon"]) == 6
+    full = call_tool("suggest_team", args)
+    assert "truncated" not in full
+
+def test_cancel_notification_stops_inflightcall_tool():
+    d = Deadline()
+    session = {"inflight": weakref.WeakValueDictionary({42: d})}
+    handle_request({"jsonrpc": "2.0", "method": "notifications/cancelled", "params": {"requestId": 42}}, session)
+    assert d.expired()
+
+def test_engines_return_partial_results(tmp_path, monkeypatch):
+    monkeypatch.setenv("VGC_CACHE_DIR", str(tmp_path / "cache"))
+    for name in ("a.txt", "b.txt"):
+        (tmp_path / name).write_text(teams_to_showdown([SAMPLE] * 3), encoding="utf-8")
+    out = archive_stats(str(tmp_path), workers=1, deadline=Deadline(0))
+    assert out["truncated"] and out["teams"] == 3 and "trios" not in out
+    assert archive_stats(str(tmp_path), workers=1)["teams"] == 6
+
+    dm = damage_matrix(["Garchomp"], ["Incineroar"], deadline=Deadline(0))
+    assert dm["truncated"] and "team_vs_threats" in dm and "threats_vs_team" not in dm
@@ -0,0 +1,62 @@
+import json
+import multiprocessing
+
+from server import main
+from server.core.diskcache import DiskCache
+from server.core.encoding import EncodedResult
+
+
+def _entry(value):
+    return EncodedResult(value)
+
+
+def test_round_trip_and_namespace(tmp_path):
+    path = tmp_path / "results.sqlite3"
+    cache = DiskCache(path, lambda: "v1")
+    cache.put("pool_filter", '{"a":1}', _entry({"pokemon": ["Garchomp"], "n": 1}))
+    cache.put("export_showdown", '{"b":2}', _entry("Garchomp @ Life Orb\n"))
+    assert cache.get("pool_filter", '{"a":1}').value == {"pokemon": ["Garchomp"], "n": 1}
+    assert cache.get("export_showdown", '{"b":2}').value == "Garchomp @ Life Orb\n"
+    assert cache.get("pool_filter", '{"a":2}') is None
+    # otra versión de dataset/reglas/código no ve lo anterior
+    assert DiskCache(path, lambda: "v2").get("pool_filter", '{"a":1}') is None
+    assert DiskCache(path, lambda: "v1").get("pool_filter", '{"a":1}') is not None
+
+
+def test_eviction_keeps_size_bounded(tmp_path):
+    cache = DiskCache(tmp_path / "results.sqlite3", lambda: "v1", max_bytes=20_000)
+    for i in range(100):
+        cache.put("t", str(i), _entry({"i": i, "pad": "x" * 400}))
+    n, total = cache.stats()
+    assert total <= 20_000 and 0 < n < 100
+    assert cache.get("t", "99") is not None and cache.get("t", "0") is None
+
+
+def _writer(path, k):
+    cache = DiskCache(path, lambda: "v1")
+    for i in range(50):
+        cache.put("t", f"{k}-{i}", _entry({"k": k, "i": i}))
+        assert cache.get("t", f"{k}-{i}").value == {"k": k, "i": i}
+    return cache.disabled
+
+
+def test_concurrent_processes(tmp_path):
+    path = tmp_path / "results.sqlite3"
+    with multiprocessing.get_context("spawn").Pool(4) as pool:
+        assert pool.starmap(_writer, [(path, k) for k in range(4)]) == [False] * 4
+    assert DiskCache(path, lambda: "v1").stats()[0] == 200
+
+
+def test_handle_request_reads_through(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "_DISK", DiskCache(tmp_path / "results.sqlite3", main._cache_namespace))
+    req = {"jsonrpc": "2.0", "id": 1, "method": "tools/call",
+           "params": {"name": "pool_filter", "arguments": {"query": "spe >= 130", "limit": 3}}}
+    first = main.handle_request(req, {})["result"]["content"][0]["text"]
+    main._RESULTS.clear()
+
+    def fail(arguments, deadline):
+        raise AssertionError("handler called on a disk hit")
+
+    monkeypatch.setattr(main.TOOLS.get("pool_filter"), "handler", fail)
+    assert main.handle_request(req, {})["result"]["content"][0]["text"] == first
+    assert json.loads(first)
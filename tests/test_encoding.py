@@ -0,0 +1,38 @@
+import json
+
+from server.core.encoding import encode, to_columns, EncodedResult
+from server.main import handle_request
+
+ROWS = [
+    {"Name": "Garchomp", "Spe": 102, "Type 2": "Ground"},
+    {"Name": "Amoonguss", "Spe": 30, "Type 2": "Poison"},
+]
+
+def test_columns_mode_roundtrip():
+    cols = to_columns({"rows": ROWS})
+    assert cols["rows"]["Name"] == ["Garchomp", "Amoonguss"]
+    assert json.loads(encode(ROWS, "columns")) == {"Name": ["Garchomp", "Amoonguss"], "Spe": [102, 30], "Type 2": ["Ground", "Poison"]}
+    assert len(encode(ROWS, "compact")) < len(encode(ROWS, "pretty"))
+
+def test_table_mode_header_and_rows():
+    text = encode(ROWS, "table")
+    assert text.splitlines() == ["Name|Spe|Type 2", "Garchomp|102|Ground", "Amoonguss|30|Poison"]
+
+def test_encoded_result_caches_per_mode():
+    res = EncodedResult(ROWS)
+    assert res.encode("compact") is res.encode("compact")
+
+def test_tools_call_encoding_per_call_and_session():
+    session = {}
+    init = handle_request({"jsonrpc": "2.0", "id": 1, "method": "initialize",
+                           "params": {"protocolVersion": "2025-06-18", "capabilities": {"experimental": {"encoding": "compact"}}}}, session)
+    assert init["result"]["capabilities"]["experimental"]["encoding"]["selected"] == "compact"
+
+    call = {"jsonrpc": "2.0", "id": 2, "method": "tools/call",
+            "params": {"name": "pool_filter", "arguments": {"constraints": {"min_speed": 120}, "limit": 3}}}
+    text = handle_request(call, session)["result"]["content"][0]["text"]
+    assert "\n" not in text and len(json.loads(text)) == 3
+
+    call["params"]["arguments"]["_encoding"] = "columns"
+    cols = json.loads(handle_request(call, session)["result"]["content"][0]["text"])
+    assert len(cols["Name"]) == 3
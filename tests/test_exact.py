@@ -0,0 +1,79 @@
+import pytest
+
+from server.core.models import SuggestParams
+from server.core.formats import species_key
+from server.engine import suggest_team
+from server.engine.builder import ConstraintError, restricted_species
+from server.engine.exact import requirements
+from server.tools.store import default_store
+
+ROLES = ["fake_out", "redirection", "tailwind", "trick_room_setter", "intimidate", "wide_guard"]
+
+def _names(out):
+    return [m["name"] for m in out["team"]["pokemon"]]
+
+def _covers(names, constraints):
+    store = default_store()
+    for label, rows in requirements(store, constraints):
+        assert any(rows[store.resolve(n)] for n in names), label
+
+def test_exact_mode_covers_every_role_and_type():
+    c = {"need_roles": ROLES, "include_types": ["Fire", "Water", "Grass"], "exact": True}
+    out = suggest_team(SuggestParams(constraints=c))
+    names = _names(out)
+    assert out["success"] and out["exact"]["feasible"] and len(names) == 6
+    _covers(names, c)
+    assert set(out["exact"]["covered_by"]) == set(out["exact"]["requirements"])
+
+def test_exact_mode_teams_respect_overlap_and_restricted_cap():
+    c = {"need_roles": ["fake_out", "tailwind"], "include_types": ["Water"], "lock": ["Kyogre"], "exact": True}
+    out = suggest_team(SuggestParams(constraints=c, num_teams=3, max_overlap=2))
+    teams = [[m["name"] for m in t["team"]["pokemon"]] for t in out["teams"]]
+    assert len(teams) == 3
+    for i, names in enumerate(teams):
+        assert names[0] == "Kyogre" and len(names) == 6
+        assert sum(species_key(n) in restricted_species("vgc2022") for n in names) <= 2
+        _covers(names, c)
+        for j in range(i):
+            assert len(set(names[1:]) & set(teams[j][1:])) <= 2
+
+def test_infeasible_reports_minimal_relaxation():
+    # rol válido que el filtro deja sin candidatos: la relajación mínima quita ese rol
+    c = {"need_roles": ["fake_out", "wide_guard"], "query": "not role:wide_guard", "exact": True}
+    out = suggest_team(SuggestParams(constraints=c))
+    assert not out["success"] and out["exact"]["relaxed"] == ["need_roles:wide_guard"]
+    assert len(_names(out)) == 6
+    # un filtro que deja el pool sin ningún Fire: basta con quitar ese filtro
+    c = {"include_types": ["Fire"], "need_roles": ["trick_room_setter"], "min_speed": 150, "exact": True}
+    out = suggest_team(SuggestParams(constraints=c))
+    assert out["exact"]["relaxed"] == ["min_speed"]
+    _covers(_names(out), c)
+
+def test_move_roles_without_learnset_are_reported_unverified():
+    c = {"need_roles": ["fake_out", "tailwind", "trick_room_setter"], "exact": True}
+    out = suggest_team(SuggestParams(constraints=c))
+    assert out["exact"]["feasible"]
+    for label, names in out["exact"].get("unverified", {}).items():
+        assert set(names) <= set(out["exact"]["covered_by"][label])
+
+def _error(constraints):
+    from server.main import handle_request
+    req = {"jsonrpc": "2.0", "id": 1, "method": "tools/call",
+           "params": {"name": "suggest_team", "arguments": {"constraints": constraints}}}
+    return handle_request(req, {})["error"]
+
+def test_too_many_requirements_is_invalid_params(monkeypatch):
+    from server.engine import exact
+    monkeypatch.setattr(exact, "MAX_REQUIREMENTS", 3)
+    err = _error({"need_roles": ROLES[:4], "exact": True})
+    assert err["code"] == -32602 and "at most 3" in err["data"] and "got 4" in err["data"]
+
+def test_unknown_roles_types_and_bad_caps_are_invalid_params():
+    err = _error({"need_roles": ["fake_out", "bogus_role"], "exact": True})
+    assert err["code"] == -32602 and "bogus_role" in err["data"]
+    assert _error({"include_types": ["Fire", "Shadow"], "exact": True})["code"] == -32602
+    for cap in ("two", -1):
+        assert _error({"strategy": {"restricted_cap": cap}})["code"] == -32602
+    # sin la capa MCP: ConstraintError (un ValueError)
+    with pytest.raises(ConstraintError):
+        suggest_team(SuggestParams(constraints={"strategy": {"restricted_cap": "two"}}))
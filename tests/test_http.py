@@ -0,0 +1,143 @@
+import asyncio
+import http.client
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from server.http_server import MCPHttpServer
+from server.main import handle_request
+
+INIT = {"jsonrpc": "2.0", "id": 1, "method": "initialize",
+        "params": {"protocolVersion": "2025-06-18", "capabilities": {"experimental": {"encoding": "compact"}}}}
+
+
+@pytest.fixture
+def server():
+    loop = asyncio.new_event_loop()
+    srv = MCPHttpServer(handle_request, port=0, max_concurrency=2, max_pending=2)
+    loop.run_until_complete(srv.start())
+    t = threading.Thread(target=loop.run_forever, daemon=True)
+    t.start()
+    yield srv
+    asyncio.run_coroutine_threadsafe(srv.close(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    t.join()
+
+
+def _post(srv, body, sid=None, accept="application/json, text/event-stream"):
+    conn = http.client.HTTPConnection("127.0.0.1", srv.port, timeout=10)
+    headers = {"Content-Type": "application/json", "Accept": accept}
+    if sid:
+        headers["Mcp-Session-Id"] = sid
+    conn.request("POST", "/mcp", json.dumps(body), headers)
+    resp = conn.getresponse()
+    data = resp.read()
+    conn.close()
+    return resp, data
+
+
+def _init(srv):
+    resp, data = _post(srv, INIT)
+    assert resp.status == 200
+    return resp.getheader("Mcp-Session-Id"), json.loads(data)
+
+
+def test_session_lifecycle_and_sse(server):
+    sid, init = _init(server)
+    assert sid and init["result"]["capabilities"]["experimental"]["encoding"]["selected"] == "compact"
+    resp, _ = _post(server, {"jsonrpc": "2.0", "id": 2, "method": "tools/list"})
+    assert resp.status == 400  # falta la sesión
+    resp, data = _post(server, {"jsonrpc": "2.0", "id": 2, "method": "tools/list"}, sid, accept="text/event-stream")
+    assert resp.status == 200 and resp.getheader("Content-Type") == "text/event-stream"
+    event = data.decode("utf-8")
+    assert event.startswith("event: message\ndata: ")
+    assert json.loads(event.split("data: ", 1)[1])["id"] == 2
+    conn = http.client.HTTPConnection("127.0.0.1", server.port, timeout=10)
+    conn.request("DELETE", "/mcp", headers={"Mcp-Session-Id": sid})
+    assert conn.getresponse().status == 204
+    resp, _ = _post(server, {"jsonrpc": "2.0", "id": 3, "method": "tools/list"}, sid)
+    assert resp.status == 404
+
+
+def test_concurrent_clients_share_one_process(server):
+    call = {"jsonrpc": "2.0", "id": 5, "method": "tools/call",
+            "params": {"name": "team_synergy", "arguments": {"team": {"pokemon": [{"name": "Garchomp"}]}}}}
+
+    def retrying(body, sid=None):
+        # los clientes reintentan ante 503 (Retry-After), como haría cualquier cliente HTTP
+        for _ in range(100):
+            resp, data = _post(server, body, sid)
+            if resp.status != 503:
+                return resp, data
+            time.sleep(0.05)
+        raise AssertionError("server stayed busy")
+
+    def client(_):
+        resp, _ = retrying(INIT)
+        resp, data = retrying(call, resp.getheader("Mcp-Session-Id"))
+        return resp.status, json.loads(data)
+
+    with ThreadPoolExecutor(max_workers=12) as pool:
+        results = list(pool.map(client, range(12)))
+    assert all(s == 200 for s, _ in results)
+    ok = [r for _, r in results]
+    # misma respuesta para todos: sesiones con el mismo modo comparten la caché de resultados
+    assert len({json.dumps(r["result"]) for r in ok}) == 1
+
+
+def test_backpressure_returns_503(server):
+    release = threading.Event()
+
+    def slow(message, session):
+        release.wait(5)
+        return {"jsonrpc": "2.0", "id": message.get("id"), "result": {}}
+
+    sid, _ = _init(server)
+    server.handler = slow
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        futs = [pool.submit(_post, server, {"jsonrpc": "2.0", "id": i, "method": "ping"}, sid) for i in range(6)]
+        time.sleep(0.5)
+        release.set()
+        statuses = sorted(f.result()[0].status for f in futs)
+    assert statuses.count(503) == 2 and statuses.count(200) == 4
+
+
+@pytest.mark.parametrize("length", ["abc", "-5", "1e3"])
+def test_bad_content_length_gets_400(server, length):
+    import socket
+    with socket.create_connection(("127.0.0.1", server.port), timeout=10) as s:
+        s.sendall(f"POST /mcp HTTP/1.1\r\nHost: x\r\nContent-Length: {length}\r\n\r\n{{}}".encode("latin-1"))
+        reply = s.recv(4096).decode("latin-1")
+    assert reply.startswith("HTTP/1.1 400") and "Connection: close" in reply
+
+
+def test_batch_is_admitted_whole_and_cancel_needs_no_slot(server):
+    release = threading.Event()
+    seen = []
+
+    def slow(message, session):
+        seen.append(message.get("method"))
+        if message.get("method") == "ping":
+            release.wait(5)
+        return None if "id" not in message else {"jsonrpc": "2.0", "id": message["id"], "result": {}}
+
+    sid, _ = _init(server)
+    server.handler = slow
+    ping = lambda i: {"jsonrpc": "2.0", "id": i, "method": "ping"}
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futs = [pool.submit(_post, server, ping(i), sid) for i in range(3)]
+        time.sleep(0.3)
+        # quedaba una plaza: el batch de 2 se rechaza sin ejecutar ninguno
+        resp, _ = _post(server, [{"jsonrpc": "2.0", "id": 10, "method": "tools/list"},
+                                 {"jsonrpc": "2.0", "id": 11, "method": "tools/list"}], sid)
+        assert resp.status == 503 and "tools/list" not in seen
+        cancel = {"jsonrpc": "2.0", "method": "notifications/cancelled", "params": {"requestId": 0}}
+        resp, _ = _post(server, cancel, sid)
+        assert resp.status == 202 and "notifications/cancelled" in seen
+        release.set()
+        assert all(f.result()[0].status == 200 for f in futs)
+    resp, _ = _post(server, [ping(i) for i in range(5)], sid)
+    assert resp.status == 413
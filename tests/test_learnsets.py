@@ -0,0 +1,44 @@
+from server.tools.learnsets import default_learnsets
+from tests.conftest import call_tool
+
+
+def test_bitset_indexes_agree():
+    ls = default_learnsets()
+    row = ls.store.resolve("Incineroar")
+    assert ls.learns(row, "Fake Out") and ls.learns(row, "fakeout")
+    assert not ls.learns(row, "Trick Room")
+    assert "Fake Out" in ls.moves_of(row)
+    fake_out = ls.learners(["Fake Out"])
+    assert fake_out[row] and fake_out.sum() >= 5
+    assert ls.role_mask("fake_out")[row] and "fake_out" in ls.roles_of(row)
+    assert not ls.unresolved
+
+def test_require_moves_unknown_move_matches_nobody():
+    ls = default_learnsets()
+    assert not ls.require_moves_mask(["Fake Out", "Not A Move"]).any()
+    both = ls.require_moves_mask(["Trick Room", "Helping Hand"])
+    assert both[ls.store.resolve("Cresselia")] and not both[ls.store.resolve("Incineroar")]
+
+def test_pool_filter_require_moves():
+    out = call_tool("pool_filter", {"constraints": {"require_moves": ["Follow Me"]}, "limit": 1000})
+    names = {p["Name"] for p in out}
+    assert "Togekiss" in names and "Incineroar" not in names
+
+def test_rows_without_learnset_survive_move_filters():
+    ls = default_learnsets()
+    row = ls.store.resolve("Snorlax")
+    assert not ls.known[row]
+    assert ls.learners(["Fake Out"])[row] and not ls.learners(["Fake Out"], unknown=False)[row]
+    assert ls.require_moves_mask(["Fake Out"])[row] and ls.role_mask("fake_out")[row]
+    assert "fake_out" not in ls.roles_of(row)  # roles_of sólo afirma lo que consta
+    out = call_tool("pool_filter", {"constraints": {"require_moves": ["Fake Out"]}, "limit": 1000})
+    assert len(out) > 100 and "Snorlax" in {p["Name"] for p in out}
+    both = call_tool("pool_filter", {"query": "move:fakeout and role:fake_out", "limit": 1000})
+    assert "Snorlax" in {p["Name"] for p in both}
+
+def test_team_synergy_move_coverage():
+    team = {"pokemon": [{"name": "Incineroar", "moves": ["Fake Out", "Close Combat"]}]}
+    syn = call_tool("team_synergy", {"team": team})
+    stab = call_tool("team_synergy", {"team": team, "coverage": "stab"})
+    # Close Combat añade Fighting: ahora cubre Normal/Rock
+    assert syn["coverage_offensive"]["Normal"] == 1 and stab["coverage_offensive"]["Normal"] == 0
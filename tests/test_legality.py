@@ -0,0 +1,43 @@
+import numpy as np
+
+from server.core.legality import ERR_BANNED, ERR_ITEM, ERR_RESTRICTED, ERR_SPECIES, format_rules, validate_teams
+from server.main import suggest_team, SuggestParams
+
+OK = ["Incineroar", "Rillaboom", "Amoonguss", "Garchomp", "Tornadus", "Kyogre"]
+
+def test_restricted_cap_follows_format():
+    two = OK[:4] + ["Kyogre", "Zacian Crowned Sword"]
+    assert validate_teams([two], "vgc2022")[0]["valid"]
+    res = validate_teams([two], "vgc2021")[0]
+    assert not res["valid"] and any("restricted" in e for e in res["errors"])
+    assert not validate_teams([OK], "vgc2020")[0]["valid"]  # Kyogre no es legal en 2020
+
+def test_clauses_and_banned_forms():
+    res = validate_teams([
+        [{"name": "Rotom-Wash", "item": "Sitrus Berry"}, {"name": "Rotom-Heat", "item": "sitrus berry"}],
+        ["Mega Charizard X", "Incineroar"],
+        ["Missingno"],
+    ], "vgc2022")
+    errs = " | ".join(res[0]["errors"])
+    assert "species clause" in errs and "item clause" in errs
+    assert "not allowed" in res[1]["errors"][0]
+    assert res[2]["errors"] == ["Missingno: unknown Pokémon"]
+
+def test_check_ids_batch_matches_single():
+    rules = format_rules("vgc2022")
+    rng = np.random.default_rng(0)
+    ids = rng.integers(0, len(rules.store), size=(2000, 6))
+    items = rng.integers(-1, 30, size=(2000, 6))
+    err = rules.check_ids(ids, items)
+    for r in range(0, 2000, 97):
+        row = ids[r]
+        assert bool(err[r] & ERR_BANNED) == bool(rules.banned[row].any())
+        assert bool(err[r] & ERR_SPECIES) == (len(set(rules.numbers[row])) < 6)
+        held = [i for i in items[r] if i >= 0]
+        assert bool(err[r] & ERR_ITEM) == (len(set(held)) < len(held))
+        assert bool(err[r] & ERR_RESTRICTED) == (rules.restricted[row].sum() > 2)
+
+def test_suggest_team_output_is_legal():
+    for fmt in ("vgc2020", "vgc2021", "vgc2022"):
+        out = suggest_team(SuggestParams(format=fmt, constraints={"lock": ["Kyogre", "Groudon", "Zacian"]}))
+        assert validate_teams([out["team"]], fmt)[0]["valid"], fmt
@@ -1,127 +1,56 @@
 #!/usr/bin/env python3
 """
-Script para probar el servidor MCP en Windows
+Prueba de extremo a extremo del servidor MCP por stdio
 """
-import subprocess
 import json
+import subprocess
 import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
 
 def test_mcp_server():
-    """Prueba el servidor MCP enviando un mensaje de inicialización"""
-    
-    # Mensaje de inicialización MCP
-    init_message = {
-        "jsonrpc": "2.0",
-        "method": "initialize",
-        "params": {
-            "protocolVersion": "2025-06-18",
-            "capabilities": {},
-            "clientInfo": {
-                "name": "test-client",
-                "version": "1.0.0"
-            }
-        },
-        "id": 1
-    }
-    
-    # Mensaje de initialized (notification)
-    initialized_message = {
-        "jsonrpc": "2.0",
-        "method": "initialized",
-        "params": {}
-    }
-    
-    # Mensaje para listar tools
-    list_tools_message = {
-        "jsonrpc": "2.0",
-        "method": "tools/list",
-        "params": {},
-        "id": 2
-    }
-    
+    """initialize, la notification initialized y tools/list contra un proceso real"""
+    messages = [
+        {"jsonrpc": "2.0", "id": 1, "method": "initialize",
+         "params": {"protocolVersion": "2025-06-18", "capabilities": {},
+                    "clientInfo": {"name": "test-client", "version": "1.0.0"}}},
+        {"jsonrpc": "2.0", "method": "initialized", "params": {}},
+        {"jsonrpc": "2.0", "id": 2, "method": "tools/list", "params": {}},
+    ]
+    process = subprocess.Popen([sys.executable, "-m", "server.main", "--warm", "off"], cwd=ROOT,
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    try:
+        out, _ = process.communicate("".join(json.dumps(m) + "\n" for m in messages), timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        raise
+    replies = [json.loads(line) for line in out.splitlines() if line.strip()]
+    # initialized es una notification: sólo responden initialize y tools/list
+    assert [r["id"] for r in replies] == [1, 2]
+    assert replies[0]["result"]["serverInfo"]["name"] == "vgc-teambuilder"
+    tools = replies[1]["result"]["tools"]
+    assert "suggest_team" in {t["name"] for t in tools}
+    assert all(t.get("description") for t in tools)
+
+
+def test_cancel_over_stdio():
+    """notifications/cancelled llega aunque el bucle principal esté ocupado (stdin se lee en otro hilo)"""
+    call = {"jsonrpc": "2.0", "id": 3, "method": "tools/call",
+            "params": {"name": "suggest_team", "arguments": {"format": "vgc2021", "constraints": {"min_speed": 61},
+                                                              "_encoding": "compact"}}}
+    cancel = {"jsonrpc": "2.0", "method": "notifications/cancelled", "params": {"requestId": 3}}
+    process = subprocess.Popen([sys.executable, "-m", "server.main", "--warm", "off"], cwd=ROOT,
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
     try:
-        print("Iniciando servidor MCP...")
-        
-        # Iniciar el proceso del servidor
-        process = subprocess.Popen(
-            [sys.executable, "-m", "server.main"],
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            bufsize=0,  # Sin buffer
-            cwd=r"C:\Users\Andy Ortega\Progras\Redes\MCP-PokeVGC-Teambuilder"
-        )
-        
-        print("Enviando mensaje de inicialización...")
-        
-        # Enviar mensaje de inicialización
-        init_json = json.dumps(init_message) + "\n"
-        process.stdin.write(init_json)
-        process.stdin.flush()
-        
-        # Leer respuesta
-        response_line = process.stdout.readline()
-        if response_line:
-            print("Respuesta de initialize:")
-            print(response_line.strip())
-            
-            try:
-                response = json.loads(response_line)
-                if response.get("result"):
-                    print("✓ Inicialización exitosa")
-                else:
-                    print("❌ Error en inicialización:", response.get("error"))
-            except json.JSONDecodeError:
-                print("❌ Respuesta no es JSON válido")
-        
-        # Enviar initialized notification
-        print("\nEnviando notification 'initialized'...")
-        initialized_json = json.dumps(initialized_message) + "\n"
-        process.stdin.write(initialized_json)
-        process.stdin.flush()
-        
-        # Enviar tools/list
-        print("\nSolicitando lista de herramientas...")
-        list_tools_json = json.dumps(list_tools_message) + "\n"
-        process.stdin.write(list_tools_json)
-        process.stdin.flush()
-        
-        # Leer respuesta de tools/list
-        tools_response = process.stdout.readline()
-        if tools_response:
-            print("Respuesta de tools/list:")
-            print(tools_response.strip())
-            
-            try:
-                tools_data = json.loads(tools_response)
-                if tools_data.get("result") and tools_data["result"].get("tools"):
-                    tools = tools_data["result"]["tools"]
-                    print(f"✓ {len(tools)} herramientas encontradas:")
-                    for tool in tools:
-                        print(f"  - {tool.get('name')}: {tool.get('description')}")
-                else:
-                    print("❌ No se encontraron herramientas")
-            except json.JSONDecodeError:
-                print("❌ Respuesta de tools no es JSON válido")
-        
-        # Cerrar el proceso
-        process.stdin.close()
-        process.wait(timeout=5)
-        
-        # Mostrar stderr si hay errores
-        stderr_output = process.stderr.read()
-        if stderr_output:
-            print("\nOutput de stderr:")
-            print(stderr_output)
-            
+        out, _ = process.communicate(json.dumps(call) + "\n" + json.dumps(cancel) + "\n", timeout=60)
     except subprocess.TimeoutExpired:
-        print("❌ Timeout - el servidor no respondió")
         process.kill()
-    except Exception as e:
-        print(f"❌ Error ejecutando test: {e}")
-        if 'process' in locals():
-            process.kill()
+        raise
+    reply = json.loads(out.strip())
+    assert reply["id"] == 3 and json.loads(reply["result"]["content"][0]["text"])["truncated"] is True
+
 
 if __name__ == "__main__":
-    test_mcp_server()
\ No newline at end of file
+    test_mcp_server()
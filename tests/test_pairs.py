@@ -0,0 +1,42 @@
+import json
+
+import numpy as np
+
+from server.tools.pairs import COVER_WEIGHT, SHARED_WEIGHT, PairMatrix
+from server.tools.store import default_store
+from server.main import handle_request
+
+def test_pair_matrix_matches_type_chart_and_is_cached(tmp_path, monkeypatch):
+    monkeypatch.setenv("VGC_CACHE_DIR", str(tmp_path))
+    store = default_store()
+    pairs = PairMatrix("vgc2022", store)
+    assert list((tmp_path / "pairs").glob("vgc2022-*.npy"))
+    again = PairMatrix("vgc2022", store)
+    assert isinstance(again.matrix, np.memmap) and np.array_equal(again.matrix, pairs.matrix)
+
+    chomp, mence, rotom = store.ids(["Garchomp", "Salamence", "Rotom-Wash"])
+    # Garchomp y Salamence comparten Ice, Dragon y Fairy
+    assert pairs.pair(chomp, mence)[1] == 3
+    # Rotom-Wash resiste Ice (debilidad x4 de Garchomp)
+    assert pairs.pair(chomp, rotom)[0] >= 1
+    cover, shared = pairs.pair(chomp, rotom)
+    assert pairs.scores([rotom], [chomp])[0] == COVER_WEIGHT * cover - SHARED_WEIGHT * shared
+    assert pairs.scores([rotom], [chomp])[0] > pairs.scores([mence], [chomp])[0]
+
+def test_suggest_member_prefers_core_complements():
+    req = {"jsonrpc": "2.0", "id": 1, "method": "tools/call",
+           "params": {"name": "suggest_member", "arguments": {"min_speed": 0, "core": ["Garchomp"], "_encoding": "compact"}}}
+    out = json.loads(handle_request(req, {})["result"]["content"][0]["text"])
+    assert out and "Garchomp" not in {m["Name"] for m in out}
+
+def test_rules_edit_invalidates_cached_matrix(tmp_path, monkeypatch):
+    import server.tools.pairs as pairs_mod
+    monkeypatch.setenv("VGC_CACHE_DIR", str(tmp_path))
+    store = default_store()
+    PairMatrix("vgc2021", store)
+    before = set((tmp_path / "pairs").glob("vgc2021-*.npy"))
+    # mismas filas legales, otras reglas: no se reutiliza el archivo
+    monkeypatch.setattr(pairs_mod, "rules_version", lambda: "edited")
+    PairMatrix("vgc2021", store)
+    after = set((tmp_path / "pairs").glob("vgc2021-*.npy"))
+    assert len(after) == 2 and any("-edited-" in p.name for p in after - before)
@@ -0,0 +1,46 @@
+import json
+import pstats
+
+from server.core import profiling
+from tests.conftest import call_tool
+
+
+def test_profile_argument_writes_file_and_summary(tmp_path, monkeypatch):
+    monkeypatch.setenv("VGC_PROFILE_DIR", str(tmp_path))
+    monkeypatch.setenv("VGC_PROFILE_TOP", "5")
+    args = {"target": "Dragapult", "limit": 7}
+    reply = call_tool("speed_tiers", dict(args, _profile=True), request_id="a/b", raw=True)
+    plain = call_tool("speed_tiers", args, raw=True)
+    # mismo resultado (y misma clave de caché) con o sin _profile
+    assert reply["result"]["content"] == plain["result"]["content"]
+    assert "_meta" not in plain["result"]
+    meta = reply["result"]["_meta"]["profile"]
+    assert meta["total_ms"] >= 0 and len(meta["top"]) == 5
+    assert {"function", "calls", "own_ms", "cumulative_ms"} <= set(meta["top"][0])
+    files = list(tmp_path.glob("*.prof"))
+    assert [f.name for f in files] == [meta["file"].rsplit("/", 1)[-1]]
+    assert files[0].name.startswith("speed_tiers-a_b-")
+    assert pstats.Stats(str(files[0])).total_calls > 0
+
+
+def test_sampling_every_nth_call(tmp_path, monkeypatch):
+    monkeypatch.setenv("VGC_PROFILE_DIR", str(tmp_path))
+    monkeypatch.setenv("VGC_PROFILE", "3")
+    monkeypatch.setattr(profiling, "_COUNTER", iter(range(1, 100)))
+    replies = [call_tool("speed_tiers", {"target": "Garchomp", "limit": i}, request_id=i, raw=True)
+               for i in range(1, 7)]
+    assert ["_meta" in r["result"] for r in replies] == [False, False, True, False, False, True]
+    off = call_tool("speed_tiers", {"target": "Garchomp", "limit": 9, "_profile": False}, request_id=9, raw=True)
+    assert "_meta" not in off["result"]
+    assert len(list(tmp_path.glob("*.prof"))) == 2
+
+
+def test_invalid_profile_flag():
+    assert call_tool("speed_tiers", {"target": "Garchomp", "_profile": "yes"})["code"] == -32602
+
+
+def test_busy_profiler_is_skipped():
+    with profiling._ACTIVE:
+        out, summary = profiling.profile_call(lambda: 42, "t", 1)
+    assert out == 42 and "skipped" in summary
+    assert json.dumps(summary)
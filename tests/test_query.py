@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from server.tools.query import QueryError, compile_query, from_constraints, normalize, select, tokenize
+from server.tools.store import default_store
+from tests.conftest import call_tool
+
+def test_query_matches_hand_written_filter():
+    store = default_store()
+    rows = np.arange(len(store))
+    q = "Spe >= 100 and (type:Fire or ability:Drought) and bulk > 250 order by spa desc limit 5"
+    got = [store.names[r] for r in select(compile_query(q), store, rows)]
+    st = store.stats.astype(int)
+    fire = store.stab[:, 1]
+    drought = np.array(["drought" in a.lower() for a in store.abilities])
+    keep = (st[:, 5] >= 100) & (fire | drought) & (st[:, 0] + st[:, 2] + st[:, 4] > 250)
+    want = rows[keep][np.argsort(-st[keep, 3], kind="stable")][:5]
+    assert got == [store.names[r] for r in want] and "Mega Charizard Y" in got
+
+def test_plans_are_cached_by_normalized_text():
+    a = compile_query("spe>=100 and (type : FIRE or ability:'Friend Guard') order by SPA desc")
+    b = compile_query('spe >= 100 and (type:fire or ability:"friend guard") order by spa desc')
+    assert a is b
+    assert normalize(tokenize("move:Urshifu-Rapid-Strike")) == "move:urshifu-rapid-strike"
+    assert a.mask(default_store()) is a.mask(default_store())
+
+@pytest.mark.parametrize("bad", ["spe >>= 3", "foo > 3", "type:nope", "(spe > 3", "limit x", "move:fake out",
+                                 "role:nope"])
+def test_bad_queries_raise(bad):
+    with pytest.raises(QueryError):
+        compile_query(bad).mask(default_store())
+
+def test_tools_share_the_query_path():
+    q = 'move:"fake out" and not weak:ground'
+    out = call_tool("pool_filter", {"constraints": {"min_speed": 80}, "query": q + " order by spe desc limit 3"})
+    speeds = [r["Spe"] for r in out]
+    assert len(out) == 3 and speeds == sorted(speeds, reverse=True) and min(speeds) >= 80
+    members = call_tool("suggest_member", {"role": "fast", "query": "type:dragon"})
+    assert members and all("Dragon" in (m["Type 1"], m["Type 2"]) and m["Spe"] >= 100 for m in members)
+    team = call_tool("suggest_team", {"constraints": {"query": "type:water and spe < 60"}})
+    store = default_store()
+    names = [m["name"] for m in team["team"]["pokemon"]]
+    assert len(names) == 6 and all(store.stab[store.resolve(n), 2] for n in names)
+    assert call_tool("pool_filter", {"query": "spe >"})["code"] == -32602
+
+def test_from_constraints_round_trip():
+    text = from_constraints({"include_types": ["fire", "water"], "exclude_types": "steel", "min_bulk": 300,
+                             "require_moves": ["Fake Out"]})
+    assert text == '(type:"fire" or type:"water") and not (type:"steel") and bulk >= 300 and move:"Fake Out"'
+    compile_query(text)
+
+SPEED_CASES = {
+    "spe >= 100": lambda s: s >= 100, "spe > 99.5": lambda s: s > 99.5, "speed < 50": lambda s: s < 50,
+    "spe <= 30": lambda s: s <= 30, "spe = 100": lambda s: s == 100, "120 <= spe": lambda s: s >= 120,
+    "80 > spe": lambda s: s < 80, "spe >= 90 and spe <= 95": lambda s: (s >= 90) & (s <= 95),
+    "not spe > 60": lambda s: s <= 60, "spe == 100.5": lambda s: s == 100.5, "spe * 2 >= 200": lambda s: s >= 100,
+}
+
+@pytest.mark.parametrize("q", sorted(SPEED_CASES))
+def test_speed_comparisons_use_the_index(q, monkeypatch):
+    from server.tools.query import _Parser
+    from server.tools.speed import SpeedIndex
+    store = default_store()
+    calls = []
+    original = SpeedIndex.base_range
+    monkeypatch.setattr(SpeedIndex, "base_range", lambda self, lo=None, hi=None: calls.append((lo, hi)) or original(self, lo, hi))
+    mask = _Parser(tokenize(q)).query().mask(store)
+    assert np.array_equal(mask, SPEED_CASES[q](store.stats[:, 5].astype(np.int64)))
+    # sólo `spe <op> N` con un N alcanzable va por el índice
+    assert bool(calls) == (q not in ("spe * 2 >= 200", "spe == 100.5"))
+
+def test_from_constraints_rejects_non_numeric_bounds():
+    assert from_constraints({"min_speed": "100", "max_speed": 130.0}) == "spe >= 100 and spe <= 130"
+    for bad in ("abc", 99.5, True, [1]):
+        with pytest.raises(QueryError, match="min_speed"):
+            from_constraints({"min_speed": bad})
+    err = call_tool("suggest_team", {"constraints": {"min_speed": "abc"}})
+    assert err["code"] == -32602 and "min_speed" in err["data"]
@@ -0,0 +1,19 @@
+from server.tools.dataset import default_pokemon
+from server.tools.store import default_store
+from server.tools.synergy import compute_synergy
+
+def test_records_share_one_against_matrix():
+    pokes = default_pokemon()
+    assert not hasattr(pokes[0], "__dict__")
+    assert all(p.table is pokes[0].table for p in pokes)
+    assert default_store().against is pokes[0].table.against
+    garchomp = pokes[default_store().resolve("Garchomp")]
+    assert garchomp.against["Ice"] == 4.0 and garchomp.against.get("Electric") == 0.0
+    assert garchomp.against.get("Shadow", 1.0) == 1.0 and len(dict(garchomp.against)) == 18
+
+def test_records_match_api_model():
+    pokes = default_pokemon()
+    for p in (pokes[0], pokes[-1]):
+        assert p.to_model().model_dump() == p.as_dict()
+    team = list(pokes[100:106])
+    assert compute_synergy(team) == compute_synergy([p.to_model() for p in team])
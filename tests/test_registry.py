@@ -0,0 +1,38 @@
+import json
+
+from server.core.encoding import dumps_compact
+from server.main import TOOLS, handle_request
+from server.registry import SCHEMA_DIR
+from tests.conftest import call_tool
+
+def test_every_schema_file_is_a_registered_tool():
+    files = {p.stem for p in SCHEMA_DIR.glob("*.json")}
+    assert files == set(TOOLS.tools)
+    listed = json.loads(dumps_compact(handle_request({"jsonrpc": "2.0", "id": 1, "method": "tools/list"}, {})))
+    names = [t["name"] for t in listed["result"]["tools"]]
+    assert names == list(TOOLS.tools) and names[0] == "suggest_team"
+    assert all("inputSchema" in t and t["description"] for t in listed["result"]["tools"])
+
+def test_dispatch_errors():
+    assert call_tool("nope", {})["code"] == -32601
+    assert call_tool("suggest_team", {"format": "vgc2099"})["code"] == -32602
+    assert call_tool("export_showdown", {"team": {"pokemon": "x"}})["code"] == -32602
+    missing = call_tool("damage_matrix", {})
+    assert missing["code"] == -32602 and missing["data"] == "arguments.team is required"
+    nested = call_tool("damage_matrix", {"team": {"pokemon": [{"item": "Choice Specs"}]}, "threats": {"pokemon": []}})
+    assert nested["code"] == -32602 and "team.pokemon[0].name" in nested["data"]
+    assert call_tool("similar_pokemon", {"pokemon": "Kyogre", "k": "five"})["code"] == -32602
+    assert call_tool("pool_filter", {"constraints": {"outspeeds": "Garchomp"}, "limit": 2})
+
+def test_enum_and_minimum_are_enforced():
+    team = {"pokemon": [{"name": "Kyogre"}]}
+    for name, args in [("archive_stats", {"path": "x", "format": "vgc1999"}),
+                       ("validate_team", {"team": team, "format": "vgc1999"}),
+                       ("speed_tiers", {"format": "gen9ou"}),
+                       ("team_threats", {"team": team, "format": "vgc1999"}),
+                       ("optimize_spreads", {"team": team, "mode": "weird"}),
+                       ("similar_pokemon", {"pokemon": "Kyogre", "k": 0})]:
+        error = call_tool(name, args)
+        assert error["code"] == -32602, (name, error)
+    # los handlers normalizan mayúsculas y espacios, el enum también
+    assert "results" in call_tool("validate_team", {"team": team, "format": " VGC2021"})
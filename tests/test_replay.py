@@ -0,0 +1,98 @@
+import json
+import threading
+
+from server import main
+from server.core.journal import Journal
+from server.replay import SessionIds, _run_worker, expects_reply, load_sessions, percentile, replay
+
+SAMPLE = "examples/sample_session.jsonl"
+
+
+def test_journal_records_every_request(tmp_path, monkeypatch):
+    path = tmp_path / "journal.jsonl"
+    monkeypatch.setattr(main, "_JOURNAL", Journal(path))
+    a, b = {}, {}
+    main.handle_request({"jsonrpc": "2.0", "id": 1, "method": "tools/list", "params": {}}, a)
+    main.handle_request({"jsonrpc": "2.0", "method": "initialized", "params": {}}, b)
+    main.handle_request({"jsonrpc": "2.0", "id": 2, "method": "tools/list", "params": {}}, a)
+    main._JOURNAL.close()
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [line["request"].get("id") for line in lines] == [1, None, 2]
+    assert lines[0]["session"] == lines[2]["session"] != lines[1]["session"]
+    assert lines[0]["ts"] <= lines[1]["ts"] <= lines[2]["ts"]
+    sessions = load_sessions(path)
+    assert [len(m) for _, m in sessions] == [2, 1] and sessions[0][1][0][0] == 0.0
+
+
+def test_load_sessions_and_helpers(tmp_path):
+    [(sid, messages)] = load_sessions(SAMPLE)
+    offsets = [t for t, _ in messages]
+    assert offsets[0] == 0.0 and offsets == sorted(offsets) and offsets[-1] > 10
+    assert [expects_reply(m) for _, m in messages[:3]] == [True, False, True]
+    # JSONL de mensajes sueltos: una sesión sin esperas
+    raw = tmp_path / "raw.jsonl"
+    raw.write_text("\n".join(json.dumps(m) for _, m in messages[:3]), encoding="utf-8")
+    [(_, loose)] = load_sessions(raw)
+    assert [t for t, _ in loose] == [0.0] * 3
+    assert percentile([1, 2, 3, 4], 50) == 2.5 and percentile([5], 99) == 5 and percentile([], 50) == 0.0
+
+
+def test_replay_two_processes():
+    [session] = load_sessions(SAMPLE)
+    report = replay([session, ("copy", session[1])], speed=0, processes=2, server_args=["--warm", "eager"])
+    assert report["processes"] == 2 and report["requests"] == 18
+    assert report["overall"]["errors"] == 0 and report["throughput"] > 0
+    assert report["by_label"]["tools/call suggest_team"]["count"] == 4
+    st = report["overall"]
+    assert 0 < st["p50_ms"] <= st["p90_ms"] <= st["p99_ms"] <= st["max_ms"]
+
+
+BUILD = "examples/sample_build_session.jsonl"
+
+
+def test_journal_records_server_assigned_session_ids(tmp_path, monkeypatch):
+    path = tmp_path / "journal.jsonl"
+    monkeypatch.setattr(main, "_JOURNAL", Journal(path))
+    client = {}
+    req = {"jsonrpc": "2.0", "id": 9, "method": "tools/call",
+           "params": {"name": "create_session", "arguments": {"_encoding": "compact"}}}
+    sid = json.loads(main.handle_request(req, client)["result"]["content"][0]["text"])["session"]
+    main._JOURNAL.close()
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert lines[1] == {"ts": lines[1]["ts"], "session": lines[0]["session"], "created": {"id": 9, "session": sid}}
+
+
+def test_session_ids_are_translated():
+    ids = SessionIds()
+    create = {"jsonrpc": "2.0", "id": 3, "method": "tools/call", "params": {"name": "create_session", "arguments": {}}}
+    ids.assigned(create, {"result": {"content": [{"type": "text", "text": "session: fresh0001\nformat: vgc2022"}]}})
+    ids.recorded({"id": 3, "session": "old0001"})
+    use = {"jsonrpc": "2.0", "id": 4, "method": "tools/call",
+           "params": {"name": "team_synergy", "arguments": {"session": "old0001"}}}
+    assert ids.rewrite(use)["params"]["arguments"]["session"] == "fresh0001"
+    assert use["params"]["arguments"]["session"] == "old0001"  # el mensaje grabado no se toca
+
+
+def test_replay_session_journal():
+    sessions = load_sessions(BUILD)
+    report = replay(sessions, speed=0, processes=1, server_args=["--warm", "eager"])
+    assert report["overall"]["errors"] == 0 and report["by_label"]["tools/call update_session"]["count"] == 4
+    # sin las líneas "created" los ids se emparejan por orden de uso
+    [(sid, messages)] = sessions
+    bare = [(t, m) for t, m in messages if "created" not in m]
+    assert replay([(sid, bare)], speed=0)["overall"]["errors"] == 0
+
+def test_worker_interleaves_sessions_by_offset():
+    class Recorder:
+        def __init__(self):
+            self.sent = []
+
+        def send(self, message):
+            self.sent.append(message["id"])
+            return {"jsonrpc": "2.0", "id": message["id"], "result": {}}
+
+    ping = lambda i: {"jsonrpc": "2.0", "id": i, "method": "ping"}
+    sessions = [("a", [(0.0, ping("a1")), (2.0, ping("a2"))]), ("b", [(1.0, ping("b1")), (3.0, ping("b2"))])]
+    server, samples = Recorder(), []
+    _run_worker(server, sessions, 0.0, 0, samples, threading.Lock())
+    assert server.sent == ["a1", "b1", "a2", "b2"] and len(samples) == 4
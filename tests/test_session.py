@@ -0,0 +1,86 @@
+import pytest
+
+from server.core.legality import format_rules
+from server.engine.session import SessionStore
+from server.tools.learnsets import default_learnsets
+from server.tools.store import default_store
+from tests.conftest import call_tool
+
+TEAM = [{"name": "Incineroar", "moves": ["Fake Out", "Flare Blitz", "Knock Off", "Parting Shot"]},
+        {"name": "Rillaboom"}, {"name": "Kyogre"}, {"name": "Zacian"}]
+
+
+def test_session_synergy_matches_full_recompute():
+    sid = call_tool("create_session", {"team": {"pokemon": TEAM[:2]}})["session"]
+    state = call_tool("update_session", {"session": sid, "add": TEAM[2:]})
+    assert [m["name"] for m in state["members"]] == [p["name"] for p in TEAM]
+    for coverage in ("stab", "moves", "learnset", None):
+        extra = {"coverage": coverage} if coverage else {}
+        assert call_tool("team_synergy", dict(extra, session=sid)) == \
+            call_tool("team_synergy", dict(extra, team={"pokemon": TEAM}))
+    # quitar deshace exactamente lo que sumó el miembro
+    call_tool("update_session", {"session": sid, "remove": ["Zacian"]})
+    assert call_tool("team_synergy", {"session": sid}) == call_tool("team_synergy", {"team": {"pokemon": TEAM[:3]}})
+
+
+def test_clauses_locks_and_rejections():
+    state = call_tool("create_session", {"team": {"pokemon": TEAM}, "lock": ["Kyogre"]})
+    sid = state["session"]
+    assert state["restricted"] == {"used": 2, "cap": 2} and state["slots_left"] == 2
+    state = call_tool("update_session", {"session": sid, "remove": ["Kyogre"], "add": ["Groudon", "Urshifu", "Urshifu-Rapid-Strike", "Nope"]})
+    reasons = {r.get("add") or r.get("remove"): r["reason"] for r in state["rejected"]}
+    assert reasons == {"Kyogre": "locked", "Groudon": "vgc2022 allows 2 restricted",
+                       "Urshifu-Rapid-Strike": "species clause", "Nope": "unknown Pokémon"}
+    # suggest_member con sesión: sin restringidos (cupo lleno) ni especies repetidas
+    names = [p["Name"] for p in call_tool("suggest_member", {"session": sid, "role": "support"})]
+    store = default_store()
+    rows = [store.resolve(n) for n in names]
+    assert len(names) == 5 and not any(n.startswith(("Urshifu", "Incineroar")) for n in names)
+    assert not format_rules("vgc2022").restricted[rows].any()
+    state = call_tool("update_session", {"session": sid, "unlock": ["Kyogre"], "remove": ["Kyogre"]})
+    assert "rejected" not in state and state["restricted"]["used"] == 1
+    assert call_tool("update_session", {"session": sid, "close": True})["closed"] is True
+    assert call_tool("team_synergy", {"session": sid})["code"] == -32602
+
+
+def test_species_clause_by_dex_number():
+    # las Tapu comparten prefijo pero no número de Pokédex
+    state = call_tool("create_session", {"format": "vgc2021"})
+    state = call_tool("update_session", {"session": state["session"], "add": ["Tapu Koko", "Tapu Lele", "Tapu Fini"]})
+    assert "rejected" not in state and [m["name"] for m in state["members"]] == ["Tapu Koko", "Tapu Lele", "Tapu Fini"]
+
+
+def test_suggest_member_session_matches_core():
+    sid = call_tool("create_session", {"team": {"pokemon": [{"name": "Amoonguss"}, {"name": "Torkoal"}]}})["session"]
+    args = {"role": "trick_room", "min_speed": 0}
+    assert call_tool("suggest_member", dict(args, session=sid)) == \
+        call_tool("suggest_member", dict(args, core=["Amoonguss", "Torkoal"]))
+    # con sesión no se cachea: un cambio en la sesión cambia la respuesta
+    before = call_tool("suggest_member", dict(args, session=sid))
+    call_tool("update_session", {"session": sid, "add": [before[0]["Name"]]})
+    assert call_tool("suggest_member", dict(args, session=sid))[0]["Name"] != before[0]["Name"]
+
+
+def test_store_bounds_and_idle_expiry(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr("server.engine.session.time.monotonic", lambda: clock[0])
+    store, ls = default_store(), default_learnsets()
+    sessions = SessionStore(max_sessions=2, ttl_s=10)
+    a = sessions.create("vgc2022", store, ls)
+    b = sessions.create("vgc2022", store, ls)
+    clock[0] = 5
+    sessions.get(a.id)                      # a pasa a ser la más reciente
+    c = sessions.create("vgc2022", store, ls)
+    assert len(sessions) == 2
+    with pytest.raises(ValueError):
+        sessions.get(b.id)                  # descartada por el límite
+    clock[0] = 12
+    assert sessions.get(c.id) is c          # 7 s sin uso: sigue viva
+    clock[0] = 16
+    with pytest.raises(ValueError):
+        sessions.get(a.id)                  # 11 s sin uso: caducada
+    assert sessions.get(c.id) is c
+    clock[0] = 30
+    with pytest.raises(ValueError):
+        sessions.get(c.id)
+    assert len(sessions) == 0
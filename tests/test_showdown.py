@@ -0,0 +1,38 @@
+from server.tools.showdown import iter_teams, parse_team, team_to_showdown, teams_to_showdown
+from server.main import handle_request
+
+SAMPLE = open("examples/sample_team_showdown.txt", encoding="utf-8").read()
+
+def test_parse_sample_team_fields():
+    team = parse_team(SAMPLE)
+    assert team["format"] == "gen8vgc2022" and len(team["pokemon"]) == 6
+    assert not team.get("errors")
+    inc = team["pokemon"][2]
+    assert (inc["nickname"], inc["species"], inc["gender"], inc["item"]) == ("Mr. Smiles", "Incineroar", "M", "Sitrus Berry")
+    assert inc["shiny"] is True and inc["evs"]["SpD"] == 148
+    assert team["pokemon"][0]["name"] == "Calyrex Shadow Rider"
+    assert team["pokemon"][5]["ivs"] == {"Atk": 0, "Spe": 0}
+
+def test_roundtrip_and_stream_batch():
+    team = parse_team(SAMPLE)
+    again = parse_team(team_to_showdown(team, header=True))
+    assert [p["name"] for p in again["pokemon"]] == [p["name"] for p in team["pokemon"]]
+    dump = teams_to_showdown([team] * 50)
+    teams = list(iter_teams(dump.splitlines()))
+    assert len(teams) == 50 and all(len(t["pokemon"]) == 6 for t in teams)
+
+def test_validation_flags_bad_sets():
+    team = parse_team("Missingno @ Leftovers\nEVs: 252 HP / 252 Atk / 252 Spe\nWeird Nature\n")
+    errs = " ".join(team["errors"])
+    assert "unknown Pokémon" in errs and "EV total" in errs and "nature" in errs
+
+def test_import_and_export_tools():
+    req = {"jsonrpc": "2.0", "id": 1, "method": "tools/call",
+           "params": {"name": "import_showdown", "arguments": {"pastes": [SAMPLE, SAMPLE], "_encoding": "compact"}}}
+    import json
+    out = json.loads(handle_request(req, {})["result"]["content"][0]["text"])
+    assert out["count"] == 2 and out["invalid"] == 0
+    req = {"jsonrpc": "2.0", "id": 2, "method": "tools/call",
+           "params": {"name": "export_showdown", "arguments": {"teams": out["teams"]}}}
+    text = handle_request(req, {})["result"]["content"][0]["text"]
+    assert text.count("=== [gen8vgc2022] Sample Team ===") == 2
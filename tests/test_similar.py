@@ -0,0 +1,59 @@
+import pytest
+
+from server.core.legality import format_rules
+from server.tools.similar import similar_pokemon, similarity_index
+from server.tools.store import DexStore, default_store
+from tests.conftest import call_tool
+
+
+def test_replacements_for_banned_pokemon_are_legal():
+    out = call_tool("similar_pokemon", {"pokemon": "kyogre", "format": "vgc2020", "k": 8})
+    assert out["target"] == "Kyogre" and out["target_legal"] is False
+    store, legal = default_store(), format_rules("vgc2020").legal
+    names = [p["Name"] for p in out["similar"]]
+    assert len(names) == 8 and all(legal[store.resolve(n)] for n in names)
+    assert all("Water" in (p["Type 1"], p["Type 2"]) for p in out["similar"][:3])
+    dist = [p["Distance"] for p in out["similar"]]
+    assert dist == sorted(dist)
+    assert set(out["similar"][0]["Distances"]) == {"stats", "types", "against", "roles"}
+
+
+def test_species_and_evolution_filters():
+    store = default_store()
+    row = store.resolve("Urshifu")
+    forms = {store.names[i] for i in range(len(store)) if store.numbers[i] == store.numbers[row]} - {store.names[row]}
+    assert forms
+    default = {store.names[h["row"]] for h in similar_pokemon("Urshifu", k=50)["hits"]}
+    assert not default & forms
+    with_forms = {store.names[h["row"]] for h in similar_pokemon("Urshifu", k=50, same_species=True)["hits"]}
+    assert with_forms & forms
+    unevolved = [h["row"] for h in similar_pokemon("Venusaur", k=50, fully_evolved=False)["hits"]]
+    assert any(store.pokemon[r].final_evolution is False for r in unevolved)
+    evolved = [h["row"] for h in similar_pokemon("Venusaur", k=50)["hits"]]
+    assert all(store.pokemon[r].final_evolution is not False for r in evolved)
+
+
+def test_weights_query_and_errors():
+    weights = {"stats": 1, "types": 0, "against": 0, "roles": 0}
+    by_stats = call_tool("similar_pokemon", {"pokemon": "Amoonguss", "k": 5, "weights": weights})
+    default = call_tool("similar_pokemon", {"pokemon": "Amoonguss", "k": 5})
+    assert [p["Name"] for p in by_stats["similar"]] != [p["Name"] for p in default["similar"]]
+    assert all(p["Distances"]["types"] == 0 for p in by_stats["similar"])
+    fast = call_tool("similar_pokemon", {"pokemon": "Amoonguss", "query": "spe >= 100"})
+    assert fast["similar"] and all(p["Spe"] >= 100 for p in fast["similar"])
+    assert call_tool("similar_pokemon", {"pokemon": "Nope"})["code"] == -32602
+    assert call_tool("similar_pokemon", {"pokemon": "Amoonguss", "weights": {"speed": 1}})["code"] == -32602
+    assert call_tool("similar_pokemon", {"pokemon": "Amoonguss", "format": "vgc2019"})["code"] == -32602
+    assert call_tool("similar_pokemon", {"pokemon": "Amoonguss", "query": "role:bogus"})["code"] == -32602
+    for bad in (float("nan"), float("inf")):
+        with pytest.raises(ValueError):
+            similar_pokemon("Amoonguss", weights={"stats": bad})
+
+
+def test_index_is_per_store():
+    store = default_store()
+    assert similarity_index() is similarity_index(store)
+    other = DexStore(store.pokemon)
+    index = similarity_index(other)
+    assert index is not similarity_index(store) and index.store is other
+    assert index.vectors.shape == similarity_index(store).vectors.shape
@@ -0,0 +1,65 @@
+import json
+
+from server.main import handle_request
+from server.tools import simulate
+from server.tools.simulate import simulate_matchup, wilson
+
+TEAM = ["Incineroar", "Rillaboom", "Urshifu-Rapid-Strike", "Regieleki", "Calyrex-Shadow", "Grimmsnarl"]
+WEAK = ["Magikarp", "Caterpie", "Weedle", "Pidgey", "Rattata", "Spearow"]
+
+def _rates(out):
+    return [(r["games"], r["wins"], r["draws"]) for r in out["results"]]
+
+def test_same_seed_same_result(monkeypatch):
+    monkeypatch.setenv("VGC_SIM_WORKERS", "1")
+    a = simulate_matchup(TEAM, [TEAM], games=3000, seed=7)
+    b = simulate_matchup(TEAM, [TEAM], games=3000, seed=7)
+    c = simulate_matchup(TEAM, [TEAM], games=3000, seed=8)
+    assert _rates(a) == _rates(b) != _rates(c)
+    # espejo: cerca del 50%
+    assert 0.4 < a["results"][0]["win_rate"] < 0.6
+
+def test_result_does_not_depend_on_workers(monkeypatch):
+    games = simulate.CHUNK_GAMES * 2 + 100
+    monkeypatch.setenv("VGC_SIM_WORKERS", "1")
+    inline = simulate_matchup(TEAM, [TEAM, WEAK], games=games, seed=3)
+    monkeypatch.setenv("VGC_SIM_WORKERS", "2")
+    monkeypatch.setattr(simulate, "_POOL", None)
+    try:
+        pooled = simulate_matchup(TEAM, [TEAM, WEAK], games=games, seed=3)
+    finally:
+        if simulate._POOL is not None:
+            simulate._POOL.shutdown()
+    assert _rates(inline) == _rates(pooled)
+
+def test_gauntlet_and_confidence_interval(monkeypatch):
+    monkeypatch.setenv("VGC_SIM_WORKERS", "1")
+    out = simulate_matchup(TEAM, [WEAK, TEAM], games=2000, names=["Weak", None])
+    weak, mirror = out["results"]
+    assert weak["opponent"] == "Weak" and weak["win_rate"] > 0.99
+    assert mirror["ci95"][0] < mirror["win_rate"] < mirror["ci95"][1]
+    assert out["overall"]["games"] == 4000
+    assert out["overall"]["wins"] == weak["wins"] + mirror["wins"]
+    lo, hi = wilson(50, 100)
+    assert round(lo, 3) == 0.404 and round(hi, 3) == 0.596
+
+def test_simulate_matchup_tool(monkeypatch):
+    monkeypatch.setenv("VGC_SIM_WORKERS", "1")
+    req = {"jsonrpc": "2.0", "id": 1, "method": "tools/call",
+           "params": {"name": "simulate_matchup", "arguments": {
+               "team": {"pokemon": TEAM}, "opponent": {"pokemon": WEAK + ["Nobody"]},
+               "games": 500, "_encoding": "compact"}}}
+    out = json.loads(handle_request(req, {})["result"]["content"][0]["text"])
+    assert out["unknown"] == ["Nobody"] and out["results"][0]["games"] == 500
+    req["params"]["arguments"].pop("opponent")
+    assert handle_request(req, {})["error"]["code"] == -32602
+    # lados sin ningún Pokémon conocido y bring < 2: parámetros inválidos, no -32603
+    req["params"]["arguments"]["opponent"] = {"pokemon": ["Nobody"]}
+    assert handle_request(req, {})["error"]["code"] == -32602
+    req["params"]["arguments"].update(opponent={"pokemon": WEAK}, bring=1)
+    assert handle_request(req, {})["error"]["code"] == -32602
+
+def test_bring_is_clamped_to_a_full_lead(monkeypatch):
+    monkeypatch.setenv("VGC_SIM_WORKERS", "1")
+    for bring in (-3, 0, 1):
+        assert simulate_matchup(TEAM, [WEAK], games=200, bring=bring)["model"]["bring"] == 2
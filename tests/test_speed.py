@@ -0,0 +1,42 @@
+from server.tools.speed import actual_speed, default_speed_index
+from tests.conftest import call_tool
+
+def test_actual_speed_level_50():
+    # Garchomp (102): 169 con 252+, 154 neutro, 253 con Scarf
+    assert int(actual_speed(102, "positive")) == 169
+    assert int(actual_speed(102, "neutral")) == 154
+    assert int(actual_speed(102, "positive", "scarf")) == 253
+    assert int(actual_speed(102, "positive", "tailwind")) == 338
+
+def test_compare_and_base_range_match_brute_force():
+    index = default_speed_index()
+    base = index.store.stats[:, 5]
+    assert set(index.base_range(100, 110).tolist()) == set((base >= 100).nonzero()[0]) & set((base <= 110).nonzero()[0])
+    speeds = actual_speed(base, "neutral", "tailwind")
+    split = index.compare(200, "neutral", "tailwind")
+    assert set(split["first"][0].tolist()) == set((speeds > 200).nonzero()[0])
+    assert list(split["first"][1]) == sorted(split["first"][1], reverse=True)
+    tr = index.compare(200, "neutral", "none", trick_room=True)
+    assert list(tr["first"][1]) == sorted(tr["first"][1]) and (tr["first"][1] < 200).all()
+
+def test_speed_tiers_tool_and_pool_filter_outspeeds():
+    out = call_tool("speed_tiers", {"target": "Garchomp", "format": "vgc2020", "limit": 500})
+    assert out["target_speed"] == 169
+    assert all(p["speed"] > 169 for p in out["first"]) and out["count"] == len(out["first"])
+    names = {p["name"] for p in out["first"]}
+    assert "Regieleki" in names and "Mewtwo" not in names  # restringido: fuera en vgc2020
+    tr = call_tool("speed_tiers", {"target": "Garchomp", "trick_room": True, "format": "vgc2022", "limit": 3})
+    assert [p["speed"] for p in tr["first"]] == sorted(p["speed"] for p in tr["first"])
+
+    rows = call_tool("pool_filter", {"constraints": {"min_speed": 100, "max_speed": 130,
+                                                 "outspeeds": {"target": "Garchomp", "spread": "neutral"}},
+                                 "limit": 100})
+    assert rows and all(100 <= r["Spe"] <= 130 and int(actual_speed(r["Spe"], "neutral")) > 169 for r in rows)
+
+def test_speed_client_mistakes_are_invalid_params():
+    for tool, args in (("speed_tiers", {"target": "Nonexistent"}), ("speed_tiers", {}),
+                       ("speed_tiers", {"target": "Garchomp", "modifier": "rocket"}),
+                       ("speed_tiers", {"target": "Garchomp", "limit": 0}),
+                       ("pool_filter", {"constraints": {"outspeeds": {"target": "Nonexistent"}}}),
+                       ("pool_filter", {"constraints": {"outspeeds": {"target": "Garchomp", "spread": "max"}}})):
+        assert call_tool(tool, args)["code"] == -32602, (tool, args)
@@ -0,0 +1,40 @@
+import json
+
+from server.main import handle_request
+from server.tools.damage import damage_matrix
+from server.tools.speed import actual_speed
+from server.tools.spreads import EV_BUDGET, EV_STEPS, optimize_spreads, stat_values
+
+def test_stat_values_match_speed_formula():
+    assert int(stat_values(102, 252, mult=110)) == int(actual_speed(102, "positive")) == 169
+    assert int(stat_values(108, 252, hp=True)) == 215  # Garchomp 252 HP
+    # los 33 pasos útiles suben el stat de uno en uno
+    assert (stat_values(102, EV_STEPS)[1:] - stat_values(102, EV_STEPS)[:-1] == 1).all()
+
+def test_spreads_hit_benchmarks_with_minimum_evs():
+    out = optimize_spreads([{"name": "Garchomp", "outspeed": 120},
+                            {"name": "Porygon2", "underspeed": "Incineroar"}], ["Incineroar"])
+    chomp, p2 = out["pokemon"]
+    assert chomp["speed"]["ok"] and chomp["stats"]["Spe"] > 120
+    mult = 110 if chomp["nature"] in ("Jolly", "Timid", "Hasty", "Naive") else 100
+    spe_ev = chomp["evs"].get("Spe", 0)
+    if spe_ev:
+        assert int(stat_values(102, EV_STEPS[list(EV_STEPS).index(spe_ev) - 1], mult=mult)) <= 120
+    assert p2["ivs"] == {"Spe": 0} and p2["speed"]["ok"]
+    for p in out["pokemon"]:
+        assert sum(p["evs"].values()) <= EV_BUDGET and max(p["evs"].values()) <= 252
+    assert "EVs:" in out["showdown"] and "IVs: 0 Spe" in out["showdown"]
+
+def test_reported_ko_matches_damage_matrix():
+    out = optimize_spreads(["Incineroar"], ["Zacian-Crowned", "Kyogre"], mode="bulk")
+    s = out["sets"][0]
+    dm = damage_matrix([s], ["Zacian-Crowned", "Kyogre"], direction="threats")["threats_vs_team"]
+    assert [t["ko"] for t in out["pokemon"][0]["threats"]] == [row[0] for row in dm["ko"]]
+
+def test_optimize_spreads_tool():
+    req = {"jsonrpc": "2.0", "id": 1, "method": "tools/call",
+           "params": {"name": "optimize_spreads", "arguments": {
+               "team": {"pokemon": [{"name": "Rillaboom", "outspeed": "Incineroar"}]},
+               "threats": ["Landorus-Therian", "Nobody"], "_encoding": "compact"}}}
+    out = json.loads(handle_request(req, {})["result"]["content"][0]["text"])
+    assert out["unknown"] == ["Nobody"] and out["pokemon"][0]["speed"]["ok"]
@@ -0,0 +1,30 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from server.registry import TOOL_NAMES
+
+ROOT = Path(__file__).resolve().parent.parent
+
+def test_import_main_does_not_load_heavy_modules():
+    code = ("import sys, server.main as m; "
+            "m.handle_request({'jsonrpc': '2.0', 'id': 1, 'method': 'tools/list'}); "
+            "print([n for n in ('numpy', 'pandas', 'pydantic', 'server.handlers') if n in sys.modules])")
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
+
+def test_handshake_before_warm_up_and_first_call():
+    msgs = [
+        {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {"protocolVersion": "2025-06-18"}},
+        {"jsonrpc": "2.0", "id": 2, "method": "tools/list", "params": {}},
+        {"jsonrpc": "2.0", "id": 3, "method": "tools/call",
+         "params": {"name": "suggest_member", "arguments": {"role": "fast"}}},
+    ]
+    stdin = "".join(json.dumps(m) + "\n" for m in msgs)
+    out = subprocess.run([sys.executable, "-m", "server.main", "--warm", "off"], cwd=ROOT, input=stdin,
+                         capture_output=True, text=True, timeout=60)
+    replies = [json.loads(line) for line in out.stdout.splitlines()]
+    assert [r["id"] for r in replies] == [1, 2, 3]
+    assert [t["name"] for t in replies[1]["result"]["tools"]] == list(TOOL_NAMES)
+    assert len(json.loads(replies[2]["result"]["content"][0]["text"])) == 5
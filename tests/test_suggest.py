@@ -1,4 +1,3 @@
-import json
 from server.main import suggest_team, SuggestParams
 
 def test_suggest_team_returns_six():
@@ -8,3 +7,37 @@ def test_suggest_team_returns_six():
     assert isinstance(team, list)
     assert len(team) == 6
     assert all("name" in m for m in team)
+
+def test_suggest_team_num_teams_diverse_and_seeded():
+    args = dict(format="vgc2022", constraints={"lock": ["Kyogre"]}, num_teams=4, max_overlap=2, seed=7)
+    out = suggest_team(SuggestParams(**args))
+    teams = [[m["name"] for m in t["team"]["pokemon"]] for t in out["teams"]]
+    assert len(teams) == 4 and all(len(t) == 6 and t[0] == "Kyogre" for t in teams)
+    assert teams[0] == [m["name"] for m in suggest_team(SuggestParams(format="vgc2022", constraints={"lock": ["Kyogre"]}))["team"]["pokemon"]]
+    for i in range(len(teams)):
+        for j in range(i):
+            assert len(set(teams[i][1:]) & set(teams[j][1:])) <= 2
+    again = suggest_team(SuggestParams(**args))
+    assert [[m["name"] for m in t["team"]["pokemon"]] for t in again["teams"]] == teams
+
+def test_engine_without_mcp_layer_filters_types_and_bans():
+    from server.engine import suggest_team as engine_suggest
+    from server.core.models import SuggestParams as Params
+    out = engine_suggest(Params(format="vgc2021", core_pokemon=["Incineroar"], banned_pokemon=["Heatran"],
+                                constraints={"include_types": ["fire"]}))
+    names = [m["name"] for m in out["team"]["pokemon"]]
+    assert names[0] == "Incineroar" and "Heatran" not in names and len(names) == 6
+
+def test_lock_uses_dex_numbers_and_reports_rejected():
+    from server.core.legality import validate_teams
+    lock = ["Tapu Koko", "Tapu Lele", "Galarian Zapdos", "Galarian Moltres"]
+    for exact in (False, True):
+        out = suggest_team(SuggestParams(format="vgc2021", constraints={"lock": lock, "exact": exact}))
+        names = [m["name"] for m in out["team"]["pokemon"]]
+        assert names[:4] == lock and len(names) == 6 and out["success"]
+        assert validate_teams([[{"name": n} for n in names]], "vgc2021")[0]["valid"]
+    lock = ["Zapdos", "Galarian Zapdos", "Missingno"]
+    out = suggest_team(SuggestParams(format="vgc2021", constraints={"lock": lock}))
+    assert not out["success"]
+    assert out["rejected"] == [{"name": "Missingno", "reason": "unknown Pokémon"},
+                               {"name": "Galarian Zapdos", "reason": "species clause"}]
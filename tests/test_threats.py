@@ -0,0 +1,35 @@
+import json
+
+from server.tools.store import default_store
+from server.tools.threats import team_threats
+from server.main import handle_request
+
+TEAM = ["Incineroar", "Rillaboom", "Amoonguss", "Garchomp", "Tornadus", "Kyogre"]
+
+def test_scores_match_type_chart():
+    store = default_store()
+    out = team_threats(store, store.ids(["Garchomp"]), store.ids(["Jolteon", "Weavile", "Ferrothorn"]), top=3)
+    by_name = {t["name"]: t for t in out["threats"]}
+    # Weavile golpea a Garchomp x4 con Ice y Garchomp sólo le pega neutro
+    assert by_name["Weavile"]["threatened"] == ["Garchomp"] and by_name["Weavile"]["answered_by"] == 0
+    # Garchomp es inmune a Electric: responde a Jolteon
+    assert by_name["Jolteon"]["checks"] == ["Garchomp"]
+    assert out["threats"][0]["name"] == "Weavile"
+
+def test_team_threats_tool_over_legal_pool():
+    req = {"jsonrpc": "2.0", "id": 1, "method": "tools/call",
+           "params": {"name": "team_threats", "arguments": {"team": {"pokemon": [{"name": n} for n in TEAM]},
+                                                            "top": 5, "damage": True, "_encoding": "compact"}}}
+    out = json.loads(handle_request(req, {})["result"]["content"][0]["text"])
+    assert out["pool_size"] > 400 and len(out["threats"]) == 5
+    answered = [t["answered_by"] for t in out["threats"]]
+    assert answered == sorted(answered)
+    assert all("damage" in t for t in out["threats"])
+
+def test_team_threats_truncated_only_when_out_of_time():
+    args = {"team": {"pokemon": [{"name": "Garchomp"}]}, "threats": ["Nobody"], "damage": True, "_encoding": "compact"}
+    req = {"jsonrpc": "2.0", "id": 1, "method": "tools/call", "params": {"name": "team_threats", "arguments": args}}
+    out = json.loads(handle_request(req, {})["result"]["content"][0]["text"])
+    assert out["threats"] == [] and "truncated" not in out
+    args["top"] = 0
+    assert handle_request(req, {})["error"]["code"] == -32602